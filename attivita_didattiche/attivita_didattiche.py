@@ -1,295 +1,462 @@
-import csv
-from pathlib import Path
-from datetime import date, datetime, timedelta
-import random
-from faker import Faker
-
-fake = Faker("it_IT")
-
-# Configuration
-N_SEDI = 3
-N_AULE = 8
-N_CORSI = 4
-N_DOCENTI = 8
-N_TUTOR = 4
-N_STUDENTI = 60
-N_UNITA = 12
-N_CORSO_UF = 18
-N_LEZIONI = 300
-N_ISCRIZIONI = N_STUDENTI
-N_TUTOR_CORSO = 6
-N_VALUTAZIONI = 450
-
-RANDOM_SEED = 1234
-Faker.seed(RANDOM_SEED)
-random.seed(RANDOM_SEED)
-
-# --- Helpers ---
-def make_output_folder(base="csv_out"):
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    p = Path(base) / f"attivita_didattiche_{ts}"
-    p.mkdir(parents=True, exist_ok=True)
-    return p
-
-def write_csv(path, fields, rows):
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fields)
-        writer.writeheader()
-        writer.writerows(rows)
-
-# --- Generators ---
-def gen_sedi(n):
-    rows = []
-    for i in range(1, n+1):
-        rows.append({
-            "sede_id": i,
-            "nome": f"{fake.city()} Campus",
-            "indirizzo": fake.street_address(),
-            "citta": fake.city(),
-            "cap": fake.postcode(),
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_aule(n, sedi):
-    rows = []
-    for i in range(1, n+1):
-        sede = random.choice(sedi)
-        rows.append({
-            "aula_id": i,
-            "nome": f"Aula {chr(64 + (i%26 or 26))}{i}",
-            "capienza": random.randint(15, 50),
-            "sede_id": sede["sede_id"],
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_corsi(n, sedi):
-    modalities = ["presenza", "online", "blended"]
-    corsi_names = ["Full-Stack Developer", "Cybersecurity", "Data Science", "UX/UI Design"]
-    rows = []
-    for i in range(1, n+1):
-        sede = random.choice(sedi)
-        rows.append({
-            "corso_id": i,
-            "titolo": corsi_names[i-1],
-            "descrizione": f"Percorso formativo avanzato in {corsi_names[i-1]}",
-            "ore_totali": random.choice([300, 600, 900]),
-            "modalita": random.choice(modalities),
-            "sede_id": sede["sede_id"],
-            "attivo": 1,
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_docenti(n):
-    rows = []
-    for i in range(1, n+1):
-        rows.append({
-            "docente_id": i,
-            "nome": fake.first_name(),
-            "cognome": fake.last_name(),
-            "codice_fiscale": fake.bothify(text="??????????????").upper()[:16],
-            "email": fake.email(),
-            "telefono": fake.phone_number(),
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_tutors(n):
-    rows = []
-    for i in range(1, n+1):
-        rows.append({
-            "tutor_id": i,
-            "nome": fake.first_name(),
-            "cognome": fake.last_name(),
-            "email": fake.email(),
-            "telefono": fake.phone_number(),
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_studenti(n):
-    rows = []
-    for i in range(1, n+1):
-        # 85% tra 18 e 28 anni, 15% tra 31 e 45 anni
-        if random.random() < 0.85:
-            age = random.randint(18, 28)
-        else:
-            age = random.randint(31, 45)
-        dob = date.today() - timedelta(days=age*365 + random.randint(0, 365))
-        rows.append({
-            "studente_id": i,
-            "nome": fake.first_name(),
-            "cognome": fake.last_name(),
-            "data_nascita": dob.isoformat(),
-            "codice_fiscale": fake.bothify(text="??????????????").upper()[:16],
-            "email": fake.email(),
-            "indirizzo": fake.street_address(),
-            "citta": fake.city(),
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_unita(n):
-    uf_topics = ["Frontend", "Backend", "Networking", "Cybersecurity", "UX", "Data Analysis", "Machine Learning", "Design Thinking"]
-    rows = []
-    for i in range(1, n+1):
-        topic = random.choice(uf_topics)
-        rows.append({
-            "unita_formativa_id": i,
-            "titolo": f"Modulo: {topic} Avanzato",
-            "descrizione": f"Approfondimento pratico su {topic}",
-            "ore": random.choice([20,40,60,80]),
-            "is_deleted": 0
-        })
-    return rows
-
-def gen_corso_uf(n, corsi, unita, docenti):
-    pairs = set()
-    rows = []
-    cid = 1
-    attempts = 0
-    while len(rows) < n and attempts < n*10:
-        attempts += 1
-        corso = random.choice(corsi)
-        uf = random.choice(unita)
-        key = (corso["corso_id"], uf["unita_formativa_id"])
-        if key in pairs:
-            continue
-        pairs.add(key)
-        rows.append({
-            "corso_uf_id": cid,
-            "corso_id": corso["corso_id"],
-            "unita_formativa_id": uf["unita_formativa_id"],
-            "docente_id": random.choice(docenti)["docente_id"],
-            "attivo": 1,
-            "ore_assegnate": uf["ore"],
-            "is_deleted": 0
-        })
-        cid += 1
-    return rows
-
-def gen_lezioni(n, corso_uf_list, docenti, aule):
-    rows = []
-    lesson_id = 1
-    start_date = date.today() - timedelta(days=365)
-    for _ in range(n):
-        corso_uf = random.choice(corso_uf_list)
-        docente = random.choice(docenti)
-        aula = random.choice(aule)
-        d = start_date + timedelta(days=random.randint(0, 365))
-        start_dt = datetime.combine(d, datetime.min.time()) + timedelta(hours=random.choice([9,11,14,16]))
-        duration = random.choice([60,90,120])
-        end_dt = start_dt + timedelta(minutes=duration)
-        rows.append({
-            "lezione_id": lesson_id,
-            "corso_uf_id": corso_uf["corso_uf_id"],
-            "docente_id": docente["docente_id"],
-            "aula_id": aula["aula_id"],
-            "data_ora_inizio": start_dt.isoformat(sep=' '),
-            "data_ora_fine": end_dt.isoformat(sep=' '),
-            "is_deleted": 0
-        })
-        lesson_id += 1
-    return rows
-
-def gen_iscrizioni(students, corsi):
-    rows = []
-    i = 1
-    for s in students:
-        corso = random.choice(corsi)
-        rows.append({
-            "iscrizione_id": i,
-            "studente_id": s["studente_id"],
-            "corso_id": corso["corso_id"],
-            "data_iscrizione": (date.today() - timedelta(days=random.randint(0,900))).isoformat(),
-            "stato": random.choice(["attivo","completato","ritirato"]),
-            "is_deleted": 0
-        })
-        i += 1
-    return rows
-
-def gen_tutor_corso(n, tutors, corsi):
-    rows = []
-    seen = set()
-    i = 1
-    attempts = 0
-    while len(rows) < n and attempts < n*10:
-        attempts += 1
-        t = random.choice(tutors)
-        c = random.choice(corsi)
-        key = (t["tutor_id"], c["corso_id"])
-        if key in seen:
-            continue
-        seen.add(key)
-        rows.append({
-            "tutor_corso_id": i,
-            "tutor_id": t["tutor_id"],
-            "corso_id": c["corso_id"],
-            "data_inizio": (date.today() - timedelta(days=random.randint(0,900))).isoformat(),
-            "is_deleted": 0
-        })
-        i += 1
-    return rows
-
-def gen_valutazioni(n, students, corso_uf_list, docenti):
-    rows = []
-    i = 1
-    for _ in range(n):
-        corso_uf = random.choice(corso_uf_list)
-        stud = random.choice(students)
-        docente = random.choice(docenti)
-        voto = round(random.uniform(0, 30), 2)
-        if voto >= 18:
-            esito = "superato"
-        elif voto == 0:
-            esito = "in corso"
-        else:
-            esito = "non superato"
-        rows.append({
-            "valutazione_id": i,
-            "studente_id": stud["studente_id"],
-            "unita_formativa_id": corso_uf["unita_formativa_id"],
-            "corso_id": corso_uf["corso_id"],
-            "corso_uf_id": corso_uf["corso_uf_id"],
-            "docente_id": docente["docente_id"],
-            "data_valutazione": (date.today() - timedelta(days=random.randint(0,720))).isoformat(),
-            "voto": voto,
-            "esito": esito,
-            "is_deleted": 0
-        })
-        i += 1
-    return rows
-
-# --- Main ---
-def main():
-    out = make_output_folder("csv_out")
-    sedi = gen_sedi(N_SEDI)
-    aule = gen_aule(N_AULE, sedi)
-    corsi = gen_corsi(N_CORSI, sedi)
-    docenti = gen_docenti(N_DOCENTI)
-    tutors = gen_tutors(N_TUTOR)
-    studenti = gen_studenti(N_STUDENTI)
-    unita = gen_unita(N_UNITA)
-    corso_uf = gen_corso_uf(N_CORSO_UF, corsi, unita, docenti)
-    lezioni = gen_lezioni(N_LEZIONI, corso_uf, docenti, aule)
-    iscrizioni = gen_iscrizioni(studenti, corsi)
-    tutor_corsi = gen_tutor_corso(N_TUTOR_CORSO, tutors, corsi)
-    valutazioni = gen_valutazioni(N_VALUTAZIONI, studenti, corso_uf, docenti)
-
-    write_csv(out/"sede.csv", ["sede_id","nome","indirizzo","citta","cap","is_deleted"], sedi)
-    write_csv(out/"aula.csv", ["aula_id","nome","capienza","sede_id","is_deleted"], aule)
-    write_csv(out/"corso.csv", ["corso_id","titolo","descrizione","ore_totali","modalita","sede_id","attivo","is_deleted"], corsi)
-    write_csv(out/"docente.csv", ["docente_id","nome","cognome","codice_fiscale","email","telefono","is_deleted"], docenti)
-    write_csv(out/"tutor.csv", ["tutor_id","nome","cognome","email","telefono","is_deleted"], tutors)
-    write_csv(out/"studente.csv", ["studente_id","nome","cognome","data_nascita","codice_fiscale","email","indirizzo","citta","is_deleted"], studenti)
-    write_csv(out/"unita_formativa.csv", ["unita_formativa_id","titolo","descrizione","ore","is_deleted"], unita)
-    write_csv(out/"corso_uf.csv", ["corso_uf_id","corso_id","unita_formativa_id","docente_id","attivo","ore_assegnate","is_deleted"], corso_uf)
-    write_csv(out/"lezione.csv", ["lezione_id","corso_uf_id","docente_id","aula_id","data_ora_inizio","data_ora_fine","is_deleted"], lezioni)
-    write_csv(out/"iscrizione.csv", ["iscrizione_id","studente_id","corso_id","data_iscrizione","stato","is_deleted"], iscrizioni)
-    write_csv(out/"tutor_corso.csv", ["tutor_corso_id","tutor_id","corso_id","data_inizio","is_deleted"], tutor_corsi)
-    write_csv(out/"valutazione.csv", ["valutazione_id","studente_id","unita_formativa_id","corso_id","corso_uf_id","docente_id","data_valutazione","voto","esito","is_deleted"], valutazioni)
-
-if __name__ == "__main__":
-    main()
+from array import array
+from pathlib import Path
+from datetime import date, timedelta
+import sys
+
+import numpy as np
+
+# datagen lives at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from datagen import dates, engine, vector  # noqa: E402
+from datagen.distributions import Seasonal, Zipf  # noqa: E402
+from datagen.engine import Schema, Table  # noqa: E402
+from datagen.keys import KeySpace  # noqa: E402
+
+# Configuration
+N_SEDI = 3
+N_AULE = 8
+N_CORSI = 4
+N_DOCENTI = 8
+N_TUTOR = 4
+N_STUDENTI = 60
+N_UNITA = 12
+N_CORSO_UF = 18
+N_LEZIONI = 300
+N_ISCRIZIONI = N_STUDENTI
+N_TUTOR_CORSO = 6
+N_VALUTAZIONI = 450
+
+# Per-shard seeds are derived from (RANDOM_SEED, table, shard), see datagen.sharding
+RANDOM_SEED = 1234
+# Grades over roughly the last two years
+VALUTAZIONI_END = date.today()
+VALUTAZIONI_START = VALUTAZIONI_END - timedelta(days=720)
+# Lessons over the last year, in four time slots (starting at 9, 11, 14 and 16:
+# they last at most two hours, so different slots never overlap)
+LEZIONI_DAYS = 365
+FASCE = [9, 11, 14, 16]
+
+# Non-uniform columns (datagen.distributions), changed with --dist or
+# --uniform: lessons on weekdays and almost none in August, a few heavily
+# used rooms, grades concentrated in the exam sessions
+DISTRIBUTIONS = {
+    "lezione.data_ora_inizio": Seasonal(weekday=(1, 1, 1, 1, 1, 0.2, 0),
+                                        month=(1, 1, 1, 1, 1, 0.8, 0.5, 0.05, 1, 1, 1, 0.8)),
+    "lezione.aula_id": Zipf(0.8),
+    "valutazione.corso_uf_id": Zipf(0.7),
+    "valutazione.data_valutazione": Seasonal(weekday=(1, 1, 1, 1, 1, 0.1, 0),
+                                             month=(1.5, 1.5, 0.6, 0.6, 0.8, 1.5, 1.5, 0.1, 1.3, 0.6, 0.6, 0.8)),
+}
+
+# --- Generators ---
+# Each gen_* receives a shard (an ID range with its own generators) and
+# yields tuples in the DDL column order; texts come from the cached Faker
+# pools (shard.sample) instead of calling Faker per row; emails and codici
+# fiscali are unique (shard.unique_sample / unique_codes)
+def gen_sedi(shard):
+    columns = zip(shard.ids(), shard.sample("city"), shard.sample("street_address"),
+                  shard.sample("city"), shard.sample("postcode"))
+    for i, campus, indirizzo, citta, cap in columns:
+        yield (
+            i,                   # sede_id
+            f"{campus} Campus",  # nome
+            indirizzo,           # indirizzo
+            citta,               # citta
+            cap,                 # cap
+            0,                   # is_deleted
+        )
+
+def gen_aule(shard, sede_ids):
+    rng = shard.rng
+    for i in shard.ids():
+        yield (
+            i,                                    # aula_id
+            f"Aula {chr(64 + (i%26 or 26))}{i}",  # nome
+            rng.randint(15, 50),                  # capienza
+            rng.choice(sede_ids),                 # sede_id
+            0,                                    # is_deleted
+        )
+
+def gen_corsi(shard, sede_ids):
+    modalities = ["presenza", "online", "blended"]
+    corsi_names = ["Full-Stack Developer", "Cybersecurity", "Data Science", "UX/UI Design"]
+    rng = shard.rng
+    for i in shard.ids():
+        yield (
+            i,                                                     # corso_id
+            corsi_names[i-1],                                      # titolo
+            f"Percorso formativo avanzato in {corsi_names[i-1]}",  # descrizione
+            rng.choice([300, 600, 900]),                           # ore_totali
+            rng.choice(modalities),                                # modalita
+            rng.choice(sede_ids),                                  # sede_id
+            1,                                                     # attivo
+            0,                                                     # is_deleted
+        )
+
+def gen_docenti(shard):
+    columns = zip(shard.ids(), shard.sample("first_name"), shard.sample("last_name"),
+                  shard.unique_codes(14), shard.unique_sample("email"), shard.sample("phone_number"))
+    for i, nome, cognome, codice_fiscale, email, telefono in columns:
+        yield (
+            i,               # docente_id
+            nome,            # nome
+            cognome,         # cognome
+            codice_fiscale,  # codice_fiscale
+            email,           # email
+            telefono,        # telefono
+            0,               # is_deleted
+        )
+
+def gen_tutors(shard):
+    columns = zip(shard.ids(), shard.sample("first_name"), shard.sample("last_name"),
+                  shard.unique_sample("email"), shard.sample("phone_number"))
+    for i, nome, cognome, email, telefono in columns:
+        yield (
+            i,         # tutor_id
+            nome,      # nome
+            cognome,   # cognome
+            email,     # email
+            telefono,  # telefono
+            0,         # is_deleted
+        )
+
+def gen_studenti(shard):
+    gen, n = shard.np, len(shard)
+    # 85% tra 18 e 28 anni, 15% tra 31 e 45 anni
+    age = np.where(gen.random(n) < 0.85, gen.integers(18, 29, size=n), gen.integers(31, 46, size=n))
+    nascita = vector.iso_dates(date.today(), -(age * 365 + vector.day_offsets(gen, 365, n)))
+    columns = zip(shard.ids(), shard.sample("first_name"), shard.sample("last_name"), nascita,
+                  shard.unique_codes(14), shard.unique_sample("email"), shard.sample("street_address"),
+                  shard.sample("city"))
+    for i, nome, cognome, data_nascita, codice_fiscale, email, indirizzo, citta in columns:
+        yield (
+            i,               # studente_id
+            nome,            # nome
+            cognome,         # cognome
+            data_nascita,    # data_nascita
+            codice_fiscale,  # codice_fiscale
+            email,           # email
+            indirizzo,       # indirizzo
+            citta,           # citta
+            0,               # is_deleted
+        )
+
+def gen_unita(shard):
+    uf_topics = ["Frontend", "Backend", "Networking", "Cybersecurity", "UX", "Data Analysis", "Machine Learning", "Design Thinking"]
+    rng = shard.rng
+    for i in shard.ids():
+        topic = rng.choice(uf_topics)
+        yield (
+            i,                                      # unita_formativa_id
+            f"Modulo: {topic} Avanzato",            # titolo
+            f"Approfondimento pratico su {topic}",  # descrizione
+            rng.choice([20,40,60,80]),              # ore
+            0,                                      # is_deleted
+        )
+
+# Unique (corso, unità) pairs: each row takes the pair at position ID - 1 of
+# a permutation of the corso x unità space (datagen.keys), with no rejects;
+# asking for more rows than there are pairs stops the generation with an error
+def gen_corso_uf(shard, corso_ids, ore_unita, docente_ids):
+    corsi, unita = shard.unique_keys(KeySpace(corso_ids, range(1, len(ore_unita) + 1)))
+    columns = zip(shard.ids(), corsi, unita, vector.pick_ids(shard.np, docente_ids, len(shard)))
+    for cid, corso_id, uf_id, docente_id in columns:
+        yield (
+            cid,                   # corso_uf_id
+            corso_id,              # corso_id
+            uf_id,                 # unita_formativa_id
+            docente_id,            # docente_id
+            1,                     # attivo
+            ore_unita[uf_id - 1],  # ore_assegnate
+            0,                     # is_deleted
+        )
+
+# Lessons: corso_uf, day, time slot, duration and preferred room are drawn in
+# bulk (days and rooms follow DISTRIBUTIONS); the teacher is the one assigned
+# to the corso_uf. Each lesson takes the teacher's first free slot from the
+# drawn day and time and, in that slot, the first free room from the
+# preferred one (occupancy indexes, see Occupazione): no room or teacher is
+# booked twice and no draw is wasted. The occupancy lives in the main
+# process, so the shards run here one after the other.
+def gen_lezioni(shard, corsi_uf, aula_ids, docenti, aule, day_dist, aula_dist):
+    gen, n = shard.np, len(shard)
+    start_date = date.today() - timedelta(days=LEZIONI_DAYS)
+    cuf = vector.pick_ids(gen, range(1, len(corsi_uf) + 1), n)
+    wanted = (day_dist.days(gen, start_date, LEZIONI_DAYS, n) * len(FASCE)
+              + gen.integers(0, len(FASCE), size=n)).tolist()
+    minutes = gen.choice([60, 90, 120], size=n)
+    preferred = aula_dist.positions(gen, n, len(aula_ids)).tolist()
+    docente_ids, slots, aula_pos = [], [], []
+    for lesson_id, corso_uf_id, slot, aula in zip(shard.ids(), cuf, wanted, preferred):
+        docente = int(corsi_uf.docente[corso_uf_id - 1]) - 1
+        # the teacher's first free slot with a free room (usually the first one tried)
+        for _ in range(docenti.columns):
+            slot = docenti.free(docente, slot)
+            if slot is None:
+                break
+            free_aula = aule.free(slot, aula)
+            if free_aula is not None:
+                break
+            slot += 1
+        else:
+            slot = None
+        if slot is None:
+            raise ValueError(f"lesson {lesson_id}: no free slot with a free room for teacher {docente + 1}: "
+                             f"too many lessons for the teachers and rooms")
+        docenti.take(docente, slot)
+        aule.take(slot, free_aula)
+        docente_ids.append(docente + 1)
+        slots.append(slot)
+        aula_pos.append(free_aula)
+    slots = np.asarray(slots, dtype="int64")
+    start_s = slots // len(FASCE) * 86400 + np.asarray(FASCE)[slots % len(FASCE)] * 3600
+    columns = zip(
+        shard.ids(),
+        cuf,
+        docente_ids,
+        (np.asarray(aula_pos, dtype="int64") + aula_ids.start).tolist(),
+        vector.iso_datetimes(start_date, start_s),
+        vector.iso_datetimes(start_date, start_s + minutes * 60),
+    )
+    for lesson_id, corso_uf_id, docente_id, aula_id, inizio, fine in columns:
+        yield (
+            lesson_id,    # lezione_id
+            corso_uf_id,  # corso_uf_id
+            docente_id,   # docente_id
+            aula_id,      # aula_id
+            inizio,       # data_ora_inizio
+            fine,         # data_ora_fine
+            0,            # is_deleted
+        )
+
+# One enrolment per student: shards over the student IDs
+def gen_iscrizioni(shard, corso_ids):
+    rng = shard.rng
+    today = dates.day(date.today())
+    for studente_id in shard.ids():
+        yield (
+            studente_id,                                     # iscrizione_id
+            studente_id,                                     # studente_id
+            rng.choice(corso_ids),                           # corso_id
+            dates.iso_day(today - rng.randint(0,900)),       # data_iscrizione
+            rng.choice(["attivo","completato","ritirato"]),  # stato
+            0,                                               # is_deleted
+        )
+
+# Unique (tutor, corso) pairs, allocated as in gen_corso_uf
+def gen_tutor_corso(shard, tutor_ids, corso_ids):
+    gen, n = shard.np, len(shard)
+    tutors, corsi = shard.unique_keys(KeySpace(tutor_ids, corso_ids))
+    inizio = vector.iso_dates(date.today(), -vector.day_offsets(gen, 900, n))
+    for i, t, c, data_inizio in zip(shard.ids(), tutors, corsi, inizio):
+        yield (
+            i,            # tutor_corso_id
+            t,            # tutor_id
+            c,            # corso_id
+            data_inizio,  # data_inizio
+            0,            # is_deleted
+        )
+
+# Grade, outcome, date (between start and end) and keys are drawn in bulk with
+# numpy. Only corsi_uf whose corso has students are graded: the student is
+# enrolled in the corso_uf's corso and the teacher is the one assigned to the
+# corso_uf, both read from the indexes (Iscritti, CorsiUF) with no rejects
+def gen_valutazioni(shard, iscritti, corsi_uf, start, end, corso_uf_dist, day_dist):
+    gen, n = shard.np, len(shard)
+    voti = np.round(gen.uniform(0, 30, size=n), 2)
+    esiti = np.where(voti >= 18, "superato", np.where(voti == 0, "in corso", "non superato"))
+    valutabili = corsi_uf.with_students(iscritti)
+    if len(valutabili) == 0:
+        raise ValueError("grades: no course subject has students enrolled in its course")
+    cuf = valutabili[corso_uf_dist.positions(gen, n, len(valutabili))]
+    corsi = corsi_uf.corso[cuf - 1]
+    columns = zip(
+        shard.ids(),
+        cuf.tolist(),
+        corsi.tolist(),
+        corsi_uf.unita[cuf - 1].tolist(),
+        corsi_uf.docente[cuf - 1].tolist(),
+        iscritti.sample(gen, corsi).tolist(),
+        vector.iso_dates(start, day_dist.days(gen, start, (end - start).days, n)),
+        voti.tolist(),
+        esiti.tolist(),
+    )
+    for i, corso_uf_id, corso_id, uf_id, docente_id, studente_id, data_valutazione, voto, esito in columns:
+        yield (
+            i,                 # valutazione_id
+            studente_id,       # studente_id
+            uf_id,             # unita_formativa_id
+            corso_id,          # corso_id
+            corso_uf_id,       # corso_uf_id
+            docente_id,        # docente_id
+            data_valutazione,  # data_valutazione
+            voto,              # voto
+            esito,             # esito
+            0,                 # is_deleted
+        )
+
+# --- Consistency indexes ---
+# Built once by the `keep` hooks while the parent rows stream past, then used
+# by the children's gen_* to draw only valid combinations in O(1)
+
+class Iscritti:
+    """Students enrolled in each corso (from iscrizione), grouped by corso."""
+
+    def __init__(self):
+        self._corso = array("I")
+        self._studente = array("I")
+        self.students = self.offsets = self.counts = None
+
+    def add(self, corso_id, studente_id):
+        self._corso.append(corso_id)
+        self._studente.append(studente_id)
+
+    # Students sorted by corso: those of corso c are
+    # students[offsets[c]:offsets[c] + counts[c]]
+    def finish(self, n_corsi):
+        corso = np.frombuffer(self._corso, dtype="uint32").astype("int64")
+        order = np.argsort(corso, kind="stable")
+        self.students = np.frombuffer(self._studente, dtype="uint32").astype("int64")[order]
+        self.counts = np.bincount(corso, minlength=n_corsi + 1)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)[:-1]))
+        self._corso = self._studente = None
+
+    def sample(self, gen, corsi):
+        """One random enrolled student for each corso in `corsi` (all of which have students)."""
+        corsi = np.asarray(corsi, dtype="int64")
+        pos = self.offsets[corsi] + (gen.random(len(corsi)) * self.counts[corsi]).astype("int64")
+        return self.students[pos]
+
+
+class CorsiUF:
+    """Corso, unità formativa and docente of each corso_uf (position = corso_uf_id - 1)."""
+
+    def __init__(self):
+        self._columns = (array("I"), array("I"), array("I"))
+        self.corso = self.unita = self.docente = None
+
+    def __len__(self):
+        return len(self._columns[0]) if self.corso is None else len(self.corso)
+
+    def add(self, corso_id, uf_id, docente_id):
+        for column, value in zip(self._columns, (corso_id, uf_id, docente_id)):
+            column.append(value)
+
+    def finish(self):
+        self.corso, self.unita, self.docente = (np.frombuffer(c, dtype="uint32").astype("int64")
+                                                for c in self._columns)
+        self._columns = None
+
+    # IDs of the corsi_uf whose corso has at least one student
+    def with_students(self, iscritti):
+        return np.flatnonzero(iscritti.counts[self.corso] > 0) + 1
+
+
+class Occupazione:
+    """
+    Taken cells of a rows x columns grid (docente x slot, slot x aula).
+    Each row is a "next free" union-find: `free(r, c)` returns the first free
+    column from `c` on (wrapping around to 0, None if the row is full) in
+    near-constant time, and taking a cell links it to the next one. Each row
+    ends with a sentinel cell that is never taken.
+    """
+
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self._next = array("i")
+        self._next.frombytes(np.arange(rows * (columns + 1), dtype=np.int32).tobytes())
+
+    def _find(self, i):
+        nxt = self._next
+        root = i
+        while nxt[root] != root:
+            root = nxt[root]
+        while nxt[i] != root:
+            nxt[i], i = root, nxt[i]
+        return root
+
+    def free(self, row, column):
+        base = row * (self.columns + 1)
+        found = self._find(base + min(column, self.columns)) - base
+        if found == self.columns:
+            found = self._find(base) - base
+        return None if found == self.columns else found
+
+    def is_free(self, row, column):
+        i = row * (self.columns + 1) + column
+        return self._next[i] == i
+
+    def take(self, row, column):
+        i = row * (self.columns + 1) + column
+        self._next[i] = i + 1
+
+# Remember the hours of each unità formativa (corso_uf needs them) as the rows stream past
+def keep_ore(ctx, unita):
+    ore_unita = ctx.state["ore_unita"] = array("H")
+    ore = ctx.schema["unita_formativa"].getter("ore")
+    for u in unita:
+        ore_unita.append(ore(u))
+        yield u
+
+# Index of the corsi_uf (corso, unità, docente) for lessons and grades
+def keep_corso_uf(ctx, rows):
+    corsi_uf = ctx.state["corsi_uf"] = CorsiUF()
+    keys = ctx.schema["corso_uf"].getter("corso_id", "unita_formativa_id", "docente_id")
+    for row in rows:
+        corsi_uf.add(*keys(row))
+        yield row
+    corsi_uf.finish()
+
+# Index corso -> enrolled students for the grades
+def keep_iscrizioni(ctx, rows):
+    iscritti = ctx.state["iscritti"] = Iscritti()
+    keys = ctx.schema["iscrizione"].getter("corso_id", "studente_id")
+    for row in rows:
+        iscritti.add(*keys(row))
+        yield row
+    iscritti.finish(ctx.last["corso"])
+
+# Teacher and room occupancy per lesson slot (day x time slot)
+def lezione_args(ctx):
+    slots = (LEZIONI_DAYS + 1) * len(FASCE)
+    aula_ids = ctx.ids("aula")
+    return (ctx.state["corsi_uf"], aula_ids, Occupazione(ctx.last["docente"], slots),
+            Occupazione(slots, len(aula_ids)), ctx.distribution("lezione.data_ora_inizio"),
+            ctx.distribution("lezione.aula_id"))
+
+# --- Schema ---
+# Columns, types, keys and lengths come from the DDL (attivita_didattiche.sql);
+# datagen.engine generates the tables in FK order; with --append only new
+# grades (delta) are generated, after the latest date of the previous folder
+SCHEMA = Schema("attivita_didattiche", seed=RANDOM_SEED, sql=Path(__file__).with_name("attivita_didattiche.sql"),
+                tables=[
+    Table("sede", gen_sedi, N_SEDI),
+    Table("aula", gen_aule, N_AULE, args=lambda ctx: (ctx.ids("sede"),)),
+    # the courses are a fixed list: --scale does not multiply them
+    Table("corso", gen_corsi, N_CORSI, args=lambda ctx: (ctx.ids("sede"),), scaled=False),
+    Table("docente", gen_docenti, N_DOCENTI),
+    Table("tutor", gen_tutors, N_TUTOR),
+    Table("studente", gen_studenti, N_STUDENTI),
+    Table("unita_formativa", gen_unita, N_UNITA, keep=keep_ore),
+    Table("corso_uf", gen_corso_uf, N_CORSO_UF,
+          args=lambda ctx: (ctx.ids("corso"), ctx.state["ore_unita"], ctx.ids("docente")), keep=keep_corso_uf),
+    # teacher and room occupancy lives in the main process
+    Table("lezione", gen_lezioni, N_LEZIONI, args=lezione_args, parallel=False),
+    # one enrolment per student: shards over the student IDs
+    Table("iscrizione", gen_iscrizioni, N_ISCRIZIONI, args=lambda ctx: (ctx.ids("corso"),), keep=keep_iscrizioni),
+    Table("tutor_corso", gen_tutor_corso, N_TUTOR_CORSO, args=lambda ctx: (ctx.ids("tutor"), ctx.ids("corso"))),
+    # students are drawn among the enrolled ones: iscrizione comes first even though it is not an FK
+    Table("valutazione", gen_valutazioni, N_VALUTAZIONI, delta="data_valutazione", after="iscrizione",
+          args=lambda ctx: (ctx.state["iscritti"], ctx.state["corsi_uf"],
+                            *ctx.window(VALUTAZIONI_START, VALUTAZIONI_END),
+                            ctx.distribution("valutazione.corso_uf_id"),
+                            ctx.distribution("valutazione.data_valutazione"))),
+], calendar=lambda ctx: ctx.window(VALUTAZIONI_START, VALUTAZIONI_END), distributions=DISTRIBUTIONS)
+
+# --- Main ---
+def main():
+    engine.main(SCHEMA, description="Generatore CSV per attivita_didattiche")
+
+if __name__ == "__main__":
+    main()
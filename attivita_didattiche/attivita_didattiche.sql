@@ -37,7 +37,9 @@ CREATE TABLE docente (
   codice_fiscale VARCHAR(16),
   email VARCHAR(100),
   telefono VARCHAR(30),
-  is_deleted TINYINT(1) NOT NULL DEFAULT 0
+  is_deleted TINYINT(1) NOT NULL DEFAULT 0,
+  CONSTRAINT uq_docente_cf UNIQUE (codice_fiscale),
+  CONSTRAINT uq_docente_email UNIQUE (email)
 );
 
 CREATE TABLE tutor (
@@ -46,7 +48,8 @@ CREATE TABLE tutor (
   cognome VARCHAR(80),
   email VARCHAR(100),
   telefono VARCHAR(30),
-  is_deleted TINYINT(1) NOT NULL DEFAULT 0
+  is_deleted TINYINT(1) NOT NULL DEFAULT 0,
+  CONSTRAINT uq_tutor_email UNIQUE (email)
 );
 
 CREATE TABLE studente (
@@ -58,7 +61,9 @@ CREATE TABLE studente (
   email VARCHAR(100),
   indirizzo VARCHAR(200),
   citta VARCHAR(80),
-  is_deleted TINYINT(1) NOT NULL DEFAULT 0
+  is_deleted TINYINT(1) NOT NULL DEFAULT 0,
+  CONSTRAINT uq_studente_cf UNIQUE (codice_fiscale),
+  CONSTRAINT uq_studente_email UNIQUE (email)
 );
 
 CREATE TABLE unita_formativa (
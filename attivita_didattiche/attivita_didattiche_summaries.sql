@@ -0,0 +1,127 @@
+-- Riepiloghi materializzati di attivita_didattiche/attivita_didattiche.sql, aggiornati in modo incrementale.
+-- Generato da: python -m datagen.summaries sql attivita_didattiche
+-- Refresh: CALL Refresh_<report>(); dopo modifiche a righe già elaborate: CALL Rebuild_<report>();
+
+CREATE TABLE IF NOT EXISTS Summary_Watermark (
+    Summary VARCHAR(64) NOT NULL,
+    SourceTable VARCHAR(64) NOT NULL,
+    LastID BIGINT,
+    RefreshedAt DATETIME,
+    PRIMARY KEY (Summary, SourceTable)
+);
+
+CREATE TABLE IF NOT EXISTS mv_media_voti_uf (
+    corso_id INT NOT NULL,
+    unita_formativa_id INT NOT NULL,
+    corso VARCHAR(150),
+    unita_formativa VARCHAR(150),
+    somma_voti DECIMAL(14,2),
+    n_voti BIGINT,
+    PRIMARY KEY (corso_id, unita_formativa_id)
+);
+
+CREATE OR REPLACE VIEW v_media_voti_uf AS
+SELECT corso_id, unita_formativa_id, corso, unita_formativa,
+       CASE WHEN n_voti > 0 THEN ROUND(somma_voti * 1.0 / n_voti, 2) END AS media_voti
+FROM mv_media_voti_uf;
+
+CREATE TABLE IF NOT EXISTS mv_media_voti_studente (
+    studente_id INT NOT NULL,
+    nome VARCHAR(60),
+    cognome VARCHAR(80),
+    somma_voti DECIMAL(14,2),
+    n_voti BIGINT,
+    PRIMARY KEY (studente_id)
+);
+
+CREATE OR REPLACE VIEW v_media_voti_studente AS
+SELECT studente_id, nome, cognome,
+       CASE WHEN n_voti > 0 THEN ROUND(somma_voti * 1.0 / n_voti, 2) END AS media_globale
+FROM mv_media_voti_studente;
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS Refresh_v_media_voti_uf$$
+CREATE PROCEDURE Refresh_v_media_voti_uf()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di valutazione
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'v_media_voti_uf' AND SourceTable = 'valutazione';
+    SELECT IFNULL(MAX(valutazione_id), 0) INTO v_hi FROM valutazione;
+    IF v_hi > v_lo THEN
+        INSERT INTO mv_media_voti_uf (corso_id, unita_formativa_id, corso, unita_formativa, somma_voti, n_voti)
+        SELECT * FROM (
+                    SELECT c.corso_id AS corso_id, uf.unita_formativa_id AS unita_formativa_id,
+                           c.titolo AS corso, uf.titolo AS unita_formativa,
+                           COALESCE(SUM(v.voto), 0) AS somma_voti, COUNT(v.voto) AS n_voti
+                    FROM valutazione v
+                    JOIN studente s ON v.studente_id = s.studente_id AND s.is_deleted = 0
+                    JOIN corso c ON v.corso_id = c.corso_id AND c.is_deleted = 0
+                    JOIN unita_formativa uf ON v.unita_formativa_id = uf.unita_formativa_id AND uf.is_deleted = 0
+                    WHERE v.is_deleted = 0 AND v.valutazione_id > v_lo AND v.valutazione_id <= v_hi
+                    GROUP BY c.corso_id, uf.unita_formativa_id, c.titolo, uf.titolo) AS d
+        ON DUPLICATE KEY UPDATE
+            corso = VALUES(corso),
+            unita_formativa = VALUES(unita_formativa),
+            somma_voti = mv_media_voti_uf.somma_voti + VALUES(somma_voti),
+            n_voti = mv_media_voti_uf.n_voti + VALUES(n_voti);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'v_media_voti_uf' AS Summary, 'valutazione' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_v_media_voti_uf$$
+CREATE PROCEDURE Rebuild_v_media_voti_uf()
+BEGIN
+    DELETE FROM mv_media_voti_uf;
+    DELETE FROM Summary_Watermark WHERE Summary = 'v_media_voti_uf';
+    CALL Refresh_v_media_voti_uf();
+END$$
+
+DROP PROCEDURE IF EXISTS Refresh_v_media_voti_studente$$
+CREATE PROCEDURE Refresh_v_media_voti_studente()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di valutazione
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'v_media_voti_studente' AND SourceTable = 'valutazione';
+    SELECT IFNULL(MAX(valutazione_id), 0) INTO v_hi FROM valutazione;
+    IF v_hi > v_lo THEN
+        INSERT INTO mv_media_voti_studente (studente_id, nome, cognome, somma_voti, n_voti)
+        SELECT * FROM (
+                    SELECT s.studente_id AS studente_id, s.nome AS nome, s.cognome AS cognome,
+                           COALESCE(SUM(v.voto), 0) AS somma_voti, COUNT(v.voto) AS n_voti
+                    FROM valutazione v
+                    JOIN studente s ON v.studente_id = s.studente_id AND s.is_deleted = 0
+                    JOIN corso c ON v.corso_id = c.corso_id AND c.is_deleted = 0
+                    JOIN unita_formativa uf ON v.unita_formativa_id = uf.unita_formativa_id AND uf.is_deleted = 0
+                    WHERE v.is_deleted = 0 AND v.valutazione_id > v_lo AND v.valutazione_id <= v_hi
+                    GROUP BY s.studente_id, s.nome, s.cognome) AS d
+        ON DUPLICATE KEY UPDATE
+            nome = VALUES(nome),
+            cognome = VALUES(cognome),
+            somma_voti = mv_media_voti_studente.somma_voti + VALUES(somma_voti),
+            n_voti = mv_media_voti_studente.n_voti + VALUES(n_voti);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'v_media_voti_studente' AS Summary, 'valutazione' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_v_media_voti_studente$$
+CREATE PROCEDURE Rebuild_v_media_voti_studente()
+BEGIN
+    DELETE FROM mv_media_voti_studente;
+    DELETE FROM Summary_Watermark WHERE Summary = 'v_media_voti_studente';
+    CALL Refresh_v_media_voti_studente();
+END$$
+
+DELIMITER ;
@@ -0,0 +1,62 @@
+"""
+bench_copy_store.py
+-------------------
+Micro-benchmark dell'inventario copie (`CopyStore`) usato da gen_rentals.
+Per ogni dimensione riempie l'inventario e prenota noleggi di 0-60 giorni in
+una finestra di un anno, `--per-copy` noleggi per copia noleggiabile (la
+copia libera si cerca nel calendario delle prenotazioni): il tempo per
+noleggio deve crescere al più in modo logaritmico con i noleggi per copia, e
+restare costante con il numero di copie.
+
+Uso: python benchmarks/bench_copy_store.py [--max 1000000] [--per-copy 4]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from biblioteca import BOOK_CONDITIONS, BOOK_STATUSES, CopyStore  # noqa: E402
+
+WINDOW_DAYS = 365
+
+
+def run(n_copies, per_copy, rng):
+    store = CopyStore()
+    t0 = time.perf_counter()
+    for i in range(n_copies):
+        store.add(i // 3 + 1, i % 3 + 1,
+                  rng.randrange(len(BOOK_STATUSES)),
+                  rng.randrange(len(BOOK_CONDITIONS)))
+    t1 = time.perf_counter()
+    n_rentals = store.rentable_count() * per_copy
+    booked = 0
+    for _ in range(n_rentals):
+        start = rng.randrange(WINDOW_DAYS)
+        end = min(WINDOW_DAYS - 1, start + rng.randrange(61))
+        booked += store.book(rng, start, end) is not None
+    t2 = time.perf_counter()
+    return t1 - t0, t2 - t1, n_rentals, booked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max", type=int, default=1_000_000, help="numero massimo di copie")
+    parser.add_argument("--per-copy", type=int, default=4, help="noleggi per copia noleggiabile")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'copie':>12} {'noleggi':>10} {'prenotati':>10} {'fill s':>8} {'book s':>8} "
+          f"{'ns/copia':>9} {'ns/noleggio':>11}")
+    n = 10_000
+    while n <= args.max:
+        fill, book, n_rentals, booked = run(n, args.per_copy, rng)
+        print(f"{n:>12,} {n_rentals:>10,} {booked:>10,} {fill:>8.2f} {book:>8.2f} "
+              f"{fill / n * 1e9:>9.0f} {book / max(n_rentals, 1) * 1e9:>11.0f}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    main()
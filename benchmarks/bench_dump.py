@@ -0,0 +1,73 @@
+"""
+bench_dump.py
+-------------
+Tempo di import di un dump SQL (`--format sql`, datagen.dump) al variare
+delle righe per INSERT. Per ogni valore di `--rows` genera il dump del
+database alla scala indicata, con un COMMIT ogni `--commit-rows` righe
+(transazioni della stessa dimensione per tutti i valori), e lo esegue con
+datagen.loader su un database di prova: SQLite temporaneo di default, oppure
+MariaDB/MySQL con `--url` (il dump ricrea le tabelle). Con `--rows 1` si
+misura l'import riga per riga, il riferimento per gli INSERT multi-riga.
+
+Uso:
+    python benchmarks/bench_dump.py --database biblioteca --scale 100
+    python benchmarks/bench_dump.py --rows 1,1000 --url mysql://root@localhost/bench
+"""
+import argparse
+import importlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_generators import GENERATORS  # noqa: E402
+from bench_queries import DATABASES  # noqa: E402
+from datagen import engine  # noqa: E402
+from datagen.loader import load_folder  # noqa: E402
+
+ROWS = "1,10,100,1000"
+COMMIT_ROWS = 100_000
+
+
+def run(name, scale, rows_per_insert, commit_rows, url, tmp):
+    """Genera e importa il dump; restituisce (righe, byte del dump, secondi di scrittura, secondi di import)."""
+    schema = importlib.import_module(GENERATORS[name]).SCHEMA
+    folder = tmp / f"{schema.folder}_{rows_per_insert}"
+    folder.mkdir()
+    t0 = time.perf_counter()
+    ctx = engine.run(schema, folder, fmt="sql", scale=scale, sql_rows=rows_per_insert,
+                     sql_commit=max(1, commit_rows // rows_per_insert))
+    written = time.perf_counter() - t0
+    size = (folder / ctx.dump).stat().st_size
+    t0 = time.perf_counter()
+    stats = load_folder(folder, url or f"sqlite:///{tmp / f'{name}_{rows_per_insert}.db'}",
+                        ddl=ROOT / DATABASES[name], report=lambda _: None)
+    return sum(rows for rows, _ in stats.values()), size, written, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database", choices=sorted(GENERATORS), default="biblioteca")
+    parser.add_argument("--scale", type=float, default=100.0)
+    parser.add_argument("--rows", default=ROWS, help="righe per INSERT da confrontare, separate da virgola")
+    parser.add_argument("--commit-rows", type=int, default=COMMIT_ROWS, help="righe per transazione")
+    parser.add_argument("--url", help="mysql://... (default: SQLite temporaneo)")
+    args = parser.parse_args()
+
+    print(f"{'righe/INSERT':>12} {'righe':>10} {'MB':>8} {'scrittura s':>11} {'import s':>9} "
+          f"{'righe/s':>11} {'speedup':>8}")
+    base = None
+    with tempfile.TemporaryDirectory(prefix="bench_dump_") as tmp:
+        for rows_per_insert in (int(r) for r in args.rows.split(",")):
+            rows, size, written, loaded = run(args.database, args.scale, rows_per_insert, args.commit_rows,
+                                              args.url, Path(tmp))
+            base = base or loaded
+            print(f"{rows_per_insert:>12,} {rows:>10,} {size / 1e6:>8.1f} {written:>11.2f} {loaded:>9.2f} "
+                  f"{rows / loaded:>11,.0f} {base / loaded:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+bench_generators.py
+-------------------
+Benchmark dei generatori (biblioteca, prof_privato, attivita_didattiche) a più
+scale: ogni scala moltiplica le costanti N_* (vedi `--scale` di datagen.engine).
+Per ogni tabella registra righe, righe/s, secondi (gen_* + scrittura), byte
+scritti e picco di memoria residente; ogni (generatore, scala) gira in un
+processo separato, così il picco di memoria non si somma tra le esecuzioni.
+
+I risultati si salvano in JSON (`--save`) e si confrontano con una baseline
+(`--compare`): un peggioramento oltre la soglia (default 20%) su righe/s,
+secondi, memoria o byte viene segnalato e il comando esce con codice 1.
+
+Uso:
+    python benchmarks/bench_generators.py --scales 1,100 --save benchmarks/baseline.json
+    python benchmarks/bench_generators.py --scales 1,100 --compare benchmarks/baseline.json
+    python benchmarks/bench_generators.py --scales 1,100,10000 --generators biblioteca --workers 4
+"""
+import argparse
+from datetime import datetime
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+GENERATORS = {
+    "biblioteca": "biblioteca",
+    "prof_privato": "prof_privato",
+    "attivita_didattiche": "attivita_didattiche.attivita_didattiche",
+}
+SCALES = "1,100"
+THRESHOLD = 0.2
+# Sotto questa durata (s) tempi e righe/s sono rumore e non vengono confrontati
+MIN_SECONDS = 0.05
+# metrica -> True se un valore più alto è un peggioramento
+METRICS = {"rows_per_sec": False, "seconds": True, "peak_rss_mb": True, "bytes": True}
+RESULTS_VERSION = 1
+
+
+def _scale_key(scale):
+    return f"{scale:g}"
+
+
+# Esecuzione di un generatore in questo processo: statistiche per tabella
+def run_one(name, scale, workers, fmt):
+    from datagen import engine
+
+    schema = importlib.import_module(GENERATORS[name]).SCHEMA
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        outdir = Path(tmp) / schema.folder
+        outdir.mkdir()
+        ctx = engine.run(schema, outdir, workers=workers, fmt=fmt, scale=scale)
+    tables = {}
+    for table, stats in ctx.stats.items():
+        tables[table] = dict(stats, rows_per_sec=round(stats["rows"] / stats["seconds"]) if stats["seconds"] else None)
+    total = {
+        "rows": sum(s["rows"] for s in tables.values()),
+        "seconds": round(sum(s["seconds"] for s in tables.values()), 4),
+        "bytes": sum(s["bytes"] for s in tables.values()),
+        "peak_rss_mb": engine.peak_rss_mb(),
+    }
+    total["rows_per_sec"] = round(total["rows"] / total["seconds"]) if total["seconds"] else None
+    return {"tables": tables, "total": total}
+
+
+# Ogni esecuzione in un processo nuovo (picco di memoria e cache indipendenti)
+def run_isolated(name, scale, workers, fmt):
+    cmd = [sys.executable, __file__, "--child", name, _scale_key(scale),
+           "--workers", str(workers), "--format", fmt]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True, cwd=ROOT).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def run_all(generators, scales, workers, fmt):
+    results = {
+        "version": RESULTS_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workers": workers,
+        "format": fmt,
+        "runs": {},
+    }
+    for name in generators:
+        for scale in scales:
+            print(f"… {name} x{_scale_key(scale)}", file=sys.stderr, flush=True)
+            run = run_isolated(name, scale, workers, fmt)
+            results["runs"].setdefault(name, {})[_scale_key(scale)] = run
+    return results
+
+
+def _fmt(value, metric):
+    if value is None:
+        return "-"
+    if metric == "bytes":
+        return f"{value / 1e6:.2f}MB"
+    if metric == "seconds":
+        return f"{value:.3f}"
+    return f"{value:,}"
+
+
+def print_results(results):
+    print(f"{'generatore':<20} {'scala':>7} {'tabella':<16} {'righe':>11} {'righe/s':>11} "
+          f"{'secondi':>8} {'byte':>10} {'RSS MB':>7}")
+    for name, by_scale in results["runs"].items():
+        for scale, run in by_scale.items():
+            for table, s in [*run["tables"].items(), ("TOTALE", run["total"])]:
+                print(f"{name:<20} {scale:>7} {table:<16} {s['rows']:>11,} "
+                      f"{_fmt(s['rows_per_sec'], 'rows_per_sec'):>11} {_fmt(s['seconds'], 'seconds'):>8} "
+                      f"{_fmt(s['bytes'], 'bytes'):>10} {_fmt(s['peak_rss_mb'], 'peak_rss_mb'):>7}")
+
+
+def compare(baseline, results, threshold):
+    """
+    Peggioramenti di `results` rispetto a `baseline` oltre `threshold`
+    (frazione): lista di (generatore, scala, tabella, metrica, prima, dopo).
+    Si confrontano solo le coppie (generatore, scala) presenti in entrambi.
+    """
+    regressions = []
+    for name, by_scale in results["runs"].items():
+        for scale, run in by_scale.items():
+            base = baseline["runs"].get(name, {}).get(scale)
+            if base is None:
+                continue
+            entries = [*run["tables"].items(), ("TOTALE", run["total"])]
+            base_tables = dict(base["tables"], TOTALE=base["total"])
+            for table, new in entries:
+                old = base_tables.get(table)
+                if old is None:
+                    continue
+                for metric, higher_is_worse in METRICS.items():
+                    before, after = old.get(metric), new.get(metric)
+                    if not before or after is None:
+                        continue
+                    if metric in ("rows_per_sec", "seconds") and old["seconds"] < MIN_SECONDS:
+                        continue
+                    change = (after - before) / before
+                    if (change if higher_is_worse else -change) > threshold:
+                        regressions.append((name, scale, table, metric, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[2])
+    parser.add_argument("--scales", default=SCALES, help=f"scale separate da virgole (default {SCALES})")
+    parser.add_argument("--generators", default=",".join(GENERATORS),
+                        help="generatori separati da virgole (default: tutti)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--format", default="csv")
+    parser.add_argument("--save", type=Path, help="scrive i risultati in questo file JSON")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="confronta con una baseline JSON")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"peggioramento tollerato, frazione (default {THRESHOLD})")
+    parser.add_argument("--child", nargs=2, metavar=("GENERATORE", "SCALA"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        name, scale = args.child
+        print(json.dumps(run_one(name, float(scale), args.workers, args.format)))
+        return
+
+    generators = [g.strip() for g in args.generators.split(",") if g.strip()]
+    unknown = [g for g in generators if g not in GENERATORS]
+    if unknown:
+        parser.error(f"generatori sconosciuti: {', '.join(unknown)} (disponibili: {', '.join(GENERATORS)})")
+    scales = [float(s) for s in args.scales.split(",")]
+
+    results = run_all(generators, scales, args.workers, args.format)
+    print_results(results)
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=1), encoding="utf-8")
+        print(f"Risultati salvati in {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, results, args.threshold)
+        if not regressions:
+            print(f"Nessun peggioramento oltre il {args.threshold:.0%} rispetto a {args.compare}")
+            return
+        print(f"\nPeggioramenti oltre il {args.threshold:.0%} rispetto a {args.compare}:")
+        for name, scale, table, metric, before, after in regressions:
+            print(f"  {name} x{scale} {table} {metric}: {_fmt(before, metric)} -> {_fmt(after, metric)} "
+                  f"({(after - before) / before:+.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,27 @@
 make_csv_biblioteca_auto.py
 ----------------------------
 Generatore CSV *zero-config* per lo schema BibliotecaDB.
-- Nessun parametro esterno: esegui `python make_csv_biblioteca_auto.py`.
+- Nessun parametro obbligatorio: esegui `python biblioteca.py`.
+- Lo schema è una spec (SCHEMA) eseguita dal motore comune datagen.engine.
+- `--workers N` genera le tabelle a shard su N processi (output identico).
+- `--format parquet|arrow-ipc` scrive file colonnari tipizzati invece dei CSV.
 - Crea una cartella di output timestampata dentro `csv_out/`.
-- Rispetta PK / FK / UK e coerenze (dipendenti attivi, libri disponibili).
-Requisiti: pip install Faker python-dateutil
+- `--append <cartella>` aggiunge solo noleggi e pagamenti nuovi (datagen.delta).
+- Rispetta PK / FK / UK e coerenze (dipendenti attivi, una copia per noleggio
+  alla volta, stato delle copie ricavato dai noleggi).
+Requisiti: pip install Faker python-dateutil numpy (pyarrow per parquet/arrow-ipc)
 """
 # Import delle librerie necessarie
-import csv
+from array import array
+from bisect import bisect_right
+from datetime import date, timedelta
 from pathlib import Path
-import random
-from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
-from faker import Faker
-from itertools import count
+import numpy as np
 
-fake = Faker("it_IT")
+from datagen import delta, engine, vector
+from datagen.distributions import Seasonal, Weighted, Zipf
+from datagen.engine import Schema, Table
 
 # Parametri di configurazione per la quantità di dati da generare
 N_SUPPLIERS = 10           # Numero di fornitori
@@ -32,183 +38,360 @@ RANDOM_SEED = 42
 RENTALS_START = date.today() - relativedelta(months=12)
 RENTALS_END = date.today() - timedelta(days=1)
 
-# Inizializzazione Faker e random
-random.seed(RANDOM_SEED)
-Faker.seed(RANDOM_SEED)
-random.seed(RANDOM_SEED)
-Faker.seed(RANDOM_SEED)
+GENRES = ["Romanzo", "Giallo", "Fantasy", "Sci-Fi", "Storia"]
 
+# Colonne non uniformi (datagen.distributions), da cambiare con --dist o
+# --uniform: pochi fornitori forniscono quasi tutto, i clienti abituali
+# noleggiano spesso, i noleggi crescono a fine settimana e d'estate
+DISTRIBUTIONS = {
+    "Book.Genre": Weighted(5, 3, 2, 2, 1),
+    "Book.SupplierID": Zipf(0.8),
+    "Payment.SupplierID": Zipf(1.0),
+    "Rental.CustomerID": Zipf(1.0),
+    "Rental.StartDate": Seasonal(weekday=(1, 1, 1, 1, 1.2, 1.5, 0.3),
+                                 month=(1.1, 1, 1, 0.9, 0.9, 1, 1.2, 1.3, 1, 1, 1, 1.2)),
+}
 
-# Crea una cartella di output con timestamp
-def ts_outdir(base="csv_out"):
-    t = datetime.now().strftime("%Y%m%d_%H%M%S")
-    p = Path(base) / f"BibliotecaDB_{t}"
-    p.mkdir(parents=True, exist_ok=True)
-    return p
+# Random e Faker non hanno più un seed globale: ogni shard di ogni tabella usa
+# un seed derivato da (RANDOM_SEED, tabella, shard), vedi datagen.sharding.
+# Lo schema (tabelle, colonne, chiavi) è dichiarato in fondo al file (SCHEMA).
 
 
-# Restituisce una data casuale tra start e end
-def daterange(start: date, end: date) -> date:
-    delta = (end - start).days
-    return start + timedelta(days=random.randint(0, delta))
-
-
-# Scrive una lista di dizionari su file CSV
-def write_csv(path, fieldnames, rows):
-    # Normalize values: dates -> ISO string, datetimes -> ISO, bool -> TRUE/FALSE
-    def normalize_value(v):
-        if isinstance(v, (date, datetime)):
-            return v.isoformat()
-        if isinstance(v, bool):
-            return "TRUE" if v else "FALSE"
-        return v
-
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in rows:
-            row = {k: normalize_value(r.get(k)) for k in fieldnames}
-            writer.writerow(row)
-
+# Ogni gen_* riceve uno shard (intervallo di ID con generatori dedicati) e
+# produce le righe di quegli ID, tuple nell'ordine delle colonne della DDL. I
+# testi vengono dai pool Faker in cache (shard.sample), le altre colonne da
+# datagen.vector.
 
 # Genera fornitori
-def gen_suppliers(n):
-    suppliers = []
-    for i in range(1, n + 1):
-        suppliers.append({
-            "SupplierID": i,
-            "CompanyName": fake.company()[:100],
-            "ContactInfo": f"{fake.email()}, {fake.phone_number()}"[:200]
-        })
-    return suppliers
+def gen_suppliers(shard):
+    # CompanyName è UNIQUE nella DDL: nomi tutti diversi (datagen.keys)
+    columns = zip(shard.ids(), shard.unique_sample("company"), shard.sample("email"), shard.sample("phone_number"))
+    for i, company, email, phone in columns:
+        yield (
+            i,                    # SupplierID
+            company,              # CompanyName
+            f"{email}, {phone}",  # ContactInfo
+        )
 
 
 # Genera dipendenti
-def gen_employees(n):
-    return [{
-        "EmployeeID": i,
-        "FirstName": fake.first_name()[:50],
-        "LastName": fake.last_name()[:50]
-    } for i in range(1, n + 1)]
+def gen_employees(shard):
+    # righe (EmployeeID, FirstName, LastName): le colonne sono già nell'ordine della DDL
+    yield from zip(shard.ids(), shard.sample("first_name"), shard.sample("last_name"))
 
 
 # Genera clienti
-def gen_customers(n):
-    return [{
-        "CustomerID": i,
-        "FirstName": fake.first_name()[:50],
-        "LastName": fake.last_name()[:50],
-        "Email": fake.email()[:100]
-    } for i in range(1, n + 1)]
-
-
-# Genera libri
-def gen_books(n, suppliers):
-    books = []
-    supplier_ids = [s["SupplierID"] for s in suppliers]
-    for i in range(1, n + 1):
-        books.append({
-            "BookID": i,
-            "Title": fake.sentence(nb_words=4)[:200],
-            "Author": f"{fake.first_name()} {fake.last_name()}"[:100],
-            "Genre": random.choice(["Romanzo", "Giallo", "Fantasy", "Sci-Fi", "Storia"]),
-            "SupplierID": random.choice(supplier_ids)
-        })
-    return books
-
-
-# Genera copie dei libri
-def gen_book_copies(books):
-    copies = []
-    copy_id = count(1)
-    for book in books:
-        # generate between 1 and N_COPIES_PER_BOOK copies per book
-        copies_count = random.randint(1, N_COPIES_PER_BOOK)
+def gen_customers(shard):
+    # righe (CustomerID, FirstName, LastName, Email)
+    yield from zip(shard.ids(), shard.sample("first_name"), shard.sample("last_name"), shard.sample("email"))
+
+
+# Genera libri (supplier_ids: range degli ID fornitore validi)
+def gen_books(shard, supplier_ids, genre_dist, supplier_dist):
+    gen, n = shard.np, len(shard)
+    columns = zip(
+        shard.ids(),
+        shard.sample("sentence"),
+        shard.sample("first_name"),
+        shard.sample("last_name"),
+        genre_dist.pick(gen, GENRES, n),
+        supplier_dist.pick(gen, supplier_ids, n),
+    )
+    for i, title, first, last, genre, supplier_id in columns:
+        yield (
+            i,                  # BookID
+            title,              # Title
+            f"{first} {last}",  # Author
+            genre,              # Genre
+            supplier_id,        # SupplierID
+        )
+
+
+# Stati e condizioni possibili di una copia (codificati come indici a 1 byte)
+BOOK_STATUSES = ["Available", "Rented", "Maintenance"]
+BOOK_CONDITIONS = ["Excellent", "Good", "Fair", "Poor"]
+AVAILABLE = BOOK_STATUSES.index("Available")
+RENTED = BOOK_STATUSES.index("Rented")
+MAINTENANCE = BOOK_STATUSES.index("Maintenance")
+
+# Copie provate a caso prima di scorrere tutto il catalogo in cerca di una libera
+PROBES = 16
+# Quota di noleggi non restituiti (in ritardo) tra quelli già scaduti
+OVERDUE_RATE = 0.03
+
+
+# Inventario delle copie indicizzato per BookCopyID, con il calendario dei
+# noleggi di ogni copia.
+# Le colonne sono array compatti (posizione = BookCopyID - 1), lo stato
+# iniziale è un codice a 1 byte: le copie in manutenzione restano fuori dal
+# prestito, le altre si possono noleggiare. Per ogni copia i periodi prenotati
+# [inizio, fine] (giorni dall'inizio della finestra, estremi inclusi) sono
+# tenuti ordinati in due array: i periodi non si sovrappongono, quindi anche
+# le fini sono ordinate e verificare se una copia è libera in un periodo è una
+# ricerca binaria, O(log k) con k noleggi della copia. Un noleggio non
+# restituito tiene la copia fino alla fine della finestra, e lo stato finale
+# (BookStatus) si ricava da lì: "Rented" se la copia è fuori, altrimenti
+# "Available" (o "Maintenance").
+class CopyStore:
+    def __init__(self):
+        self.book_id = array("I")
+        self.copy_number = array("H")
+        self.status = bytearray()
+        self.condition = bytearray()
+        self._rentable = array("I")    # ID delle copie che si possono noleggiare
+        self._starts = []              # per copia: array degli inizi prenotati (o None)
+        self._ends = []                # per copia: array delle fini corrispondenti
+        self._out = bytearray()        # 1 se la copia ha un noleggio non restituito
+
+    def __len__(self):
+        return len(self.status)
+
+    def rentable_count(self):
+        return len(self._rentable)
+
+    # Aggiunge una copia e ne restituisce il BookCopyID
+    def add(self, book_id, copy_number, status, condition):
+        copy_id = len(self.status) + 1
+        self.book_id.append(book_id)
+        self.copy_number.append(copy_number)
+        self.status.append(status)
+        self.condition.append(condition)
+        self._starts.append(None)
+        self._ends.append(None)
+        self._out.append(0)
+        if status != MAINTENANCE:
+            self._rentable.append(copy_id)
+        return copy_id
+
+    # Stato della copia alla fine della finestra dei noleggi
+    def get_status(self, copy_id):
+        return BOOK_STATUSES[self._status_code(copy_id - 1)]
+
+    def _status_code(self, i):
+        if self.status[i] == MAINTENANCE:
+            return MAINTENANCE
+        return RENTED if self._out[i] else AVAILABLE
+
+    # Periodi prenotati di una copia, in ordine di inizio
+    def bookings(self, copy_id):
+        starts, ends = self._starts[copy_id - 1], self._ends[copy_id - 1]
+        return [] if starts is None else list(zip(starts, ends))
+
+    def is_free(self, copy_id, start, end):
+        """True se la copia non ha noleggi che toccano i giorni [start, end]."""
+        starts = self._starts[copy_id - 1]
+        if starts is None:
+            return True
+        # l'ultimo periodo che inizia entro `end` è quello che finisce più tardi
+        k = bisect_right(starts, end)
+        return k == 0 or self._ends[copy_id - 1][k - 1] < start
+
+    # Prenota [start, end] su una copia già verificata libera
+    def _reserve(self, copy_id, start, end, out):
+        i = copy_id - 1
+        if self._starts[i] is None:
+            self._starts[i], self._ends[i] = array("i"), array("i")
+        k = bisect_right(self._starts[i], start)
+        self._starts[i].insert(k, start)
+        self._ends[i].insert(k, end)
+        if out:
+            self._out[i] = 1
+
+    def hold(self, copy_id, end, out):
+        """
+        Con --append: la copia è occupata da un noleggio precedente
+        dall'inizio della finestra fino al giorno `end` (compreso). Le copie
+        tenute si segnano prima di ogni prenotazione, quindi ognuna ha un solo
+        periodo [0, fine], che si allunga se altri noleggi la tengono di più.
+        """
+        i = copy_id - 1
+        if self._starts[i] is None:
+            self._reserve(copy_id, 0, end, out)
+            return
+        self._ends[i][0] = max(self._ends[i][0], end)
+        if out:
+            self._out[i] = 1
+
+    def book(self, rng, start, end, out=False):
+        """
+        Assegna il periodo [start, end] a una copia libera scelta a caso e ne
+        restituisce l'ID (None se nessuna copia è libera in quei giorni). Con
+        `out` il noleggio non è stato restituito e la copia risulta "Rented".
+        Finché il catalogo non è quasi pieno bastano pochi tentativi a caso;
+        altrimenti si scorrono le copie a partire da una a caso.
+        """
+        rentable = self._rentable
+        n = len(rentable)
+        if n == 0:
+            return None
+        for _ in range(min(PROBES, n)):
+            copy_id = rentable[rng.randrange(n)]
+            if self.is_free(copy_id, start, end):
+                self._reserve(copy_id, start, end, out)
+                return copy_id
+        first = rng.randrange(n)
+        for j in range(n):
+            copy_id = rentable[(first + j) % n]
+            if self.is_free(copy_id, start, end):
+                self._reserve(copy_id, start, end, out)
+                return copy_id
+        return None
+
+    # Righe per BookCopy.csv, nell'ordine degli ID
+    def rows(self):
+        for i in range(len(self.status)):
+            yield (
+                i + 1,                                # BookCopyID
+                self.book_id[i],                      # BookID
+                self.copy_number[i],                  # CopyNumber
+                BOOK_STATUSES[self._status_code(i)],  # BookStatus
+                BOOK_CONDITIONS[self.condition[i]],   # BookCondition
+            )
+
+
+# Genera le copie dei libri dello shard (shard sugli ID libro) come tuple
+# (BookID, CopyNumber, stato, condizione): i BookCopyID vengono assegnati in
+# ordine quando le copie entrano nell'inventario. Numero di copie, stato e
+# condizione sono estratti in blocco per tutto lo shard.
+def gen_book_copies(shard):
+    gen = shard.np
+    # generate between 1 and N_COPIES_PER_BOOK copies per book
+    counts = vector.integers(gen, 1, N_COPIES_PER_BOOK, len(shard))
+    total = sum(counts)
+    statuses = vector.integers(gen, 0, len(BOOK_STATUSES) - 1, total)
+    conditions = vector.integers(gen, 0, len(BOOK_CONDITIONS) - 1, total)
+    k = 0
+    for book_id, copies_count in zip(shard.ids(), counts):
         for copy_num in range(1, copies_count + 1):
-            copies.append({
-                "BookCopyID": next(copy_id),
-                "BookID": book["BookID"],
-                "CopyNumber": copy_num,
-                "BookStatus": random.choice(["Available", "Rented", "Maintenance"]),
-                "BookCondition": random.choice(["Excellent", "Good", "Fair", "Poor"])
-            })
-    return copies
-
-
-# Genera pagamenti
-def gen_payments(n, suppliers, employees):
-    payments = []
-    supplier_ids = [s["SupplierID"] for s in suppliers]
-    employee_ids = [e["EmployeeID"] for e in employees]
-    for i in range(1, n + 1):
-        payments.append({
-            "PaymentID": i,
-            "SupplierID": random.choice(supplier_ids),
-            "EmployeeID": random.choice(employee_ids),
-            "Amount": round(random.uniform(100, 1000), 2),
-            "PaymentDate": daterange(RENTALS_START, RENTALS_END)
-        })
-    return payments
-
-
-# Genera noleggi
-def gen_rentals(n, book_copies, customers, employees):
-    rentals = []
-    customer_ids = [c["CustomerID"] for c in customers]
-    employee_ids = [e["EmployeeID"] for e in employees]
-    available_copies = [bc for bc in book_copies if bc["BookStatus"] == "Available"]
-    max_rentals = min(n, len(available_copies))
-    for i in range(1, max_rentals + 1):
-        start = daterange(RENTALS_START, RENTALS_END)
-        # ensure end date is on or after start date (max rental 60 days)
-        latest_end = min(RENTALS_END, start + timedelta(days=60))
-        end = daterange(start, latest_end) if latest_end >= start else start
-        returned = random.choice([True, False])
-
-        # mark the chosen copy as rented (update original book_copies list)
-        book_copy = available_copies[i - 1]
-        book_copy_id = book_copy["BookCopyID"]
-        # update status in the master list as well
-        for bc in book_copies:
-            if bc["BookCopyID"] == book_copy_id:
-                bc["BookStatus"] = "Rented"
-                break
-
-        rentals.append({
-            "RentalID": i,
-            "BookCopyID": book_copy_id,
-            "CustomerID": random.choice(customer_ids),
-            "EmployeeID": random.choice(employee_ids),
-            "StartDate": start,
-            "EndDate": end,
-            "Returned": returned
-        })
-    return rentals
-
-
-# Funzione principale
-def main():
-    outdir = ts_outdir()
-
-    suppliers = gen_suppliers(N_SUPPLIERS)
-    employees = gen_employees(N_EMPLOYEES)
-    customers = gen_customers(N_CUSTOMERS)
-    books = gen_books(N_BOOKS, suppliers)
-    book_copies = gen_book_copies(books)
-    payments = gen_payments(N_PAYMENTS, suppliers, employees)
-    rentals = gen_rentals(N_RENTALS, book_copies, customers, employees)
+            yield book_id, copy_num, statuses[k], conditions[k]
+            k += 1
+
+
+# Genera pagamenti (tutte le colonne estratte in blocco) con date tra start ed end
+def gen_payments(shard, supplier_ids, employee_ids, start, end, supplier_dist):
+    gen, n = shard.np, len(shard)
+    window = (end - start).days
+    columns = zip(
+        shard.ids(),
+        supplier_dist.pick(gen, supplier_ids, n),
+        vector.pick_ids(gen, employee_ids, n),
+        vector.amounts(gen, 100, 1000, n),
+        vector.iso_dates(start, vector.day_offsets(gen, window, n)),
+    )
+    for payment_id, supplier_id, employee_id, amount, payment_date in columns:
+        yield (
+            payment_id,    # PaymentID
+            supplier_id,   # SupplierID
+            employee_id,   # EmployeeID
+            amount,        # Amount
+            payment_date,  # PaymentDate
+        )
+
+
+# Genera noleggi: ogni noleggio prenota nell'inventario una copia libera per
+# tutti i suoi giorni (ricerca binaria nel calendario della copia), così una
+# copia può essere noleggiata più volte nella finestra senza sovrapposizioni e
+# il numero di noleggi non dipende dalle copie disponibili all'inizio.
+# L'inventario vive nel processo principale, quindi gli shard dei noleggi
+# girano in sequenza qui (ognuno comunque col proprio seed). Date, clienti,
+# dipendenti e restituzioni sono estratti in blocco per tutto lo shard; i
+# noleggi iniziano tra start ed end, con le distribuzioni di data e cliente
+# di DISTRIBUTIONS. Non sono restituiti quelli che scadono l'ultimo giorno
+# (ancora in corso) e una quota OVERDUE_RATE degli altri (in ritardo): tengono
+# la copia fino alla fine della finestra.
+def gen_rentals(shard, store, customer_ids, employee_ids, start, end, date_dist, customer_dist):
+    rng, gen, n = shard.rng, shard.np, len(shard)
+    window = (end - start).days
+    start_off = date_dist.days(gen, start, window, n)
+    # ensure end date is on or after start date (max rental 60 days)
+    end_off = start_off + gen.integers(0, np.minimum(60, window - start_off) + 1)
+    out = (end_off == window) | (gen.random(n) < OVERDUE_RATE)
+    booked_off = np.where(out, window, end_off)
+    columns = zip(
+        shard.ids(),
+        start_off.tolist(),
+        booked_off.tolist(),
+        out.tolist(),
+        vector.iso_dates(start, start_off),
+        vector.iso_dates(start, end_off),
+        customer_dist.pick(gen, customer_ids, n),
+        vector.pick_ids(gen, employee_ids, n),
+    )
+    for rental_id, first_day, last_day, not_returned, start_date, end_date, customer_id, employee_id in columns:
+        book_copy_id = store.book(rng, first_day, last_day, not_returned)
+        if book_copy_id is None:
+            raise ValueError(f"Rental {rental_id}: nessuna copia libera dal {start_date} per "
+                             f"{store.rentable_count()} copie noleggiabili: ridurre i noleggi o aumentare i libri")
+        yield (
+            rental_id,         # RentalID
+            book_copy_id,      # BookCopyID
+            customer_id,       # CustomerID
+            employee_id,       # EmployeeID
+            start_date,        # StartDate
+            end_date,          # EndDate
+            not not_returned,  # Returned
+        )
+
+
+# Con --append tiene occupate le copie dei noleggi di tutta la catena di
+# cartelle precedenti: quelli non restituiti fino alla fine della finestra
+# (nessuna generazione successiva li chiude), quelli restituiti se finiscono
+# dentro la finestra
+def hold_previous_rentals(store, folder, start, end):
+    window = (end - start).days
+    first = start.isoformat()
+    for previous in delta.chain(folder):
+        for copy_id, end_date, returned in delta.table_rows(previous, "Rental", ("BookCopyID", "EndDate", "Returned")):
+            # anche le cartelle legacy con 'False'
+            if str(returned).strip().lower() in ("false", "0"):
+                store.hold(int(copy_id), window, True)
+            elif end_date >= first:
+                store.hold(int(copy_id), (date.fromisoformat(end_date[:10]) - start).days, False)
+
+
+# Riempie l'inventario con le copie generate (serve ai noleggi); con --append
+# vi segna anche i noleggi precedenti ancora in corso
+def keep_copies(ctx, copies):
+    store = ctx.state["store"] = CopyStore()
+    for book_copy in copies:
+        store.add(*book_copy)
+        yield book_copy
+    if ctx.previous is not None:
+        hold_previous_rentals(store, ctx.previous, *ctx.window(RENTALS_START, RENTALS_END))
+
+
+# Schema di BibliotecaDB: colonne, tipi, chiavi e lunghezze vengono dalla DDL
+# (biblioteca.sql), qui restano solo le funzioni di generazione e il numero di
+# righe. Il motore (datagen.engine) genera le tabelle nell'ordine delle FK e le
+# scrive in streaming; delle tabelle padre si conservano solo le chiavi (range
+# di ID contigui) e l'inventario compatto delle copie. BookCopy viene scritta
+# per ultima perché i noleggi ne aggiornano lo stato, e i noleggi girano nel
+# processo principale perché l'inventario vive lì. Noleggi e pagamenti sono le
+# tabelle di attività: con --append se ne generano solo di nuovi (delta=colonna
+# data), mentre l'inventario viene ricostruito in memoria con i noleggi
+# precedenti ancora in corso.
+SCHEMA = Schema("BibliotecaDB", seed=RANDOM_SEED, sql=Path(__file__).with_name("biblioteca.sql"), tables=[
+    Table("Supplier", gen_suppliers, N_SUPPLIERS),
+    Table("Employee", gen_employees, N_EMPLOYEES),
+    Table("Customer", gen_customers, N_CUSTOMERS),
+    Table("Book", gen_books, N_BOOKS, args=lambda ctx: (ctx.ids("Supplier"), ctx.distribution("Book.Genre"),
+                                                        ctx.distribution("Book.SupplierID"))),
+    # shard sugli ID libro: le righe sono scritte alla fine dall'inventario
+    Table("BookCopy", gen_book_copies, N_BOOKS, keep=keep_copies, output=lambda ctx: ctx.state["store"].rows()),
+    Table("Payment", gen_payments, N_PAYMENTS, delta="PaymentDate",
+          args=lambda ctx: (ctx.ids("Supplier"), ctx.ids("Employee"), *ctx.window(RENTALS_START, RENTALS_END),
+                            ctx.distribution("Payment.SupplierID"))),
+    Table("Rental", gen_rentals, N_RENTALS, delta="StartDate", parallel=False,
+          args=lambda ctx: (ctx.state["store"], ctx.ids("Customer"), ctx.ids("Employee"),
+                            *ctx.window(RENTALS_START, RENTALS_END),
+                            ctx.distribution("Rental.StartDate"), ctx.distribution("Rental.CustomerID"))),
+], calendar=lambda ctx: ctx.window(RENTALS_START, RENTALS_END), distributions=DISTRIBUTIONS)
 
-    # Scrittura dei file CSV
-    write_csv(outdir / "Supplier.csv", ["SupplierID", "CompanyName", "ContactInfo"], suppliers)
-    write_csv(outdir / "Employee.csv", ["EmployeeID", "FirstName", "LastName"], employees)
-    write_csv(outdir / "Customer.csv", ["CustomerID", "FirstName", "LastName", "Email"], customers)
-    write_csv(outdir / "Book.csv", ["BookID", "Title", "Author", "Genre", "SupplierID"], books)
-    write_csv(outdir / "BookCopy.csv", ["BookCopyID", "BookID", "CopyNumber", "BookStatus", "BookCondition"], book_copies)
-    write_csv(outdir / "Payment.csv", ["PaymentID", "SupplierID", "EmployeeID", "Amount", "PaymentDate"], payments)
-    write_csv(outdir / "Rental.csv", ["RentalID", "BookCopyID", "CustomerID", "EmployeeID", "StartDate", "EndDate", "Returned"], rentals)
 
-    print(f"✅ CSV generati in: {outdir.resolve()}")
+def main():
+    ctx = engine.main(SCHEMA, description="Generatore CSV per BibliotecaDB")
+    print(f"✅ File {ctx.fmt} generati in: {ctx.outdir.resolve()}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
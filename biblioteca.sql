@@ -34,8 +34,52 @@ CREATE TABLE Book (
     Genre varchar(50),
     SupplierID int NOT NULL,
     CONSTRAINT pkBookID PRIMARY KEY (BookID),
+    CONSTRAINT fkBookSupplierID FOREIGN KEY (SupplierID) REFERENCES Supplier(SupplierID)
+);
+CREATE INDEX idxBook ON Book(BookID);
+
+-- Tabella BookCopy
+CREATE TABLE BookCopy (
+    BookCopyID int NOT NULL AUTO_INCREMENT,
+    BookID int NOT NULL,
+    CopyNumber int NOT NULL,
+    BookStatus varchar(20) NOT NULL DEFAULT 'Available',
+    BookCondition varchar(20) NOT NULL,
+    CONSTRAINT pkBookCopyID PRIMARY KEY (BookCopyID),
+    CONSTRAINT fkBookCopyBookID FOREIGN KEY (BookID) REFERENCES Book(BookID),
+    CONSTRAINT ukBookCopyNumber UNIQUE (BookID, CopyNumber)
+);
+CREATE INDEX idxBookCopy ON BookCopy(BookCopyID);
+
+-- Tabella Payment
+CREATE TABLE Payment (
+    PaymentID int NOT NULL AUTO_INCREMENT,
+    SupplierID int NOT NULL,
+    EmployeeID int NOT NULL,
+    Amount decimal(10,2) NOT NULL,
+    PaymentDate date NOT NULL,
+    CONSTRAINT pkPaymentID PRIMARY KEY (PaymentID),
+    CONSTRAINT fkPaymentSupplierID FOREIGN KEY (SupplierID) REFERENCES Supplier(SupplierID),
+    CONSTRAINT fkPaymentEmployeeID FOREIGN KEY (EmployeeID) REFERENCES Employee(EmployeeID)
+);
+CREATE INDEX idxPayment ON Payment(PaymentID);
+
+-- Tabella Rental
+CREATE TABLE Rental (
+    RentalID int NOT NULL AUTO_INCREMENT,
+    BookCopyID int NOT NULL,
+    CustomerID int NOT NULL,
+    EmployeeID int NOT NULL,
+    StartDate date NOT NULL,
+    EndDate date NOT NULL,
+    Returned boolean NOT NULL DEFAULT FALSE,
+    CONSTRAINT pkRentalID PRIMARY KEY (RentalID),
+    CONSTRAINT fkRentalBookCopyID FOREIGN KEY (BookCopyID) REFERENCES BookCopy(BookCopyID),
+    CONSTRAINT fkRentalCustomerID FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID),
+    CONSTRAINT fkRentalEmployeeID FOREIGN KEY (EmployeeID) REFERENCES Employee(EmployeeID)
+);
+CREATE INDEX idxRental ON Rental(RentalID);
 
-)
     -- =============================
     -- VIEWS (compact, based on a single base view)
     -- Base view: Rental_Details (joins Rental -> BookCopy -> Book -> Customer -> Employee)
@@ -119,7 +163,14 @@ CREATE TABLE Book (
     -- LEFT JOIN BookCopy BC ON BC.BookID = B.BookID
     -- GROUP BY B.BookID, B.Title;
 
-    COUNT(BC.BookCopyID) AS TotalCopies,
+-- Book inventory (copies per book, by status)
+DROP VIEW IF EXISTS Book_Inventory;
+CREATE VIEW Book_Inventory AS
+SELECT B.BookID,
+       B.Title,
+       B.Author,
+       B.Genre,
+       COUNT(BC.BookCopyID) AS TotalCopies,
     SUM(CASE WHEN BC.BookStatus = 'Rented' THEN 1 ELSE 0 END) AS CopiesMarkedRented,
     SUM(CASE WHEN BC.BookStatus = 'Available' THEN 1 ELSE 0 END) AS CopiesMarkedAvailable
 FROM Book B
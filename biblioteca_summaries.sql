@@ -0,0 +1,217 @@
+-- Riepiloghi materializzati di biblioteca.sql, aggiornati in modo incrementale.
+-- Generato da: python -m datagen.summaries sql biblioteca
+-- Refresh: CALL Refresh_<report>(); dopo modifiche a righe già elaborate: CALL Rebuild_<report>();
+
+CREATE TABLE IF NOT EXISTS Summary_Watermark (
+    Summary VARCHAR(64) NOT NULL,
+    SourceTable VARCHAR(64) NOT NULL,
+    LastID BIGINT,
+    RefreshedAt DATETIME,
+    PRIMARY KEY (Summary, SourceTable)
+);
+
+CREATE TABLE IF NOT EXISTS MV_Customer_Rental_Summary (
+    CustomerID INT NOT NULL,
+    FirstName VARCHAR(50),
+    LastName VARCHAR(50),
+    Email VARCHAR(100),
+    TotalRentals BIGINT,
+    CurrentRentals BIGINT,
+    FirstRentalDate DATE,
+    LastRentalDate DATE,
+    PRIMARY KEY (CustomerID)
+);
+
+CREATE OR REPLACE VIEW Customer_Rental_Summary_Fast AS
+SELECT CustomerID, FirstName, LastName, Email, TotalRentals, CurrentRentals,
+       FirstRentalDate, LastRentalDate
+FROM MV_Customer_Rental_Summary;
+
+CREATE TABLE IF NOT EXISTS MV_Supplier_Payment_Summary (
+    SupplierID INT NOT NULL,
+    CompanyName VARCHAR(100),
+    TotalPaid DECIMAL(14,2),
+    PaymentCount BIGINT,
+    PRIMARY KEY (SupplierID)
+);
+
+CREATE OR REPLACE VIEW Supplier_Payment_Summary_Fast AS
+SELECT SupplierID, CompanyName, ROUND(TotalPaid, 2) AS TotalPaid, PaymentCount
+FROM MV_Supplier_Payment_Summary;
+
+CREATE TABLE IF NOT EXISTS MV_Monthly_Supplier_Payments (
+    YearMonth CHAR(7) NOT NULL,
+    TotalAmount DECIMAL(14,2),
+    PaymentsCount BIGINT,
+    PRIMARY KEY (YearMonth)
+);
+
+CREATE OR REPLACE VIEW Monthly_Supplier_Payments_Fast AS
+SELECT YearMonth, ROUND(TotalAmount, 2) AS TotalAmount, PaymentsCount
+FROM MV_Monthly_Supplier_Payments;
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS Refresh_Customer_Rental_Summary_Fast$$
+CREATE PROCEDURE Refresh_Customer_Rental_Summary_Fast()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di Customer
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Customer_Rental_Summary_Fast' AND SourceTable = 'Customer';
+    SELECT IFNULL(MAX(CustomerID), 0) INTO v_hi FROM Customer;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Customer_Rental_Summary (CustomerID, FirstName, LastName, Email, TotalRentals, CurrentRentals, FirstRentalDate, LastRentalDate)
+        SELECT * FROM (
+                    SELECT C.CustomerID AS CustomerID, C.FirstName AS FirstName, C.LastName AS LastName, C.Email AS Email,
+                           0 AS TotalRentals, 0 AS CurrentRentals, NULL AS FirstRentalDate, NULL AS LastRentalDate
+                    FROM Customer C
+                    WHERE C.CustomerID > v_lo AND C.CustomerID <= v_hi) AS d
+        ON DUPLICATE KEY UPDATE
+            FirstName = VALUES(FirstName),
+            LastName = VALUES(LastName),
+            Email = VALUES(Email),
+            TotalRentals = MV_Customer_Rental_Summary.TotalRentals + VALUES(TotalRentals),
+            CurrentRentals = MV_Customer_Rental_Summary.CurrentRentals + VALUES(CurrentRentals),
+            FirstRentalDate = CASE WHEN VALUES(FirstRentalDate) IS NULL THEN MV_Customer_Rental_Summary.FirstRentalDate WHEN MV_Customer_Rental_Summary.FirstRentalDate IS NULL OR VALUES(FirstRentalDate) < MV_Customer_Rental_Summary.FirstRentalDate THEN VALUES(FirstRentalDate) ELSE MV_Customer_Rental_Summary.FirstRentalDate END,
+            LastRentalDate = CASE WHEN VALUES(LastRentalDate) IS NULL THEN MV_Customer_Rental_Summary.LastRentalDate WHEN MV_Customer_Rental_Summary.LastRentalDate IS NULL OR VALUES(LastRentalDate) > MV_Customer_Rental_Summary.LastRentalDate THEN VALUES(LastRentalDate) ELSE MV_Customer_Rental_Summary.LastRentalDate END;
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Customer_Rental_Summary_Fast' AS Summary, 'Customer' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+    -- righe nuove di Rental
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Customer_Rental_Summary_Fast' AND SourceTable = 'Rental';
+    SELECT IFNULL(MAX(RentalID), 0) INTO v_hi FROM Rental;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Customer_Rental_Summary (CustomerID, FirstName, LastName, Email, TotalRentals, CurrentRentals, FirstRentalDate, LastRentalDate)
+        SELECT * FROM (
+                    SELECT C.CustomerID AS CustomerID, C.FirstName AS FirstName, C.LastName AS LastName, C.Email AS Email,
+                           COUNT(*) AS TotalRentals,
+                           SUM(CASE WHEN R.Returned = 0 THEN 1 ELSE 0 END) AS CurrentRentals,
+                           MIN(R.StartDate) AS FirstRentalDate, MAX(R.EndDate) AS LastRentalDate
+                    FROM Rental R
+                    JOIN Customer C ON C.CustomerID = R.CustomerID
+                    WHERE R.RentalID > v_lo AND R.RentalID <= v_hi
+                    GROUP BY C.CustomerID, C.FirstName, C.LastName, C.Email) AS d
+        ON DUPLICATE KEY UPDATE
+            FirstName = VALUES(FirstName),
+            LastName = VALUES(LastName),
+            Email = VALUES(Email),
+            TotalRentals = MV_Customer_Rental_Summary.TotalRentals + VALUES(TotalRentals),
+            CurrentRentals = MV_Customer_Rental_Summary.CurrentRentals + VALUES(CurrentRentals),
+            FirstRentalDate = CASE WHEN VALUES(FirstRentalDate) IS NULL THEN MV_Customer_Rental_Summary.FirstRentalDate WHEN MV_Customer_Rental_Summary.FirstRentalDate IS NULL OR VALUES(FirstRentalDate) < MV_Customer_Rental_Summary.FirstRentalDate THEN VALUES(FirstRentalDate) ELSE MV_Customer_Rental_Summary.FirstRentalDate END,
+            LastRentalDate = CASE WHEN VALUES(LastRentalDate) IS NULL THEN MV_Customer_Rental_Summary.LastRentalDate WHEN MV_Customer_Rental_Summary.LastRentalDate IS NULL OR VALUES(LastRentalDate) > MV_Customer_Rental_Summary.LastRentalDate THEN VALUES(LastRentalDate) ELSE MV_Customer_Rental_Summary.LastRentalDate END;
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Customer_Rental_Summary_Fast' AS Summary, 'Rental' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_Customer_Rental_Summary_Fast$$
+CREATE PROCEDURE Rebuild_Customer_Rental_Summary_Fast()
+BEGIN
+    DELETE FROM MV_Customer_Rental_Summary;
+    DELETE FROM Summary_Watermark WHERE Summary = 'Customer_Rental_Summary_Fast';
+    CALL Refresh_Customer_Rental_Summary_Fast();
+END$$
+
+DROP PROCEDURE IF EXISTS Refresh_Supplier_Payment_Summary_Fast$$
+CREATE PROCEDURE Refresh_Supplier_Payment_Summary_Fast()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di Supplier
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Supplier_Payment_Summary_Fast' AND SourceTable = 'Supplier';
+    SELECT IFNULL(MAX(SupplierID), 0) INTO v_hi FROM Supplier;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Supplier_Payment_Summary (SupplierID, CompanyName, TotalPaid, PaymentCount)
+        SELECT * FROM (
+                    SELECT S.SupplierID AS SupplierID, S.CompanyName AS CompanyName, 0 AS TotalPaid, 0 AS PaymentCount
+                    FROM Supplier S
+                    WHERE S.SupplierID > v_lo AND S.SupplierID <= v_hi) AS d
+        ON DUPLICATE KEY UPDATE
+            CompanyName = VALUES(CompanyName),
+            TotalPaid = MV_Supplier_Payment_Summary.TotalPaid + VALUES(TotalPaid),
+            PaymentCount = MV_Supplier_Payment_Summary.PaymentCount + VALUES(PaymentCount);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Supplier_Payment_Summary_Fast' AS Summary, 'Supplier' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+    -- righe nuove di Payment
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Supplier_Payment_Summary_Fast' AND SourceTable = 'Payment';
+    SELECT IFNULL(MAX(PaymentID), 0) INTO v_hi FROM Payment;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Supplier_Payment_Summary (SupplierID, CompanyName, TotalPaid, PaymentCount)
+        SELECT * FROM (
+                    SELECT S.SupplierID AS SupplierID, S.CompanyName AS CompanyName,
+                           SUM(P.Amount) AS TotalPaid, COUNT(*) AS PaymentCount
+                    FROM Payment P
+                    JOIN Supplier S ON S.SupplierID = P.SupplierID
+                    WHERE P.PaymentID > v_lo AND P.PaymentID <= v_hi
+                    GROUP BY S.SupplierID, S.CompanyName) AS d
+        ON DUPLICATE KEY UPDATE
+            CompanyName = VALUES(CompanyName),
+            TotalPaid = MV_Supplier_Payment_Summary.TotalPaid + VALUES(TotalPaid),
+            PaymentCount = MV_Supplier_Payment_Summary.PaymentCount + VALUES(PaymentCount);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Supplier_Payment_Summary_Fast' AS Summary, 'Payment' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_Supplier_Payment_Summary_Fast$$
+CREATE PROCEDURE Rebuild_Supplier_Payment_Summary_Fast()
+BEGIN
+    DELETE FROM MV_Supplier_Payment_Summary;
+    DELETE FROM Summary_Watermark WHERE Summary = 'Supplier_Payment_Summary_Fast';
+    CALL Refresh_Supplier_Payment_Summary_Fast();
+END$$
+
+DROP PROCEDURE IF EXISTS Refresh_Monthly_Supplier_Payments_Fast$$
+CREATE PROCEDURE Refresh_Monthly_Supplier_Payments_Fast()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di Payment
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Monthly_Supplier_Payments_Fast' AND SourceTable = 'Payment';
+    SELECT IFNULL(MAX(PaymentID), 0) INTO v_hi FROM Payment;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Monthly_Supplier_Payments (YearMonth, TotalAmount, PaymentsCount)
+        SELECT * FROM (
+                    SELECT SUBSTR(P.PaymentDate, 1, 7) AS YearMonth, SUM(P.Amount) AS TotalAmount, COUNT(*) AS PaymentsCount
+                    FROM Payment P
+                    WHERE P.PaymentID > v_lo AND P.PaymentID <= v_hi
+                    GROUP BY SUBSTR(P.PaymentDate, 1, 7)) AS d
+        ON DUPLICATE KEY UPDATE
+            TotalAmount = MV_Monthly_Supplier_Payments.TotalAmount + VALUES(TotalAmount),
+            PaymentsCount = MV_Monthly_Supplier_Payments.PaymentsCount + VALUES(PaymentsCount);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Monthly_Supplier_Payments_Fast' AS Summary, 'Payment' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_Monthly_Supplier_Payments_Fast$$
+CREATE PROCEDURE Rebuild_Monthly_Supplier_Payments_Fast()
+BEGIN
+    DELETE FROM MV_Monthly_Supplier_Payments;
+    DELETE FROM Summary_Watermark WHERE Summary = 'Monthly_Supplier_Payments_Fast';
+    CALL Refresh_Monthly_Supplier_Payments_Fast();
+END$$
+
+DELIMITER ;
@@ -0,0 +1,7 @@
+"""
+datagen
+-------
+Componenti condivisi dai generatori CSV (`biblioteca.py`, `prof_privato.py`,
+`attivita_didattiche/attivita_didattiche.py`). Ogni generatore dichiara il suo
+schema come spec (`datagen.engine.Schema`) e lo esegue col motore comune.
+"""
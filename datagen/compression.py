@@ -0,0 +1,75 @@
+"""
+Compressione a blocchi dei CSV generati (gzip, zstd).
+
+Il writer (datagen.writers) comprime ogni blocco di righe già codificato in
+modo indipendente: un blocco gzip diventa un membro gzip completo, un blocco
+zstd un frame zstd. I blocchi si comprimono quindi in parallelo su più thread
+(zlib e zstandard rilasciano il GIL) e si scrivono nell'ordine originale: il
+file è la concatenazione dei membri/frame, che `gzip`, `zcat`, `zstd -d` e
+`open_compressed` leggono come un unico flusso. Il risultato non dipende dal
+numero di thread (gzip senza data nell'intestazione).
+
+zstd richiede il pacchetto zstandard (`pip install zstandard`), importato
+solo se serve.
+"""
+import gzip
+import io
+import os
+import threading
+
+COMPRESSIONS = ("none", "gzip", "zstd")
+SUFFIXES = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# Thread di compressione per tabella
+THREADS = min(8, os.cpu_count() or 1)
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("La compressione zstd richiede zstandard: pip install zstandard") from None
+    return zstandard
+
+
+def compressor(kind, level=None):
+    """Funzione bytes -> bytes che comprime un blocco; si può chiamare da più thread."""
+    if kind == "gzip":
+        level = GZIP_LEVEL if level is None else level
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    if kind == "zstd":
+        zstandard = _zstandard()
+        level = ZSTD_LEVEL if level is None else level
+        # un ZstdCompressor non va usato da due thread insieme: uno per thread
+        local = threading.local()
+
+        def compress(data):
+            c = getattr(local, "c", None)
+            if c is None:
+                c = local.c = zstandard.ZstdCompressor(level=level)
+            return c.compress(data)
+        return compress
+    raise ValueError(f"compressione non supportata: {kind!r} (disponibili: {', '.join(COMPRESSIONS)})")
+
+
+def compression_of(path):
+    """Compressione di un file dalla sua estensione ("none" se non compresso)."""
+    suffix = os.path.splitext(str(path))[1]
+    return next((kind for kind, s in SUFFIXES.items() if s and s == suffix), "none")
+
+
+def open_compressed(path):
+    """Apre `path` in lettura binaria, decomprimendo .gz e .zst (anche a più membri/frame)."""
+    kind = compression_of(path)
+    if kind == "gzip":
+        return gzip.open(path, "rb")
+    if kind == "zstd":
+        reader = _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.BufferedReader(reader)
+    return open(path, "rb")
+
+
+def open_text(path):
+    """Apre `path` (compresso o no) come testo UTF-8 per il modulo csv."""
+    return io.TextIOWrapper(open_compressed(path), encoding="utf-8", newline="")
@@ -0,0 +1,156 @@
+"""
+Calendario precalcolato: le date della generazione come interi.
+
+Nei gen_* una data è un indice di giorno intero (giorni dal 1970-01-01, gli
+stessi di numpy datetime64[D]): si estraggono e si sommano offset interi,
+senza costruire oggetti `date`/`datetime` riga per riga. La formattazione
+avviene una volta sola per ogni giorno distinto: alla prima richiesta il
+processo calcola per tutti i giorni tra FIRST_DAY e LAST_DAY la stringa ISO,
+anno, mese, chiave del mese (AAAA-MM) e giorno della settimana, e formattare
+una colonna diventa una lettura per indice. Gli orari usano due tabelle
+analoghe (ore:minuti e secondi), i testi ISO letti dai CSV vengono convertiti
+in indici con una cache per giorno.
+
+`calendar_rows` produce le righe della tabella dimensione `Calendar` (una
+per giorno), scritta dai generatori con `--calendar` per raggruppare i report
+per mese o giorno della settimana con una join invece che con DATE_FORMAT.
+"""
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+FIRST_DAY = date(1900, 1, 1)
+LAST_DAY = date(2099, 12, 31)
+_UNIX = date(1970, 1, 1).toordinal()
+_FIRST = FIRST_DAY.toordinal() - _UNIX
+
+# Tabella dimensione facoltativa (--calendar): colonne per i writer e DDL,
+# valida sia per MySQL/MariaDB sia per SQLite
+CALENDAR = "Calendar"
+CALENDAR_COLUMNS = [
+    ("CalendarDate", "date"),
+    ("Year", "int"),
+    ("Quarter", "int"),
+    ("Month", "int"),
+    ("MonthKey", "str"),
+    ("DayOfMonth", "int"),
+    ("Weekday", "int"),
+    ("IsWeekend", "int"),
+]
+CALENDAR_DDL = """\
+-- Tabella dimensione del calendario (una riga per giorno), generata con --calendar
+CREATE TABLE IF NOT EXISTS Calendar (
+  CalendarDate DATE NOT NULL,
+  Year SMALLINT NOT NULL,
+  Quarter TINYINT NOT NULL,
+  Month TINYINT NOT NULL,
+  MonthKey CHAR(7) NOT NULL,   -- AAAA-MM, come DATE_FORMAT(data, '%Y-%m')
+  DayOfMonth TINYINT NOT NULL,
+  Weekday TINYINT NOT NULL,    -- 1 = lunedì ... 7 = domenica (ISO 8601)
+  IsWeekend TINYINT NOT NULL,
+  PRIMARY KEY (CalendarDate)
+);
+"""
+
+
+class _Days:
+    # Colonne del calendario, in posizione giorno - FIRST_DAY
+    def __init__(self):
+        days = np.arange(_FIRST, LAST_DAY.toordinal() - _UNIX + 1, dtype="int64")
+        stamps = days.astype("datetime64[D]")
+        months = stamps.astype("datetime64[M]")
+        self.iso = np.datetime_as_string(stamps).astype(object)
+        self.year = months.astype("datetime64[Y]").astype("int64") + 1970
+        self.month = months.astype("int64") % 12 + 1
+        month_index = months.astype("int64") - months[0].astype("int64")
+        self.month_key = np.datetime_as_string(np.unique(months)).astype(object)[month_index]
+        self.day_of_month = (stamps - months.astype("datetime64[D]")).astype("int64") + 1
+        # il 1970-01-01 era un giovedì (4)
+        self.weekday = (days + 3) % 7 + 1
+
+
+@lru_cache(maxsize=None)
+def _days():
+    return _Days()
+
+
+@lru_cache(maxsize=None)
+def _clock():
+    # " HH:MM" per minuto del giorno e ":SS" per secondo del minuto
+    minutes = np.array([f" {m // 60:02d}:{m % 60:02d}" for m in range(1440)], dtype=object)
+    seconds = np.array([f":{s:02d}" for s in range(60)], dtype=object)
+    return minutes, seconds
+
+
+def _positions(days):
+    idx = np.asarray(days, dtype="int64") - _FIRST
+    if idx.size and (idx.min() < 0 or idx.max() >= len(_days().iso)):
+        raise ValueError(f"date fuori dal calendario ({FIRST_DAY} - {LAST_DAY})")
+    return idx
+
+
+@lru_cache(maxsize=None)
+def _parse(text):
+    return date.fromisoformat(text).toordinal() - _UNIX
+
+
+def day(value):
+    """Indice di giorno di una data (`date`, `datetime` o testo ISO, anche con l'ora)."""
+    if isinstance(value, str):
+        return _parse(value[:10])
+    return value.toordinal() - _UNIX
+
+
+def iso(days):
+    """Date ISO (AAAA-MM-GG) di una sequenza di indici di giorno."""
+    return _days().iso[_positions(days)].tolist()
+
+
+def iso_day(index):
+    """Data ISO di un solo indice di giorno."""
+    return _days().iso[index - _FIRST]
+
+
+def iso_datetimes(seconds):
+    """Datetime ISO con spazio (AAAA-MM-GG HH:MM:SS) da secondi dal 1970-01-01."""
+    days, rest = np.divmod(np.asarray(seconds, dtype="int64"), 86400)
+    minutes, secs = _clock()
+    return (_days().iso[_positions(days)] + minutes[rest // 60] + secs[rest % 60]).tolist()
+
+
+def month_keys(days):
+    """Chiavi AAAA-MM (come DATE_FORMAT(data, '%Y-%m')) di una sequenza di indici di giorno."""
+    return _days().month_key[_positions(days)].tolist()
+
+
+def months(days):
+    """Mesi (1-12) di una sequenza di indici di giorno."""
+    return _days().month[_positions(days)].tolist()
+
+
+def weekdays(days):
+    """Giorni della settimana ISO (1 = lunedì) di una sequenza di indici di giorno."""
+    return _days().weekday[_positions(days)].tolist()
+
+
+def days_between(start, end):
+    """Indici di giorno da `start` a `end` inclusi (date o testi ISO)."""
+    return np.arange(day(start), day(end) + 1, dtype="int64")
+
+
+def calendar_rows(start, end):
+    """Righe della tabella Calendar per i giorni da `start` a `end` inclusi."""
+    cal, idx = _days(), _positions(days_between(start, end))
+    weekday = cal.weekday[idx]
+    columns = zip(
+        cal.iso[idx].tolist(),
+        cal.year[idx].tolist(),
+        ((cal.month[idx] - 1) // 3 + 1).tolist(),
+        cal.month[idx].tolist(),
+        cal.month_key[idx].tolist(),
+        cal.day_of_month[idx].tolist(),
+        weekday.tolist(),
+        (weekday >= 6).astype("int64").tolist(),
+    )
+    yield from columns
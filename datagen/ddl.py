@@ -0,0 +1,302 @@
+"""
+Lettura delle DDL SQL (CREATE TABLE / CREATE INDEX) in un grafo dello schema.
+
+Da ogni file .sql si ricavano tabelle, colonne (tipo SQL, tipo dei writer,
+lunghezza massima, NULL, AUTO_INCREMENT), chiavi primarie, FK, vincoli UNIQUE
+e indici. Il resto del file (viste, SELECT, SET) viene ignorato.
+
+Il risultato del parsing viene salvato in `.cache/ddl/<sha256>.json`: finché
+il file non cambia, le esecuzioni successive leggono solo il JSON.
+
+    schema = ddl.load("prof_privato.sql")
+    schema["Lesson"].fks        # {"StudentID": ("Student", "StudentID"), ...}
+    schema.order()              # tabelle con i padri prima dei figli
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+
+from datagen.pools import CACHE_DIR as POOLS_CACHE_DIR
+
+CACHE_DIR = POOLS_CACHE_DIR.parent / "ddl"
+# Da incrementare quando cambia il formato del JSON in cache
+CACHE_VERSION = 1
+
+_INT_TYPES = {"int", "integer", "bigint", "smallint", "mediumint", "tinyint"}
+_STR_TYPES = {"varchar", "char", "text", "tinytext", "mediumtext", "longtext", "enum", "nvarchar"}
+_CREATE_TABLE = re.compile(r"create\s+table\s+(?:if\s+not\s+exists\s+)?([`\"\w.]+)\s*\(", re.I)
+_CREATE_INDEX = re.compile(r"create\s+(unique\s+)?index\s+([`\"\w]+)\s+on\s+([`\"\w.]+)\s*\(([^)]*)\)", re.I)
+_COLUMN = re.compile(r"([`\"\w]+)\s+(\w+)\s*(?:\(([^)]*)\))?\s*(.*)", re.S)
+
+_cache = {}
+
+
+class Column:
+    """Colonna di una tabella: `type` è il tipo dei writer (int, str, bool, ...)."""
+
+    def __init__(self, name, sql_type, type, length=None, nullable=True, auto_increment=False, default=None):
+        self.name = name
+        self.sql_type = sql_type
+        self.type = type
+        self.length = length
+        self.nullable = nullable
+        self.auto_increment = auto_increment
+        self.default = default
+
+    def __repr__(self):
+        return f"Column({self.name!r}, {self.sql_type!r})"
+
+
+class TableDef:
+    """Tabella della DDL: colonne in ordine, PK, FK {colonna: (tabella, colonna)}, UNIQUE."""
+
+    def __init__(self, name):
+        self.name = name
+        self.columns = {}
+        self.pk = []
+        self.fks = {}
+        self.unique = []
+        self.indexes = {}
+
+    def __repr__(self):
+        return f"TableDef({self.name!r})"
+
+    def column_types(self):
+        return [(c.name, c.type) for c in self.columns.values()]
+
+    # Lunghezza massima delle colonne testuali con un limite (VARCHAR(n), CHAR(n))
+    def lengths(self):
+        return {c.name: c.length for c in self.columns.values() if c.length is not None}
+
+    def parents(self):
+        return [t for t, _ in dict.fromkeys(self.fks.values()) if t != self.name]
+
+
+class DDLSchema:
+    """Grafo dello schema: tabelle nell'ordine della DDL, collegate dalle FK."""
+
+    def __init__(self, tables=()):
+        self.tables = {t.name: t for t in tables}
+
+    def __getitem__(self, name):
+        return self.tables[self._key(name)]
+
+    def __contains__(self, name):
+        try:
+            self._key(name)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.tables.values())
+
+    # I nomi di tabella in MySQL non distinguono maiuscole (su Windows/macOS)
+    def _key(self, name):
+        if name in self.tables:
+            return name
+        for key in self.tables:
+            if key.lower() == name.lower():
+                return key
+        raise KeyError(name)
+
+    def children(self, name):
+        name = self._key(name)
+        return [t for t in self if name in t.parents()]
+
+    def order(self):
+        """Tabelle in ordine topologico (padri prima dei figli, poi ordine della DDL)."""
+        done, order = set(), []
+        pending = list(self)
+        while pending:
+            ready = next((t for t in pending if all(p in done for p in t.parents())), None)
+            if ready is None:
+                raise ValueError(f"dipendenze FK circolari tra {', '.join(t.name for t in pending)}")
+            order.append(ready)
+            done.add(ready.name)
+            pending.remove(ready)
+        return order
+
+    def to_dict(self):
+        return {"version": CACHE_VERSION, "tables": [{
+            "name": t.name,
+            "columns": [vars(c) for c in t.columns.values()],
+            "pk": t.pk,
+            "fks": {col: list(ref) for col, ref in t.fks.items()},
+            "unique": [list(u) for u in t.unique],
+            "indexes": {name: list(cols) for name, cols in t.indexes.items()},
+        } for t in self]}
+
+    @classmethod
+    def from_dict(cls, data):
+        tables = []
+        for d in data["tables"]:
+            t = TableDef(d["name"])
+            t.columns = {c["name"]: Column(**c) for c in d["columns"]}
+            t.pk = d["pk"]
+            t.fks = {col: tuple(ref) for col, ref in d["fks"].items()}
+            t.unique = [tuple(u) for u in d["unique"]]
+            t.indexes = {name: tuple(cols) for name, cols in d["indexes"].items()}
+            tables.append(t)
+        return cls(tables)
+
+
+def _name(token):
+    return token.strip().strip("`\"")
+
+
+def _names(text):
+    return [_name(n) for n in text.split(",") if n.strip()]
+
+
+# Toglie i commenti -- e /* */ (fuori dalle stringhe)
+def strip_comments(sql):
+    return re.sub(r"""('(?:[^'\\]|\\.|'')*')|--[^\n]*|/\*.*?\*/""",
+                  lambda m: m.group(1) or "", sql, flags=re.S)
+
+
+# Divide il testo su `sep` ignorando separatori tra parentesi o tra apici
+def split_top_level(text, sep):
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+# Tipo dei writer e lunghezza massima a partire dal tipo SQL
+def column_type(sql_type, args):
+    base = sql_type.lower()
+    if base == "tinyint" and args == "1" or base in ("bool", "boolean", "bit"):
+        return "bool", None
+    if base in _INT_TYPES:
+        return "int", None
+    if base in ("decimal", "numeric"):
+        precision, _, scale = (args or "10,0").partition(",")
+        return f"decimal({int(precision)},{int(scale or 0)})", None
+    if base in ("float", "double", "real"):
+        return "float", None
+    if base == "date":
+        return "date", None
+    if base in ("datetime", "timestamp"):
+        return "datetime", None
+    if base == "time":
+        return "time", None
+    if base in _STR_TYPES:
+        length = int(args) if args and args.strip().isdigit() else None
+        return "str", length
+    raise ValueError(f"tipo SQL non supportato: {sql_type}")
+
+
+def _parse_column(table, item):
+    m = _COLUMN.match(item)
+    name, sql_type, args, rest = _name(m.group(1)), m.group(2), m.group(3), m.group(4)
+    type_, length = column_type(sql_type, args)
+    flags = rest.lower()
+    default = re.search(r"\bdefault\s+('(?:[^']|'')*'|\S+)", rest, re.I)
+    col = Column(name, f"{sql_type}({args})" if args else sql_type, type_, length,
+                 nullable="not null" not in flags and "primary key" not in flags,
+                 auto_increment="auto_increment" in flags,
+                 default=default.group(1).strip("'") if default else None)
+    table.columns[name] = col
+    if "primary key" in flags:
+        table.pk = [name]
+    if re.search(r"\bunique\b", flags):
+        table.unique.append((name,))
+    ref = re.search(r"references\s+([`\"\w.]+)\s*\(([^)]*)\)", rest, re.I)
+    if ref:
+        table.fks[name] = (_name(ref.group(1)), _names(ref.group(2))[0])
+
+
+def _parse_constraint(table, item):
+    item = re.sub(r"^constraint\s+[`\"\w]+\s+", "", item, flags=re.I)
+    low = item.lower()
+    if low.startswith("primary key"):
+        table.pk = _names(item[item.index("(") + 1:item.index(")")])
+    elif low.startswith("foreign key"):
+        m = re.match(r"foreign\s+key\s*\(([^)]*)\)\s*references\s+([`\"\w.]+)\s*\(([^)]*)\)", item, re.I)
+        for col, ref in zip(_names(m.group(1)), _names(m.group(3))):
+            table.fks[col] = (_name(m.group(2)), ref)
+    elif low.startswith("unique"):
+        table.unique.append(tuple(_names(item[item.index("(") + 1:item.rindex(")")])))
+    elif low.startswith(("key", "index")):
+        m = re.match(r"(?:key|index)\s+([`\"\w]+)\s*\(([^)]*)\)", item, re.I)
+        if m:
+            table.indexes[_name(m.group(1))] = tuple(_names(m.group(2)))
+    # CHECK e altri vincoli non servono alla generazione
+
+
+_CONSTRAINT_START = re.compile(r"(constraint|primary\s+key|foreign\s+key|unique|key|index|check)\b", re.I)
+
+
+def parse(sql):
+    """Analizza il testo di una DDL e restituisce un DDLSchema."""
+    tables = {}
+    for statement in split_top_level(strip_comments(sql), ";"):
+        m = _CREATE_TABLE.match(statement)
+        if m:
+            table = TableDef(_name(m.group(1)))
+            body = statement[m.end():statement.rindex(")")]
+            for item in split_top_level(body, ","):
+                if _CONSTRAINT_START.match(item):
+                    _parse_constraint(table, item)
+                else:
+                    _parse_column(table, item)
+            tables[table.name.lower()] = table
+            continue
+        m = _CREATE_INDEX.match(statement)
+        if m and _name(m.group(3)).lower() in tables:
+            table = tables[_name(m.group(3)).lower()]
+            cols = tuple(_names(m.group(4)))
+            table.indexes[_name(m.group(2))] = cols
+            if m.group(1):
+                table.unique.append(cols)
+    # i riferimenti delle FK usano il nome con cui la tabella è dichiarata
+    for table in tables.values():
+        table.fks = {col: (tables[t.lower()].name if t.lower() in tables else t, ref)
+                     for col, (t, ref) in table.fks.items()}
+    return DDLSchema(tables.values())
+
+
+def create_statements(sql):
+    """Istruzioni CREATE TABLE e CREATE INDEX del testo di una DDL, senza commenti, nell'ordine del file."""
+    return [statement for statement in split_top_level(strip_comments(sql), ";")
+            if _CREATE_TABLE.match(statement) or _CREATE_INDEX.match(statement)]
+
+
+def load(path):
+    """
+    DDLSchema di un file .sql, dalla cache in memoria o su disco se il
+    contenuto del file non è cambiato.
+    """
+    text = Path(path).read_bytes()
+    digest = hashlib.sha256(text).hexdigest()
+    if digest in _cache:
+        return _cache[digest]
+    cache_file = CACHE_DIR / f"{digest}.json"
+    schema = None
+    if cache_file.exists():
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+        if data.get("version") == CACHE_VERSION:
+            schema = DDLSchema.from_dict(data)
+    if schema is None:
+        schema = parse(text.decode("utf-8"))
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(f".tmp{os.getpid()}")
+        tmp.write_text(json.dumps(schema.to_dict(), indent=1), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    _cache[digest] = schema
+    return schema
@@ -0,0 +1,146 @@
+"""
+Generazione incrementale: nuove righe delle tabelle di attività (noleggi,
+lezioni, pagamenti, valutazioni) a partire da una cartella già generata.
+
+Da una cartella precedente si leggono i "livelli" di ogni tabella: righe,
+ultimo ID e ultima data. Di solito vengono da `_MANIFEST.json`; le cartelle
+più vecchie, senza manifest, vengono lette in streaming dai CSV (la PK e la
+colonna data, senza tenere le righe in memoria).
+
+Con questi livelli il motore (datagen.engine, `--append`):
+
+- non rigenera le tabelle padre: i loro ID restano i range 1..ultimo ID;
+  rigenera in memoria, senza scriverle, solo quelle che tengono stato per i
+  figli (hook `keep`), che a parità di seed danno le stesse righe;
+- genera le tabelle `delta` con ID dal successivo all'ultimo e date nella
+  finestra (giorno dopo l'ultima data, `--until`];
+- scrive solo queste tabelle in una cartella `<DB>_delta_<timestamp>`, con
+  `_IMPORT_ORDER.txt` e il manifest aggiornato: datagen.loader le accoda
+  alle tabelle esistenti, e la cartella può fare da base al delta successivo.
+
+Gli schemi che devono sapere quali righe precedenti sono ancora "aperte"
+(es. i noleggi non restituiti) le rileggono con `chain` e `table_rows`.
+"""
+import csv
+from datetime import date, timedelta
+from pathlib import Path
+
+from datagen.compression import open_text
+from datagen.output import data_files, find_table_file, previous_folder, read_manifest
+
+
+def _scan(schema, folder):
+    tables = {}
+    for table in schema:
+        name = find_table_file(folder, table.name)
+        if name is None:
+            raise ValueError(f"{folder}: manca {table.name}.csv (e non c'è _MANIFEST.json)")
+        rows, max_id, max_date = 0, 0, None
+        for path in data_files(folder, name):
+            with open_text(path) as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                pk = header.index(table.pk)
+                col = header.index(table.delta) if isinstance(table.delta, str) else None
+                for row in reader:
+                    rows += 1
+                    max_id = max(max_id, int(row[pk]))
+                    if col is not None and row[col] and (max_date is None or row[col] > max_date):
+                        max_date = row[col]
+        # senza manifest la scala non è nota: si assume quella di default
+        n = table.rows if isinstance(table.rows, int) else rows
+        tables[table.name] = {"file": name, "rows": rows, "n": n, "max_id": max_id, "max_date": max_date}
+    return {"schema": schema.name, "seed": schema.seed, "tables": tables}
+
+
+def high_water(schema, folder):
+    """
+    Livelli delle tabelle di `schema` nella cartella `folder`: dal manifest
+    se c'è, altrimenti leggendo i CSV.
+    """
+    manifest = read_manifest(folder)
+    if manifest is None:
+        return _scan(schema, folder)
+    if manifest["schema"] != schema.name:
+        raise ValueError(f"{folder}: generata per {manifest['schema']}, non per {schema.name}")
+    if manifest["seed"] != schema.seed:
+        raise ValueError(f"{folder}: seed {manifest['seed']} diverso da quello dello schema ({schema.seed})")
+    missing = [t.name for t in schema if t.name not in manifest["tables"]]
+    if missing:
+        raise ValueError(f"{folder}: tabelle assenti dal manifest {missing}")
+    return manifest
+
+
+def window(schema, levels, until=None):
+    """
+    Finestra (inizio, fine) delle date nuove: dal giorno dopo l'ultima data
+    delle tabelle delta fino a `until` (default oggi).
+    """
+    until = until or date.today()
+    dates = [levels["tables"][t.name]["max_date"] for t in schema if isinstance(t.delta, str)]
+    dates = [d for d in dates if d]
+    if not dates:
+        raise ValueError(f"{schema.name}: nessuna data nelle tabelle incrementali della cartella precedente")
+    start = date.fromisoformat(max(dates)[:10]) + timedelta(days=1)
+    if start > until:
+        raise ValueError(f"{schema.name}: nessun giorno nuovo, i dati arrivano già al {max(dates)[:10]}")
+    return start, until
+
+
+def chain(folder):
+    """
+    Cartelle di una catena di generazioni: `folder`, poi quella da cui è
+    stata generata con --append (`previous` nel manifest), fino alla
+    generazione completa.
+    """
+    folder = Path(folder)
+    while folder is not None:
+        yield folder
+        previous = previous_folder(folder)
+        if previous is not None and not previous.is_dir():
+            raise ValueError(f"{folder}: cartella precedente {previous.name} non trovata")
+        folder = previous
+
+
+def _columnar(path, columns):
+    try:
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("I formati parquet/arrow-ipc richiedono pyarrow: pip install pyarrow") from None
+    if path.suffix == ".parquet":
+        data = pyarrow.parquet.read_table(path, columns=list(columns))
+    else:
+        with pyarrow.ipc.open_file(path) as f:
+            data = f.read_all().select(list(columns))
+    values = [data.column(name).to_pylist() for name in columns]
+    for row in zip(*values):
+        yield tuple(v.isoformat() if isinstance(v, date) else v for v in row)
+
+
+def table_rows(folder, table, columns):
+    """
+    Valori delle colonne `columns` di ogni riga di `table` in `folder`, in
+    streaming: CSV (anche compressi o a parti) come testo, parquet e
+    arrow-ipc con i tipi Arrow (date in ISO). Un dump SQL non si rilegge.
+    """
+    name = find_table_file(folder, table)
+    if name is not None:
+        for path in data_files(folder, name):
+            with open_text(path) as f:
+                reader = csv.reader(f)
+                header = next(reader)
+                positions = [header.index(c) for c in columns]
+                for row in reader:
+                    yield tuple(row[i] for i in positions)
+        return
+    for suffix in (".parquet", ".arrow"):
+        path = folder / f"{table}{suffix}"
+        if path.exists():
+            yield from _columnar(path, columns)
+            return
+    manifest = read_manifest(folder) or {"tables": {}}
+    if (manifest["tables"].get(table, {}).get("file") or "").endswith(".sql"):
+        raise ValueError(f"{folder}: {table} è in un dump SQL, che non si rilegge: "
+                         f"generare la cartella di base in csv, parquet o arrow-ipc")
+    raise ValueError(f"{folder}: mancano i dati di {table}")
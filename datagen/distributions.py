@@ -0,0 +1,233 @@
+"""
+Distribuzioni non uniformi per le colonne dei generatori.
+
+Ogni distribuzione descrive i pesi di un dominio discreto di `k` elementi
+(posizioni 0..k-1): gli ID di una tabella padre, i valori di una colonna
+categorica, i giorni di una finestra di date. L'estrazione usa una tabella
+alias (metodo di Vose): costruita una volta per processo per ogni
+(distribuzione, k, origine) in O(k), poi ogni valore costa O(1) e una
+colonna intera si estrae in blocco con NumPy dal generatore dello shard.
+
+- `Uniform()`: tutti gli elementi con lo stesso peso;
+- `Zipf(s)`: peso 1 / rango^s, pochi elementi "caldi" ricevono la maggior
+  parte delle estrazioni; i ranghi sono sparsi sul dominio (`scatter`), così
+  le chiavi calde non sono tutte nelle prime pagine dell'indice;
+- `Normal(mean, sd)`: campana centrata su `mean` (frazioni del dominio);
+- `Weighted(*weights)`: pesi espliciti, uno per valore;
+- `Seasonal(weekday, month, trend)`: giorni pesati per giorno della
+  settimana (lunedì..domenica), mese e crescita lineare lungo la finestra.
+
+I generatori dichiarano le distribuzioni delle colonne in un dizionario
+{"Tabella.colonna": distribuzione} passato allo Schema; da riga di comando
+`--dist Tabella.colonna=SPEC` ne cambia una (SPEC come `zipf:1.3`,
+`normal:0.3,0.1`, `weighted:5/3/1`, `seasonal:weekday=1/1/1/1/1/0.5/0.2`,
+`uniform`) e `--uniform` le rende tutte uniformi.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from datagen import dates
+
+
+class AliasTable:
+    """Tabella alias di Vose: estrazione O(1) di posizioni con pesi arbitrari."""
+
+    def __init__(self, weights):
+        w = np.asarray(weights, dtype="float64")
+        k = len(w)
+        if k == 0 or (w < 0).any() or not w.sum() > 0:
+            raise ValueError("pesi non validi: servono valori >= 0 con somma positiva")
+        scaled = (w * k / w.sum()).tolist()
+        prob, alias = [1.0] * k, list(range(k))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, g = small.pop(), large.pop()
+            prob[s], alias[s] = scaled[s], g
+            scaled[g] += scaled[s] - 1.0
+            (small if scaled[g] < 1.0 else large).append(g)
+        # quel che resta in small/large ha probabilità 1 (arrotondamenti)
+        self.prob = np.asarray(prob)
+        self.alias = np.asarray(alias, dtype="int64")
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, gen, n):
+        i = gen.integers(0, len(self.prob), size=n)
+        return np.where(gen.random(n) < self.prob[i], i, self.alias[i])
+
+
+@lru_cache(maxsize=64)
+def _alias(dist, k, origin):
+    return AliasTable(dist.weights(k, origin))
+
+
+# Vero se almeno un elemento del dominio ha peso positivo
+@lru_cache(maxsize=64)
+def _weighted(dist, k, origin):
+    return bool(np.asarray(dist.weights(k, origin)).sum() > 0)
+
+
+class Distribution:
+    """
+    Distribuzione su un dominio discreto; le sottoclassi definiscono
+    `weights(k, origin)` (`origin` è il primo giorno per i domini di date).
+    """
+
+    name = None
+
+    def __init__(self, *params):
+        self.params = params
+
+    def __repr__(self):
+        args = ",".join("/".join(f"{v:g}" for v in p) if isinstance(p, tuple) else f"{p:g}" for p in self.params)
+        return f"{self.name}:{args}" if args else self.name
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.params == other.params
+
+    def __hash__(self):
+        return hash((type(self), self.params))
+
+    def weights(self, k, origin=0):
+        raise NotImplementedError
+
+    def positions(self, gen, n, k, origin=0):
+        """`n` posizioni in [0, k) estratte con i pesi della distribuzione."""
+        return _alias(self, k, origin).sample(gen, n)
+
+    def top(self, k, count, origin=0):
+        """Le `count` posizioni più probabili, dalla più probabile."""
+        return np.argsort(-np.asarray(self.weights(k, origin)), kind="stable")[:count].tolist()
+
+    def pick(self, gen, domain, n):
+        """`n` elementi di `domain` (range di ID o sequenza di valori)."""
+        pos = self.positions(gen, n, len(domain))
+        if isinstance(domain, range) and domain.step == 1:
+            return (pos + domain.start).tolist()
+        return np.asarray(domain, dtype=object)[pos].tolist()
+
+    def days(self, gen, start, days, n):
+        """
+        Offset in giorni in [0, days] da `start` (indici di giorno per
+        datagen.dates). Se tutti i giorni della finestra hanno peso nullo
+        (es. un --append di una sola domenica con peso 0 alla domenica) i
+        giorni sono estratti in modo uniforme.
+        """
+        origin = dates.day(start)
+        if not _weighted(self, days + 1, origin):
+            return gen.integers(0, days + 1, size=n)
+        return self.positions(gen, n, days + 1, origin)
+
+
+class Uniform(Distribution):
+    name = "uniform"
+
+    def weights(self, k, origin=0):
+        return np.ones(k)
+
+    # nessuna tabella: un intero uniforme per valore
+    def positions(self, gen, n, k, origin=0):
+        return gen.integers(0, k, size=n)
+
+
+class Zipf(Distribution):
+    name = "zipf"
+
+    def __init__(self, s=1.0, scatter=1):
+        super().__init__(float(s), int(scatter))
+        self.s, self.scatter = float(s), bool(scatter)
+
+    def weights(self, k, origin=0):
+        ranks = np.arange(1, k + 1, dtype="float64")
+        if self.scatter:
+            # permutazione fissa per dimensione del dominio: stesse chiavi calde
+            # a ogni esecuzione, ma sparse
+            ranks = ranks[np.random.default_rng(k).permutation(k)]
+        return ranks ** -self.s
+
+
+class Normal(Distribution):
+    name = "normal"
+
+    def __init__(self, mean=0.5, sd=0.15):
+        super().__init__(float(mean), float(sd))
+        self.mean, self.sd = float(mean), float(sd)
+
+    def weights(self, k, origin=0):
+        x = (np.arange(k) + 0.5) / k
+        # il minimo evita pesi tutti nulli con sd molto piccola
+        return np.exp(-0.5 * ((x - self.mean) / self.sd) ** 2) + 1e-12
+
+
+class Weighted(Distribution):
+    name = "weighted"
+
+    def __init__(self, *weights):
+        if len(weights) == 1 and isinstance(weights[0], tuple):
+            weights = weights[0]
+        super().__init__(tuple(float(w) for w in weights))
+        self.values = self.params[0]
+
+    def weights(self, k, origin=0):
+        if k != len(self.values):
+            raise ValueError(f"{self!r}: {len(self.values)} pesi per un dominio di {k} valori")
+        return np.asarray(self.values)
+
+
+class Seasonal(Distribution):
+    name = "seasonal"
+
+    def __init__(self, weekday=(1, 1, 1, 1, 1, 1, 1), month=(1,) * 12, trend=0.0):
+        weekday, month = tuple(float(w) for w in weekday), tuple(float(w) for w in month)
+        if len(weekday) != 7 or len(month) != 12:
+            raise ValueError("seasonal: servono 7 pesi per i giorni della settimana e 12 per i mesi")
+        super().__init__(weekday, month, float(trend))
+        self.weekday, self.month, self.trend = weekday, month, float(trend)
+
+    def weights(self, k, origin=0):
+        days = origin + np.arange(k)
+        w = np.asarray(self.weekday)[np.asarray(dates.weekdays(days)) - 1]
+        w = w * np.asarray(self.month)[np.asarray(dates.months(days)) - 1]
+        return w * (1 + self.trend * np.arange(k) / max(k - 1, 1))
+
+
+KINDS = {cls.name: cls for cls in (Uniform, Zipf, Normal, Weighted, Seasonal)}
+UNIFORM = Uniform()
+
+
+def _number_or_list(text):
+    if "/" in text:
+        return tuple(float(v) for v in text.split("/"))
+    return float(text)
+
+
+def parse(spec):
+    """Distribuzione da un testo `nome[:param,...]` (parametri anche nome=valore, liste con /)."""
+    name, _, params = spec.strip().partition(":")
+    if name.lower() not in KINDS:
+        raise ValueError(f"distribuzione sconosciuta {name!r} (disponibili: {', '.join(KINDS)})")
+    args, kwargs = [], {}
+    for item in filter(None, (p.strip() for p in params.split(","))):
+        key, eq, value = item.partition("=")
+        if eq:
+            kwargs[key.strip()] = _number_or_list(value)
+        else:
+            args.append(_number_or_list(item))
+    try:
+        return KINDS[name.lower()](*args, **kwargs)
+    except TypeError as e:
+        raise ValueError(f"parametri non validi per {name}: {e}") from None
+
+
+def parse_overrides(items):
+    """{"Tabella.colonna": distribuzione} dagli argomenti `--dist Tabella.colonna=SPEC`."""
+    overrides = {}
+    for item in items:
+        column, eq, spec = item.partition("=")
+        if not eq or "." not in column:
+            raise ValueError(f"--dist: atteso Tabella.colonna=SPEC, non {item!r}")
+        overrides[column.strip()] = parse(spec)
+    return overrides
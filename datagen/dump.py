@@ -0,0 +1,85 @@
+"""
+Dump SQL di una generazione (`--format sql`), per gli ambienti in cui non si
+può importare da file (LOAD DATA, import CSV di phpMyAdmin).
+
+Durante la generazione ogni tabella viene scritta da datagen.writers
+(`write_sql`) in un file `<tabella>.sql` con i soli INSERT multi-riga; alla
+fine i file vengono uniti, nell'ordine delle FK, in un unico
+`<DB>.sql`:
+
+- intestazione: `SET NAMES utf8mb4`, `foreign_key_checks = 0`,
+  `unique_checks = 0`, `autocommit = 0` e `NO_BACKSLASH_ESCAPES` nel
+  sql_mode (nei testi l'unico carattere da trattare è l'apice, raddoppiato);
+- DDL: `DROP TABLE IF EXISTS` e le istruzioni CREATE TABLE / CREATE INDEX
+  prese dal file .sql dello schema (senza viste e query), più Calendar con
+  `--calendar`; un dump `--append` non ha DDL e accoda soltanto le righe;
+- dati: INSERT di `--sql-rows` righe, COMMIT ogni `--sql-commit` INSERT e a
+  fine tabella;
+- chiusura: COMMIT e ripristino delle variabili di sessione.
+
+Il dump si importa con `mysql db < BibliotecaDB.sql`, oppure con
+datagen.loader (anche in SQLite, vedi `statements`).
+"""
+import os
+import shutil
+
+from datagen.writers import WRITE_BUFFER
+
+HEADER = """\
+SET NAMES utf8mb4;
+SET @OLD_SQL_MODE = @@sql_mode;
+SET sql_mode = CONCAT_WS(',', NULLIF(@@sql_mode, ''), 'NO_BACKSLASH_ESCAPES');
+SET foreign_key_checks = 0;
+SET unique_checks = 0;
+SET autocommit = 0;
+"""
+FOOTER = """
+COMMIT;
+SET autocommit = 1;
+SET unique_checks = 1;
+SET foreign_key_checks = 1;
+SET sql_mode = @OLD_SQL_MODE;
+"""
+
+
+def write_dump(outdir, name, segments, *, comment="", tables=(), ddl=()):
+    """
+    Scrive `outdir/<name>.sql`: intestazione, DROP TABLE IF EXISTS di
+    `tables` e istruzioni `ddl`, poi il contenuto dei file `segments` (in
+    ordine), che vengono cancellati. Restituisce il nome del dump.
+    """
+    path = outdir / f"{name}.sql"
+    with open(path, "wb") as out:
+        text = "".join(f"-- {line}\n" for line in comment.splitlines()) + HEADER
+        if tables or ddl:
+            text += "\n-- DDL\n"
+            text += "".join(f"DROP TABLE IF EXISTS `{table}`;\n" for table in reversed(tables))
+            text += "".join(f"{statement};\n" for statement in ddl)
+        out.write(text.encode("utf-8"))
+        for segment in segments:
+            with open(segment, "rb") as f:
+                shutil.copyfileobj(f, out, WRITE_BUFFER)
+        out.write(FOOTER.encode("utf-8"))
+    for segment in segments:
+        os.unlink(segment)
+    return path.name
+
+
+def statements(f):
+    """
+    Istruzioni di un dump (file di testo aperto), senza il `;` finale.
+    Un'istruzione finisce con una riga che termina con `;` fuori dagli
+    apici: con NO_BACKSLASH_ESCAPES un apice nei testi è sempre doppio, e
+    basta contarli.
+    """
+    lines, quotes = [], 0
+    for line in f:
+        if not lines and (line.startswith("--") or not line.strip()):
+            continue
+        lines.append(line)
+        quotes += line.count("'")
+        if quotes % 2 == 0 and line.rstrip().endswith(";"):
+            yield "".join(lines).rstrip().removesuffix(";")
+            lines, quotes = [], 0
+    if lines:
+        yield "".join(lines).rstrip()
@@ -0,0 +1,712 @@
+"""
+Motore di generazione condiviso dai generatori dei database.
+
+Ogni database è descritto da uno `Schema`: l'elenco delle `Table` con colonne
+e tipi, chiavi (PK, FK, UK), numero di righe e la funzione gen_* che produce
+le righe di uno shard. Le righe sono tuple con i valori nell'ordine delle
+colonne della DDL: niente chiavi ripetute in ogni riga, e i writer le
+scrivono per posizione. Colonne, tipi, chiavi e lunghezze VARCHAR si leggono
+dalla DDL dello schema (`sql=`), senza ripeterli in Python. Il motore:
+
+- ricava dalle FK l'ordine di generazione e di import (padri prima dei figli);
+- genera ogni tabella a shard (su più processi con `--workers`);
+- genera insieme, in thread diversi, le tabelle i cui padri sono già pronti
+  (fino a `--concurrency` tabelle, di default quanti i worker): i loro shard
+  condividono il pool di processi, e il tempo totale si avvicina a quello
+  della catena di tabelle più lenta invece che alla somma;
+- scrive ogni tabella in streaming con i writer di datagen.writers (la
+  scrittura su disco in un thread in background), limitando i testi alla
+  lunghezza delle colonne; con `--compress` e `--part-size` i CSV sono
+  compressi a blocchi in parallelo e divisi in parti elencate in
+  `<tabella>.parts.json`; con `--format sql` le tabelle finiscono in un
+  unico dump `<DB>.sql` con la DDL e INSERT multi-riga (vedi datagen.dump);
+- scrive `_IMPORT_ORDER.txt` e `_MANIFEST.json` (righe, ultimo ID e ultima
+  data di ogni tabella) nella cartella di output;
+- con `--append <cartella>` genera soltanto le righe nuove delle tabelle
+  `delta`, dopo quelle della cartella indicata (vedi datagen.delta);
+- moltiplica il numero di righe per `--scale` (tranne le tabelle `scaled=False`)
+  e tiene per ogni tabella righe, secondi, byte scritti e picco di memoria
+  (`ctx.stats`, usato da benchmarks/bench_generators.py);
+- registra ogni fase (tempo reale e CPU, righe, byte, memoria) e lo SHA-256
+  dei file nel manifest; con `--profile` salva un profilo cProfile per fase
+  (vedi datagen.profiling);
+- con `--calendar` scrive anche la tabella dimensione `Calendar` (un giorno
+  per riga, vedi datagen.dates) per i giorni indicati dallo schema, con la
+  sua DDL in `_CALENDAR.sql`;
+- passa ai gen_* le distribuzioni delle colonne dichiarate dallo schema
+  (`ctx.distribution("Tabella.colonna")`, vedi datagen.distributions), che
+  `--dist` e `--uniform` cambiano da riga di comando.
+
+Le tabelle comunicano tramite il `Context` della generazione: `ctx.ids(t)`
+restituisce il range degli ID già generati di `t`, `ctx.state` contiene le
+strutture condivise (inventari, colonne compatte) riempite dagli hook `keep`.
+Una tabella parte solo quando tutti i padri delle sue FK sono finiti: lo stato
+che un gen_* legge da `ctx.state` deve venire da una tabella padre, o da una
+tabella indicata in `after`.
+
+Esempio minimo:
+
+    SCHEMA = Schema("Demo", seed=42, sql="demo.sql", tables=[
+        Table("Author", gen_authors, rows=100),
+        Table("Book", gen_books, rows=1000, args=lambda ctx: (ctx.ids("Author"),)),
+    ])
+
+    if __name__ == "__main__":
+        engine.main(SCHEMA)
+"""
+import argparse
+from operator import itemgetter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import time
+
+from datagen import dates, ddl, delta
+from datagen.distributions import UNIFORM, parse_overrides
+from datagen.compression import COMPRESSIONS
+from datagen.dump import write_dump
+from datagen.output import CALENDAR_DDL_FILE, output_folder, write_import_order, write_manifest, write_parts_index
+from datagen.profiling import Recorder, environment, peak_rss_mb, sha256
+from datagen.sharding import generate, worker_pool
+from datagen.writers import (EXTENSIONS, FORMATS, ROW_GROUP_SIZE, SQL_COMMIT, SQL_ROWS, write_csv_parts, write_sql,
+                             write_table)
+
+
+class Table:
+    """
+    Spec di una tabella.
+
+    - `gen`: funzione gen_*(shard, *args) che produce le righe di uno shard
+      (tuple nell'ordine di `columns`)
+    - `rows`: numero di ID da generare (int, moltiplicato per la scala, o
+      funzione del Context, usata così com'è)
+    - `columns`: lista (nome, tipo) nell'ordine della DDL (tipi di datagen.writers)
+    - `pk`: colonna chiave primaria (default: la prima)
+    - `fks`: {colonna: tabella padre}
+    - `unique`: vincoli UNIQUE, ognuno una tupla di colonne
+    - `lengths`: {colonna: lunghezza massima} dei testi (VARCHAR(n))
+    - `args`: argomenti extra di `gen` (tupla o funzione del Context)
+    - `parallel`: False se gen usa stato del processo principale
+    - `single`: True se la tabella va generata in un solo shard (stato globale)
+    - `keep`: keep(ctx, rows) rilancia le righe conservando ciò che serve ai figli
+    - `output`: output(ctx) -> righe; la tabella viene scritta per ultima con
+      queste righe invece che con quelle di `gen` (es. stato aggiornato dai figli)
+    - `scaled`: False per le tabelle con righe fisse (liste predefinite), che
+      la scala non moltiplica
+    - `delta`: colonna data (o True se la tabella non ne ha una propria) delle
+      tabelle di attività che la generazione incrementale estende
+    - `after`: tabelle da generare prima anche se non sono padri nelle FK
+      (es. il gen_* campiona da uno stato che quelle riempiono in `ctx.state`)
+
+    Se lo Schema ha una DDL, colonne, chiavi e lunghezze non indicate vengono
+    lette da lì (datagen.ddl).
+    """
+
+    def __init__(self, name, gen, rows, *, columns=None, pk=None, fks=None, unique=None, lengths=None,
+                 args=(), parallel=True, single=False, keep=None, output=None, scaled=True,
+                 delta=None, after=()):
+        self.name = name
+        self.gen = gen
+        self.rows = rows
+        self.columns = list(columns) if columns is not None else None
+        self.pk = pk
+        self.fks = dict(fks) if fks is not None else None
+        self.unique = [(u,) if isinstance(u, str) else tuple(u) for u in unique] if unique is not None else None
+        self.lengths = dict(lengths) if lengths is not None else None
+        self.args = args
+        self.parallel = parallel
+        self.single = single
+        self.keep = keep
+        self.output = output
+        self.scaled = scaled
+        self.delta = delta
+        self.after = (after,) if isinstance(after, str) else tuple(after)
+
+    def __repr__(self):
+        return f"Table({self.name!r})"
+
+    # Completa la spec con quanto dichiarato nella DDL (TableDef di datagen.ddl)
+    def bind(self, tdef):
+        if self.columns is None:
+            self.columns = tdef.column_types()
+        if self.pk is None and len(tdef.pk) == 1:
+            self.pk = tdef.pk[0]
+        if self.fks is None:
+            self.fks = {col: table for col, (table, _) in tdef.fks.items()}
+        if self.unique is None:
+            self.unique = list(tdef.unique)
+        if self.lengths is None:
+            self.lengths = tdef.lengths()
+
+    def check(self):
+        if self.columns is None:
+            raise ValueError(f"{self.name}: colonne non indicate e tabella assente dalla DDL")
+        self.pk = self.pk or self.columns[0][0]
+        self.fks = self.fks or {}
+        self.unique = self.unique or []
+        self.lengths = self.lengths or {}
+        names = self.column_names()
+        for col in [self.pk, *self.fks, *(c for u in self.unique for c in u), *self.lengths]:
+            if col not in names:
+                raise ValueError(f"{self.name}: colonna sconosciuta {col!r}")
+
+    def column_names(self):
+        return [name for name, _ in self.columns]
+
+    # Posizione di una colonna nelle righe (tuple) della tabella
+    def index(self, column):
+        return self.column_names().index(column)
+
+    def getter(self, *columns):
+        """Funzione che estrae da una riga i valori di `columns` (una tupla se più di una)."""
+        return itemgetter(*(self.index(c) for c in columns))
+
+    # Tabelle padre (esclusi i riferimenti a sé stessa) e dipendenze `after`
+    def parents(self):
+        return [t for t in dict.fromkeys([*self.fks.values(), *self.after]) if t != self.name]
+
+
+class Schema:
+    """
+    Spec di un database: tabelle, seed, prefisso della cartella di output e,
+    facoltative, la DDL (.sql) da cui leggere colonne, tipi e chiavi,
+    `calendar`, funzione del Context che restituisce i giorni (inizio, fine)
+    della tabella Calendar scritta con `--calendar`, e `distributions`,
+    {"Tabella.colonna": distribuzione} delle colonne non uniformi.
+    """
+
+    def __init__(self, name, tables, *, seed, folder=None, sql=None, calendar=None, distributions=None):
+        self.name = name
+        self.seed = seed
+        self.folder = folder or name
+        self.sql = sql
+        self.calendar = calendar
+        self.distributions = dict(distributions or {})
+        self.ddl = ddl.load(sql) if sql is not None else None
+        self.tables = {}
+        for table in tables:
+            if table.name in self.tables:
+                raise ValueError(f"{name}: tabella {table.name!r} definita due volte")
+            if self.ddl is not None and table.name in self.ddl:
+                table.bind(self.ddl[table.name])
+            table.check()
+            self.tables[table.name] = table
+        for table in tables:
+            missing = [p for p in table.parents() if p not in self.tables]
+            if missing:
+                raise ValueError(f"{name}: {table.name} fa riferimento a tabelle inesistenti {missing}")
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    def __iter__(self):
+        return iter(self.tables.values())
+
+    # {tabella: [(colonna, tipo)]}, nell'ordine di dichiarazione
+    def columns(self):
+        return {t.name: t.columns for t in self}
+
+    def order(self):
+        """
+        Tabelle in ordine topologico sulle FK (padri prima dei figli); a parità
+        di dipendenze resta l'ordine di dichiarazione.
+        """
+        done, order = set(), []
+        pending = list(self)
+        while pending:
+            ready = [t for t in pending if all(p in done for p in t.parents())]
+            if not ready:
+                cycle = ", ".join(t.name for t in pending)
+                raise ValueError(f"{self.name}: dipendenze FK circolari tra {cycle}")
+            table = ready[0]
+            order.append(table)
+            done.add(table.name)
+            pending.remove(table)
+        return order
+
+
+# Limita i testi alla lunghezza della colonna (VARCHAR(n) della DDL): i gen_*
+# non devono tagliare a mano i singoli campi. Le righe sono tuple: solo quelle
+# con un testo troppo lungo vengono ricostruite
+def bounded(rows, table):
+    bounds = [(table.index(name), n) for name, n in table.lengths.items()]
+    for row in rows:
+        for i, n in bounds:
+            v = row[i]
+            if v.__class__ is str and len(v) > n:
+                row = (*row[:i], v[:n], *row[i + 1:])
+        yield row
+
+
+# Controlla sulla prima riga che il gen_* produca tuple con un valore per colonna
+def checked(rows, table):
+    rows = iter(rows)
+    for row in rows:
+        if not isinstance(row, tuple) or len(row) != len(table.columns):
+            raise ValueError(f"{table.name}: le righe devono essere tuple di {len(table.columns)} valori "
+                             f"({', '.join(table.column_names())}), non {row!r}")
+        yield row
+        break
+    yield from rows
+
+
+class Context:
+    """Stato di una generazione: cartella, pool di processi, conteggi, file, statistiche."""
+
+    def __init__(self, schema, outdir, *, pool=None, fmt="csv", row_group_size=ROW_GROUP_SIZE, scale=1.0,
+                 distributions=None, profile=False, compress="none", part_bytes=None, sql_rows=SQL_ROWS,
+                 sql_commit=SQL_COMMIT):
+        self.schema = schema
+        self.outdir = outdir
+        self.pool = pool
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        # CSV compressi e/o divisi in parti con un indice per tabella (vedi datagen.writers)
+        self.compress = compress
+        self.part_bytes = part_bytes
+        # --format sql: righe per INSERT e INSERT per COMMIT (vedi datagen.dump)
+        self.sql_rows = sql_rows
+        self.sql_commit = sql_commit
+        self.dump = None
+        self.scale = scale
+        self.distributions = dict(schema.distributions) if distributions is None else distributions
+        self.state = {}
+        self.counts = {}        # righe scritte in questa generazione
+        self.last = {}          # ultimo ID di ogni tabella
+        self.sizes = {}         # ID passati al gen_* (shard) di ogni tabella
+        self.max_dates = {}     # ultima data delle tabelle delta
+        self.files = {}
+        self.parts = {}         # parti di ogni tabella scritta a parti (indice)
+        self.stats = {}
+        self.recorder = Recorder(outdir, profile)
+        self.checksums = {}     # {file: {"bytes", "sha256"}}
+        self.concurrency = 1    # tabelle generate insieme (generate_tables)
+        # generazione incrementale: cartella e livelli precedenti, finestra di date
+        self.previous = None
+        self.levels = None
+        self.span = None
+        self.base_span = None   # finestra dello schema, a cui è proporzionata quella nuova
+        # giorni (inizio, fine) già nella tabella Calendar, ISO
+        self.calendar = None
+
+    # ID generati di una tabella padre (le PK sono contigue a partire da 1)
+    def ids(self, table):
+        return range(1, self.last[table] + 1)
+
+    # Primo ID da generare: 1, o il successivo all'ultimo con --append
+    def first_id(self, table):
+        if self.levels is None:
+            return 1
+        return self.levels["tables"][table]["max_id"] + 1
+
+    # Finestra di date delle righe nuove: (start, end) dello schema, oppure
+    # quella successiva ai dati precedenti con --append (ricordando quella
+    # dello schema per per_window: gli args delle tabelle delta la chiedono
+    # prima che se ne contino le righe)
+    def window(self, start, end):
+        if self.span is None:
+            return start, end
+        self.base_span = (start, end)
+        return self.span
+
+    # Con --append, `n` righe riferite alla finestra dello schema diventano
+    # quelle della finestra nuova, in proporzione ai giorni (almeno 1)
+    def per_window(self, n):
+        if self.span is None or self.base_span is None:
+            return n
+        days = (self.span[1] - self.span[0]).days + 1
+        base = (self.base_span[1] - self.base_span[0]).days + 1
+        return max(1, round(n * days / base))
+
+    # Con --append le tabelle non delta non si rigenerano
+    def replays(self, table):
+        return self.levels is not None and not table.delta
+
+    def resume(self, previous, levels, span):
+        self.previous = previous
+        self.levels = levels
+        self.span = span
+        self.calendar = levels.get("calendar")
+
+    def _resolve(self, value):
+        return value(self) if callable(value) else value
+
+    # Distribuzione della colonna "Tabella.colonna" (uniforme se lo schema non ne dichiara una)
+    def distribution(self, name):
+        return self.distributions.get(name, UNIFORM)
+
+    # Numero `n` moltiplicato per la scala della generazione (almeno 1)
+    def scaled(self, n):
+        return n if self.scale == 1 else max(1, round(n * self.scale))
+
+    # Righe da generare per `table` (Table o nome)
+    def rows(self, table):
+        table = self.schema[table] if isinstance(table, str) else table
+        if callable(table.rows):
+            return table.rows(self)
+        n = self.scaled(table.rows) if table.scaled else table.rows
+        return self.per_window(n) if table.delta else n
+
+    def shards(self, table, n=None, first=1):
+        args = self._resolve(table.args)
+        n = self.rows(table) if n is None else n
+        self.sizes[table.name] = n
+        return generate(table.gen, table.name, n, seed=self.schema.seed, first=first,
+                        pool=self.pool if table.parallel else None, args=tuple(args), single=table.single,
+                        usage=self.recorder.current, profile=self.recorder.worker_profile())
+
+    # True se i CSV vanno compressi o divisi in parti
+    @property
+    def split(self):
+        return self.compress != "none" or bool(self.part_bytes)
+
+    def write(self, table, rows):
+        rows = checked(rows, table)
+        if table.lengths:
+            rows = bounded(rows, table)
+        if self.split:
+            self.counts[table.name], index = write_csv_parts(self.outdir, table.name, table.columns, rows,
+                                                             self.compress, self.part_bytes)
+            self.files[table.name] = write_parts_index(self.outdir, index)
+            self.parts[table.name] = index["parts"]
+            return sum(part["bytes"] for part in index["parts"])
+        path = self.outdir / f"{table.name}{EXTENSIONS[self.fmt]}"
+        if self.fmt == "sql":
+            self.counts[table.name] = write_sql(path, table.name, table.columns, rows, self.sql_rows, self.sql_commit)
+        else:
+            self.counts[table.name] = write_table(path, table.columns, rows, self.fmt, self.row_group_size)
+        self.files[table.name] = path.name
+        return path.stat().st_size
+
+    # Somma tempo e byte di una fase della tabella alle sue statistiche
+    def _record(self, table, start, size=0):
+        stats = self.stats.setdefault(table.name, {"rows": 0, "seconds": 0.0, "bytes": 0, "peak_rss_mb": None})
+        stats["rows"] = self.counts[table.name]
+        stats["seconds"] = round(stats["seconds"] + time.perf_counter() - start, 4)
+        stats["bytes"] += size
+        stats["peak_rss_mb"] = peak_rss_mb()
+
+    # Tiene l'ultima data della colonna `delta` mentre le righe passano
+    def _track_dates(self, table, rows):
+        column, last = table.index(table.delta), self.max_dates.get(table.name)
+        for row in rows:
+            value = row[column]
+            if value is not None and (last is None or value > last):
+                last = value
+            yield row
+        self.max_dates[table.name] = None if last is None else str(last)
+
+    # Genera una tabella: la scrive subito, oppure (con `output`) ne conserva
+    # soltanto lo stato e rimanda la scrittura alla fine
+    def generate(self, table):
+        with self.recorder.stage("generate", table.name) as stage:
+            start = time.perf_counter()
+            first = self.first_id(table.name)
+            rows = self.shards(table, first=first)
+            if table.keep is not None:
+                rows = table.keep(self, rows)
+            if isinstance(table.delta, str):
+                if self.levels is not None:
+                    self.max_dates[table.name] = self.levels["tables"][table.name]["max_date"]
+                rows = self._track_dates(table, rows)
+            if table.output is None:
+                size = self.write(table, rows)
+            else:
+                size = 0
+                self.counts[table.name] = sum(1 for _ in rows)
+            self.last[table.name] = first - 1 + self.counts[table.name]
+            self._record(table, start, size)
+            stage.update(rows=self.counts[table.name], bytes=size)
+
+    # Tabella della generazione precedente (--append): restano i suoi ID e, se
+    # ha un hook `keep`, lo stato per i figli, rigenerato in memoria con le
+    # stesse righe di allora (stesso seed e stesso numero di ID)
+    def replay(self, table):
+        level = self.levels["tables"][table.name]
+        self.last[table.name] = level["max_id"]
+        self.sizes[table.name] = level["n"]
+        self.max_dates[table.name] = level.get("max_date")
+        if table.keep is not None:
+            with self.recorder.stage("replay", table.name) as stage:
+                stage["rows"] = sum(1 for _ in table.keep(self, self.shards(table, n=level["n"])))
+
+    def manifest(self):
+        tables = {}
+        for table in self.schema.order():
+            name = table.name
+            tables[name] = {"file": self.files.get(name), "rows": self.counts.get(name, 0),
+                            "n": self.sizes.get(name), "max_id": self.last.get(name, 0),
+                            "max_date": self.max_dates.get(name)}
+        return {
+            "schema": self.schema.name,
+            "ddl": None if self.schema.sql is None else str(Path(self.schema.sql).resolve()),
+            "seed": self.schema.seed,
+            "scale": self.scale,
+            "format": self.fmt,
+            "compression": self.compress,
+            "part_bytes": self.part_bytes,
+            "sql": None if self.dump is None else {"rows_per_insert": self.sql_rows, "commit_every": self.sql_commit},
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "previous": None if self.previous is None else str(self.previous.resolve()),
+            "window": None if self.span is None else [d.isoformat() for d in self.span],
+            "calendar": self.calendar,
+            "distributions": {name: repr(d) for name, d in sorted(self.distributions.items())},
+            "workers": self.pool.workers if self.pool is not None else 1,
+            "concurrency": self.concurrency,
+            "environment": environment(),
+            "tables": tables,
+            "files": self.checksums,
+            "stages": self.recorder.stages,
+            "totals": self.recorder.totals(),
+        }
+
+    # Scrittura rimandata di una tabella con `output`
+    def write_output(self, table):
+        with self.recorder.stage("write", table.name) as stage:
+            start = time.perf_counter()
+            size = self.write(table, table.output(self))
+            self._record(table, start, size)
+            stage.update(rows=self.counts[table.name], bytes=size)
+
+    # Tabella Calendar (--calendar): i giorni dello schema, con --append solo
+    # quelli dopo il calendario della cartella precedente
+    def write_calendar(self):
+        if self.schema.calendar is None:
+            raise ValueError(f"{self.schema.name}: lo schema non indica i giorni del calendario")
+        start, end = self.schema.calendar(self)
+        if self.calendar is not None:
+            start = max(start, date.fromisoformat(self.calendar[1]) + timedelta(days=1))
+            if start > end:
+                return
+        with self.recorder.stage("calendar", dates.CALENDAR) as stage:
+            began = time.perf_counter()
+            table = Table(dates.CALENDAR, None, 0, columns=dates.CALENDAR_COLUMNS, pk="CalendarDate")
+            table.check()
+            size = self.write(table, dates.calendar_rows(start, end))
+            (self.outdir / CALENDAR_DDL_FILE).write_text(dates.CALENDAR_DDL, encoding="utf-8")
+            first = start.isoformat() if self.calendar is None else self.calendar[0]
+            self.calendar = [first, end.isoformat()]
+            self._record(table, began, size)
+            stage.update(rows=self.counts[table.name], bytes=size)
+
+    # --format sql: unisce le tabelle `names` (in ordine di import) nel dump
+    # <DB>.sql, con la DDL dello schema se non è una generazione --append
+    def write_dump(self, names):
+        names = [name for name in names if name in self.files]
+        tables, statements = [], []
+        if self.previous is None:
+            if self.schema.ddl is not None:
+                tables = [t.name for t in self.schema.ddl.order()]
+                statements = ddl.create_statements(Path(self.schema.sql).read_text(encoding="utf-8"))
+            if dates.CALENDAR in names:
+                tables.insert(0, dates.CALENDAR)
+                statements += ddl.create_statements(dates.CALENDAR_DDL)
+        rows = ", ".join(f"{name} {self.counts[name]:,}" for name in names)
+        comment = (f"{self.schema.name}: dump di datagen (seed {self.schema.seed}, scala {self.scale:g})\n"
+                   f"Righe: {rows}\n"
+                   f"{self.sql_rows} righe per INSERT, COMMIT ogni {self.sql_commit} INSERT")
+        with self.recorder.stage("dump") as stage:
+            dump = self.schema.folder if self.previous is None else f"{self.schema.folder}_delta"
+            self.dump = write_dump(self.outdir, dump, [self.outdir / self.files[name] for name in names],
+                                   comment=comment, tables=tables, ddl=statements)
+            for name in names:
+                self.files[name] = self.dump
+            stage.update(rows=sum(self.counts[name] for name in names),
+                         bytes=(self.outdir / self.dump).stat().st_size)
+
+    # Dimensione e SHA-256 di ogni file scritto, per verificare la riproducibilità
+    # (quelli delle parti sono già stati calcolati durante la scrittura)
+    def write_checksums(self):
+        names = list(dict.fromkeys(self.files.values()))
+        if (self.outdir / CALENDAR_DDL_FILE).exists():
+            names.append(CALENDAR_DDL_FILE)
+        with self.recorder.stage("checksums") as stage:
+            for parts in self.parts.values():
+                for part in parts:
+                    self.checksums[part["file"]] = {"bytes": part["bytes"], "sha256": part["sha256"]}
+            for name in names:
+                path = self.outdir / name
+                self.checksums[name] = {"bytes": path.stat().st_size, "sha256": sha256(path)}
+            stage.update(rows=len(names), bytes=sum(c["bytes"] for c in self.checksums.values()))
+
+
+def generate_tables(ctx, order, concurrency=1):
+    """
+    Genera (o ricostruisce, con --append) le tabelle di `order`: ognuna parte
+    appena i suoi padri sono finiti, fino a `concurrency` alla volta. L'output
+    non dipende da `concurrency`: ogni tabella ha i propri seed e legge solo
+    dati dei padri.
+    """
+    def step(table):
+        if ctx.replays(table):
+            ctx.replay(table)
+        else:
+            ctx.generate(table)
+
+    if concurrency <= 1:
+        for table in order:
+            step(table)
+        return
+    done, running, pending = set(), {}, list(order)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="table") as threads:
+        while pending or running:
+            for table in [t for t in pending if all(p in done for p in t.parents())]:
+                if len(running) >= concurrency:
+                    break
+                pending.remove(table)
+                running[threads.submit(step, table)] = table
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+                done.add(running.pop(future).name)
+
+
+def choose_distributions(schema, overrides=None, uniform=False):
+    """
+    Distribuzioni delle colonne: quelle dello schema (tutte uniformi con
+    `uniform`) cambiate da `overrides` {"Tabella.colonna": distribuzione}.
+    """
+    overrides = overrides or {}
+    unknown = sorted(set(overrides) - set(schema.distributions))
+    if unknown:
+        available = ", ".join(sorted(schema.distributions)) or "nessuna"
+        raise ValueError(f"{schema.name}: colonne senza distribuzione configurabile {unknown} "
+                         f"(disponibili: {available})")
+    chosen = {name: UNIFORM if uniform else d for name, d in schema.distributions.items()}
+    chosen.update(overrides)
+    return chosen
+
+
+def run(schema, outdir=None, *, workers=1, fmt="csv", row_group_size=ROW_GROUP_SIZE, scale=1.0,
+        previous=None, until=None, calendar=False, distributions=None, uniform=False, profile=False,
+        concurrency=None, compress="none", part_size=None, sql_rows=SQL_ROWS, sql_commit=SQL_COMMIT):
+    """
+    Genera tutte le tabelle di `schema` (righe moltiplicate per `scale`);
+    restituisce il Context finale.
+
+    Con `previous` (cartella di una generazione precedente) genera soltanto
+    le righe nuove delle tabelle `delta`, con date dal giorno dopo l'ultima
+    data fino a `until` (default oggi). Con `calendar` scrive anche la
+    tabella Calendar. `distributions` e `uniform` cambiano le distribuzioni
+    delle colonne (vedi choose_distributions); `profile` salva un profilo
+    cProfile per ogni fase in `_PROFILE/`. `concurrency` è il numero di
+    tabelle generate insieme (default `workers`, vedi generate_tables).
+    `compress` (gzip, zstd) e `part_size` (MB per file) scrivono ogni CSV
+    compresso e/o diviso in parti, con l'indice `<tabella>.parts.json`.
+    Con `fmt="sql"` scrive un unico dump <DB>.sql con INSERT di `sql_rows`
+    righe e un COMMIT ogni `sql_commit` INSERT (vedi datagen.dump).
+    """
+    if fmt != "csv" and (compress != "none" or part_size):
+        raise ValueError(f"compressione e parti valgono solo per il formato csv, non per {fmt}")
+    part_bytes = round(part_size * (1 << 20)) if part_size else None
+    chosen = choose_distributions(schema, distributions, uniform)
+    levels = span = None
+    if previous is not None:
+        previous = Path(previous)
+        if not any(t.delta for t in schema):
+            raise ValueError(f"{schema.name}: nessuna tabella incrementale (Table(delta=...))")
+        levels = delta.high_water(schema, previous)
+        span = delta.window(schema, levels, until)
+    outdir = outdir or output_folder(schema.folder if previous is None else f"{schema.folder}_delta")
+    order = schema.order()
+    with worker_pool(workers) as pool:
+        ctx = Context(schema, outdir, pool=pool, fmt=fmt, row_group_size=row_group_size, scale=scale,
+                      distributions=chosen, profile=profile, compress=compress, part_bytes=part_bytes,
+                      sql_rows=sql_rows, sql_commit=sql_commit)
+        ctx.concurrency = max(1, workers if concurrency is None else concurrency)
+        if previous is not None:
+            ctx.resume(previous, levels, span)
+        generate_tables(ctx, order, ctx.concurrency)
+        for table in order:
+            if table.output is not None and not ctx.replays(table):
+                ctx.write_output(table)
+        if calendar:
+            ctx.write_calendar()
+    # Calendar non ha FK: si importa per prima
+    names = [dates.CALENDAR] + [t.name for t in order]
+    if fmt == "sql":
+        ctx.write_dump(names)
+    ctx.write_checksums()
+    write_import_order(outdir, list(dict.fromkeys(ctx.files[name] for name in names if name in ctx.files)))
+    write_manifest(outdir, ctx.manifest())
+    return ctx
+
+
+def parser(description):
+    p = argparse.ArgumentParser(description=description)
+    p.add_argument("--workers", type=int, default=1, help="processi per la generazione a shard")
+    p.add_argument("--format", choices=FORMATS, default="csv", help="formato dei file di output")
+    p.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE,
+                   help="righe per row group (parquet) o record batch (arrow-ipc)")
+    p.add_argument("--scale", type=float, default=1.0, help="moltiplica il numero di righe delle tabelle")
+    p.add_argument("--append", type=Path, metavar="CARTELLA",
+                   help="genera solo le righe nuove delle tabelle di attività dopo quelle di CARTELLA")
+    p.add_argument("--until", type=date.fromisoformat, metavar="AAAA-MM-GG",
+                   help="con --append: ultima data delle righe nuove (default oggi)")
+    p.add_argument("--calendar", action="store_true",
+                   help="scrive anche la tabella dimensione Calendar (un giorno per riga) per i report")
+    p.add_argument("--dist", action="append", default=[], metavar="TABELLA.COLONNA=SPEC",
+                   help="distribuzione di una colonna, es. Rental.CustomerID=zipf:1.3 (ripetibile)")
+    p.add_argument("--uniform", action="store_true", help="tutte le colonne con distribuzione uniforme")
+    p.add_argument("--concurrency", type=int, metavar="N",
+                   help="tabelle indipendenti generate insieme (default: --workers)")
+    p.add_argument("--compress", choices=COMPRESSIONS, default="none",
+                   help="CSV compressi a blocchi in parallelo (indice delle parti in <tabella>.parts.json)")
+    p.add_argument("--part-size", type=float, metavar="MB",
+                   help="divide ogni CSV in parti di al massimo MB megabyte su disco")
+    p.add_argument("--sql-rows", type=int, default=SQL_ROWS, metavar="N",
+                   help="con --format sql: righe per INSERT multi-riga")
+    p.add_argument("--sql-commit", type=int, default=SQL_COMMIT, metavar="N",
+                   help="con --format sql: INSERT per transazione (COMMIT ogni N)")
+    p.add_argument("--profile", action="store_true",
+                   help="profilo cProfile di ogni fase in _PROFILE/ nella cartella di output")
+    return p
+
+
+# Fasi più lente della generazione (dopo --profile)
+def print_stages(ctx, count=5):
+    print(f"Fasi più lente (profili in {ctx.recorder.profile_dir}):")
+    for s in ctx.recorder.slowest(count):
+        print(f"  {s['name']:<32} {s['wall_seconds']:8.2f} s reali {s['cpu_seconds']:8.2f} s CPU")
+
+
+# Distribuzioni di --dist per `schema`, con gli errori riportati dal parser
+def dist_overrides(p, args, schema):
+    try:
+        overrides = parse_overrides(args.dist)
+        choose_distributions(schema, overrides)
+    except ValueError as e:
+        p.error(str(e))
+    return overrides
+
+
+# Controlli sulle opzioni di `parser` che argparse non fa da solo
+def check_args(p, args):
+    if args.format != "csv" and (args.compress != "none" or args.part_size):
+        p.error("--compress e --part-size valgono solo con --format csv")
+    if args.part_size is not None and args.part_size <= 0:
+        p.error("--part-size deve essere positivo")
+    if args.sql_rows < 1 or args.sql_commit < 1:
+        p.error("--sql-rows e --sql-commit devono essere almeno 1")
+
+
+def run_args(p, args, schema):
+    """
+    Genera `schema` con le opzioni `args` lette da `p` (un `parser`, anche
+    con opzioni in più): restituisce il Context della generazione.
+    """
+    check_args(p, args)
+    ctx = run(schema, workers=args.workers, fmt=args.format, row_group_size=args.row_group_size,
+              scale=args.scale, previous=args.append, until=args.until, calendar=args.calendar,
+              distributions=dist_overrides(p, args, schema), uniform=args.uniform, profile=args.profile,
+              concurrency=args.concurrency, compress=args.compress, part_size=args.part_size,
+              sql_rows=args.sql_rows, sql_commit=args.sql_commit)
+    if args.profile:
+        print_stages(ctx)
+    return ctx
+
+
+def main(schema, argv=None, description=None):
+    """Riga di comando comune ai generatori: restituisce il Context della generazione."""
+    p = parser(description or f"Generatore CSV per {schema.name}")
+    return run_args(p, p.parse_args(argv), schema)
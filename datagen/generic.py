@@ -0,0 +1,279 @@
+"""
+Generatore generico guidato dalla DDL.
+
+Legge un file .sql con datagen.ddl e genera dati coerenti con le FK per tutte
+le tabelle, senza codice Python scritto per lo schema:
+
+- PK intere: ID contigui da 1;
+- FK: ID casuali della tabella padre (in parte NULL se la colonna lo ammette);
+- testi: pool Faker scelti dal nome della colonna (email, telefono, città, ...)
+  solo tra i valori che entrano nel VARCHAR(n); le colonne UNIQUE ricevono il
+  suffisso "#<id>" (le email uniche il tag "+<n>", vedi datagen.keys);
+- numeri, date, orari e booleani: intervalli plausibili, con qualche regola sul
+  nome della colonna (percentuali, quantità, is_deleted);
+- UNIQUE su più colonne non testuali (o PK composte): combinazioni uniche
+  allocate con una permutazione dello spazio delle chiavi (datagen.keys);
+  se lo spazio non basta la generazione si ferma con KeySpaceExceeded.
+
+Uso:
+    python -m datagen.generic GP_per_creazione_database.sql --name PizzaDB
+    python -m datagen.generic GP_per_creazione_database.sql --rows 100000 --rows-for Shop=20 --workers 4
+"""
+from datetime import date, timedelta
+from pathlib import Path
+import re
+
+import numpy as np
+
+from datagen import ddl, engine, vector
+from datagen.engine import Schema, Table
+from datagen.keys import KeySpace, KeySpaceExceeded
+
+DEFAULT_ROWS = 1000
+RANDOM_SEED = 42
+NULL_RATE = 0.1            # quota di NULL nelle colonne facoltative non chiave
+DATE_START = date.today() - timedelta(days=730)
+DATE_DAYS = 730            # le date cadono negli ultimi due anni
+
+# Pool Faker (datagen.pools.KINDS) scelto dal nome della colonna; il primo che
+# corrisponde vince, in mancanza si usano frasi brevi ("sentence")
+TEXT_KINDS = [
+    (r"e-?mail", "email"),
+    (r"phone|telefono|cellulare", "phone_number"),
+    (r"first_?name|^nome$", "first_name"),
+    (r"last_?name|surname|cognome", "last_name"),
+    (r"company|azienda|ragione_?sociale", "company"),
+    (r"address|indirizzo|street", "street_address"),
+    (r"city|citta|comune", "city"),
+    (r"postal|post_?code|zip|^cap$", "postcode"),
+]
+# Colonne "codice": lettere maiuscole casuali (sigle di 2 lettere per province e stati)
+SIGLA = r"provin|state|sigla"
+CODE = r"code|codice|type|tipo"
+
+
+def _text_kind(name):
+    low = name.lower()
+    for pattern, kind in TEXT_KINDS:
+        if re.search(pattern, low):
+            return kind
+    return None
+
+
+def _int_range(name):
+    low = name.lower()
+    if re.search(r"percent|sconto|discount", low):
+        return 5, 50
+    if re.search(r"quant|qty|qta", low):
+        return 1, 10
+    return 1, 100
+
+
+# Piano di una colonna: (tipo di valore, parametri...)
+def column_spec(tdef, col, unique):
+    name, low = col.name, col.name.lower()
+    if col.name in tdef.fks:
+        parent, _ = tdef.fks[name]
+        return ("self",) if parent == tdef.name else ("fk", parent)
+    if col.type == "int":
+        if name in unique:
+            return ("id",)
+        return ("int", *_int_range(name))
+    if col.type.startswith("decimal"):
+        precision, scale = map(int, re.findall(r"\d+", col.type))
+        return ("decimal", 1, min(1000, 10 ** (precision - scale) - 1), scale)
+    if col.type == "float":
+        return ("decimal", 1, 1000, 2)
+    if col.type == "bool":
+        return ("const", False) if "deleted" in low else ("bool",)
+    if col.type in ("date", "datetime", "time"):
+        return (col.type,)
+    # testo
+    if col.length is not None and re.search(SIGLA, low):
+        spec = ("letters", min(2, col.length))
+    elif _text_kind(name) is None and col.length is not None and (col.length < 8 or re.search(CODE, low)):
+        spec = ("letters", min(col.length, 8))
+    else:
+        spec = ("text", _text_kind(name) or "sentence", col.length)
+    if name in unique:
+        return ("unique", spec, col.length)
+    return spec
+
+
+def plan_table(tdef):
+    """
+    Piano di generazione di una tabella: lista (colonna, spec, quota di NULL)
+    e colonne dell'eventuale vincolo UNIQUE composto (o PK composta) da
+    allocare con datagen.keys.
+    """
+    pk = tdef.pk[0] if len(tdef.pk) == 1 else None
+    if pk is not None and tdef.columns[pk].type != "int":
+        raise ValueError(f"{tdef.name}: chiave primaria non intera ({pk}) non supportata")
+    # UNIQUE su una colonna sola (testo o intero) si ottiene per costruzione, e
+    # così i composti che contengono un testo (il testo diventa unico); gli
+    # altri composti diventano chiavi di un KeySpace
+    composite = [u for u in tdef.unique if len(u) > 1]
+    if len(tdef.pk) > 1:
+        composite.append(tuple(tdef.pk))
+    texts = {next(c for c in u if tdef.columns[c].type == "str")
+             for u in composite if any(tdef.columns[c].type == "str" for c in u)}
+    keyed = [u for u in composite if not any(tdef.columns[c].type == "str" for c in u)]
+    if len(keyed) > 1:
+        raise ValueError(f"{tdef.name}: al massimo un vincolo UNIQUE composto senza colonne di testo")
+    key = keyed[0] if keyed else ()
+    single = {u[0] for u in tdef.unique if len(u) == 1}
+
+    plan = []
+    for col in tdef.columns.values():
+        if col.name == pk:
+            plan.append((col.name, ("pk",), 0.0))
+            continue
+        spec = column_spec(tdef, col, single | texts)
+        if col.name in key and spec[0] not in ("fk", "int", "bool", "date"):
+            raise ValueError(f"{tdef.name}.{col.name}: tipo non supportato in un vincolo UNIQUE composto")
+        in_unique = any(col.name in u for u in tdef.unique) or col.name in key
+        null_rate = NULL_RATE if col.nullable and (not in_unique or col.name in tdef.fks) else 0.0
+        plan.append((col.name, spec, 0.0 if col.name in key else null_rate))
+    return plan, key
+
+
+def _letters(gen, length, n):
+    return vector.letters(gen, length, n) if n else []
+
+
+def _values(shard, spec, ids, parents):
+    gen, n = shard.np, len(ids)
+    kind = spec[0]
+    if kind in ("pk", "id"):
+        return list(ids)
+    if kind == "fk":
+        parent_ids = parents[spec[1]]
+        return vector.pick_ids(gen, parent_ids, n) if len(parent_ids) else [None] * n
+    if kind == "self":
+        # un riferimento a una riga precedente della stessa tabella (NULL per la prima)
+        ids = np.asarray(ids)
+        picks = (gen.random(n) * (ids - 1)).astype(np.int64) + 1
+        return [int(v) if i > 1 else None for v, i in zip(picks, ids)]
+    if kind == "int":
+        return vector.integers(gen, spec[1], spec[2], n)
+    if kind == "decimal":
+        return vector.amounts(gen, spec[1], spec[2], n, spec[3])
+    if kind == "bool":
+        return (gen.random(n) < 0.5).tolist()
+    if kind == "const":
+        return [spec[1]] * n
+    if kind == "date":
+        return vector.iso_dates(DATE_START, vector.day_offsets(gen, DATE_DAYS, n))
+    if kind == "datetime":
+        return vector.iso_datetimes(DATE_START, gen.integers(0, DATE_DAYS * 86400, size=n))
+    if kind == "time":
+        # quarti d'ora tra le 8:00 e le 20:00
+        return [f"{q // 4:02d}:{q % 4 * 15:02d}:00" for q in gen.integers(32, 80, size=n).tolist()]
+    if kind == "text":
+        return shard.sample(spec[1], n, spec[2])
+    if kind == "letters":
+        return _letters(gen, spec[1], n)
+    if kind == "unique":
+        return _unique(shard, spec[1], spec[2], ids, parents)
+    raise ValueError(f"spec di colonna sconosciuta: {spec!r}")
+
+
+# Testi unici: email dal pool con il tag "+<giro>" (datagen.keys), gli altri
+# valore base (senza "#") più il suffisso "#<id>", sempre entro max_len
+def _unique(shard, spec, max_len, ids, parents):
+    if not len(ids):
+        return []
+    if spec[0] == "text" and spec[1] == "email":
+        return shard.unique_sample("email", max_len - 6 if max_len else None)
+    room = None
+    if max_len is not None:
+        room = max_len - len(f"#{max(ids)}")
+        if room < 1:
+            raise KeySpaceExceeded(f"VARCHAR({max_len}) troppo corto per {max(ids)} valori unici")
+    if spec[0] == "letters":
+        base = _letters(shard.np, min(spec[1], room or spec[1]), len(ids))
+    else:
+        base = shard.sample(spec[1], len(ids), room)
+    return [f"{b.replace('#', '')}#{i}" for b, i in zip(base, ids)]
+
+
+# Dominio dei valori di una colonna che fa parte di una chiave composta
+def _domain(spec, parents):
+    kind = spec[0]
+    if kind == "fk":
+        return parents[spec[1]]
+    if kind == "int":
+        return range(spec[1], spec[2] + 1)
+    if kind == "bool":
+        return [False, True]
+    return vector.iso_dates(DATE_START, np.arange(DATE_DAYS + 1))
+
+
+def gen_rows(shard, plan, parents, key=()):
+    """
+    Righe dello shard secondo il piano di `plan_table`; `parents` è
+    {tabella padre: range degli ID}. Le colonne di `key` (vincolo UNIQUE
+    composto) prendono combinazioni uniche da un KeySpace, senza scarti.
+    """
+    gen = shard.np
+    specs = {name: spec for name, spec, _ in plan}
+    columns = {}
+    if key:
+        space = KeySpace(*(_domain(specs[name], parents) for name in key))
+        columns.update(zip(key, shard.unique_keys(space, "unique")))
+    for name, spec, null_rate in plan:
+        if name in columns:
+            continue
+        values = _values(shard, spec, shard.ids(), parents)
+        if null_rate:
+            for i in np.flatnonzero(gen.random(len(values)) < null_rate).tolist():
+                values[i] = None
+        columns[name] = values
+    yield from zip(*(columns[name] for name, _, _ in plan))
+
+
+def build_schema(sql, *, name=None, rows=DEFAULT_ROWS, table_rows=None, scale=1.0, seed=RANDOM_SEED):
+    """Schema del motore per tutte le tabelle della DDL `sql`."""
+    graph = ddl.load(sql)
+    table_rows = {k.lower(): v for k, v in (table_rows or {}).items()}
+    tables = []
+    for tdef in graph:
+        plan, key = plan_table(tdef)
+        parents = tdef.parents()
+        n = max(1, round(table_rows.get(tdef.name.lower(), rows) * scale))
+        tables.append(Table(tdef.name, gen_rows, n,
+                            args=lambda ctx, plan=plan, parents=parents, key=key:
+                                (plan, {p: ctx.ids(p) for p in parents}, key)))
+    return Schema(name or Path(sql).stem, tables, seed=seed, sql=sql,
+                  calendar=lambda ctx: (DATE_START, DATE_START + timedelta(days=DATE_DAYS)))
+
+
+def _table_rows(items):
+    table_rows = {}
+    for item in items:
+        table, _, n = item.partition("=")
+        if not n.isdigit():
+            raise SystemExit(f"--rows-for: atteso Tabella=N, non {item!r}")
+        table_rows[table] = int(n)
+    return table_rows
+
+
+def main(argv=None):
+    parser = engine.parser("Generatore CSV da una DDL SQL, senza codice per lo schema")
+    parser.add_argument("sql", type=Path, help="file .sql con le CREATE TABLE")
+    parser.add_argument("--name", help="nome del database (prefisso della cartella, default: nome del file)")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="righe per tabella")
+    parser.add_argument("--rows-for", action="append", default=[], metavar="TABELLA=N",
+                        help="righe di una tabella specifica (ripetibile)")
+    parser.add_argument("--seed", type=int, default=RANDOM_SEED)
+    args = parser.parse_args(argv)
+
+    schema = build_schema(args.sql, name=args.name, rows=args.rows, table_rows=_table_rows(args.rows_for),
+                          seed=args.seed)
+    ctx = engine.run_args(parser, args, schema)
+    print(f"✅ File {ctx.fmt} generati in: {ctx.outdir.resolve()}")
+    return ctx
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Allocazione di chiavi uniche senza tentativi ripetuti.
+
+Invece di estrarre valori a caso e scartare i duplicati, ogni riga prende la
+chiave che sta in una posizione fissa (ID - 1) di una permutazione
+pseudo-casuale dello spazio delle chiavi. La permutazione è una rete di
+Feistel con seed (cycle walking per spazi che non sono potenze di 2): è una
+biiezione, quindi ID diversi danno chiavi diverse, ogni chiave costa O(1) e
+ogni shard calcola le sue senza conoscere gli altri.
+
+- `KeySpace`: chiavi composte, prodotto cartesiano di domini (es. corso x unità)
+- `codes`: codici alfanumerici unici (es. codice fiscale)
+- `pool_values`: valori unici da un pool Faker, con un suffisso quando il pool
+  è esaurito (email "nome+2@dominio")
+
+Se si chiedono più chiavi di quante lo spazio ne contenga viene sollevato
+KeySpaceExceeded, invece di produrre meno righe.
+"""
+import random
+import string
+
+import numpy as np
+
+ROUNDS = 4
+_M1 = np.uint64(0x9E3779B97F4A7C15)
+_M2 = np.uint64(0xBF58476D1CE4E5B9)
+
+
+class KeySpaceExceeded(ValueError):
+    """Richieste più chiavi uniche di quelle disponibili."""
+
+
+class Permutation:
+    """Biiezione pseudo-casuale di [0, n), calcolata in blocco su array NumPy."""
+
+    def __init__(self, n, seed, rounds=ROUNDS):
+        if n < 1:
+            raise KeySpaceExceeded("spazio delle chiavi vuoto")
+        bits = max(2, (n - 1).bit_length())
+        bits += bits % 2
+        if bits > 64:
+            raise ValueError(f"spazio di {n} chiavi troppo grande (massimo 2**64)")
+        self.n = n
+        self._half = np.uint64(bits // 2)
+        self._mask = np.uint64((1 << bits // 2) - 1)
+        rng = random.Random(seed)
+        self._keys = [np.uint64(rng.getrandbits(64)) for _ in range(rounds)]
+
+    def __len__(self):
+        return self.n
+
+    # Funzione di round: mix a 64 bit (splitmix) della metà destra con la chiave
+    @staticmethod
+    def _mix(x, key):
+        h = (x ^ key) * _M1
+        h ^= h >> np.uint64(29)
+        h *= _M2
+        h ^= h >> np.uint64(32)
+        return h
+
+    def _encrypt(self, x):
+        left, right = x >> self._half, x & self._mask
+        for key in self._keys:
+            left, right = right, left ^ (self._mix(right, key) & self._mask)
+        return (left << self._half) | right
+
+    def __call__(self, positions):
+        x = np.asarray(positions, dtype=np.uint64)
+        if x.size and int(x.max()) >= self.n:
+            raise KeySpaceExceeded(f"richiesta la chiave {int(x.max()) + 1} di uno spazio di {self.n}")
+        out = self._encrypt(x)
+        # cycle walking: si riapplica la permutazione finché si resta nello spazio
+        outside = out >= np.uint64(self.n)
+        while outside.any():
+            out[outside] = self._encrypt(out[outside])
+            outside = out >= np.uint64(self.n)
+        return out
+
+
+class KeySpace:
+    """Chiavi composte: prodotto cartesiano di domini (range o sequenze di valori)."""
+
+    def __init__(self, *domains):
+        self.domains = [d if isinstance(d, range) else list(d) for d in domains]
+        self.size = 1
+        for d in self.domains:
+            self.size *= len(d)
+
+    def __len__(self):
+        return self.size
+
+    def columns(self, indexes):
+        """Colonne (una lista per dominio) delle chiavi in posizione `indexes`."""
+        rest = np.asarray(indexes, dtype=np.uint64)
+        digits = []
+        for d in reversed(self.domains):
+            rest, digit = np.divmod(rest, np.uint64(len(d)))
+            digits.append(digit.astype(np.int64))
+        columns = []
+        for d, digit in zip(self.domains, reversed(digits)):
+            if isinstance(d, range):
+                columns.append((d.start + digit * d.step).tolist())
+            else:
+                columns.append(np.asarray(d, dtype=object)[digit].tolist())
+        return columns
+
+    def take(self, positions, seed):
+        """Colonne delle chiavi per le posizioni (ID - 1) di una permutazione con seed."""
+        if len(positions) and max(positions) >= self.size:
+            raise KeySpaceExceeded(f"{max(positions) + 1} chiavi uniche richieste, lo spazio ne ha {self.size}")
+        return self.columns(Permutation(self.size, seed)(positions))
+
+
+# Codici unici di `length` simboli di `alphabet`: i primi simboli codificano la
+# posizione permutata (tanti quanti ne stanno in 64 bit), gli altri sono casuali
+def codes(positions, seed, length, alphabet=string.ascii_uppercase, gen=None):
+    base = len(alphabet)
+    digits = length
+    while base ** digits > 2 ** 64:
+        digits -= 1
+    perm = Permutation(base ** digits, seed)(positions)
+    n = len(perm)
+    symbols = np.frombuffer(alphabet.encode("ascii"), dtype=np.uint8)
+    out = np.empty((n, length), dtype=np.uint8)
+    rest = perm
+    for i in range(digits - 1, -1, -1):
+        rest, digit = np.divmod(rest, np.uint64(base))
+        out[:, i] = symbols[digit.astype(np.int64)]
+    if digits < length:
+        gen = gen or np.random.default_rng(seed)
+        out[:, digits:] = symbols[gen.integers(0, base, size=(n, length - digits))]
+    return np.char.decode(out.view(f"S{length}").ravel(), "ascii").tolist()
+
+
+# Tag che rende unico un valore del pool quando il pool è già stato usato `r` volte
+def _tagged(value, r):
+    if not r:
+        return value
+    if "@" in value:
+        local, _, domain = value.partition("@")
+        return f"{local}+{r}@{domain}"
+    return f"{value} #{r}"
+
+
+def pool_values(values, positions, seed):
+    """
+    Valori unici presi da `values` (distinti, senza "+" o "#"): la posizione p
+    prende il valore permutato p % len(values); dal secondo giro in poi si
+    aggiunge il tag del giro (email "nome+1@dominio", altri testi "valore #1").
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    n = len(values)
+    picks = Permutation(n, seed)(positions % n).astype(np.int64)
+    rounds = (positions // n).tolist()
+    return [_tagged(v, r) for v, r in zip(np.asarray(values, dtype=object)[picks].tolist(), rounds)]
@@ -0,0 +1,95 @@
+"""
+Utility per le cartelle di output dei generatori.
+"""
+from datetime import datetime
+import json
+from pathlib import Path
+
+IMPORT_ORDER_FILE = "_IMPORT_ORDER.txt"
+MANIFEST_FILE = "_MANIFEST.json"
+# DDL della tabella Calendar, scritta con --calendar (datagen.dates)
+CALENDAR_DDL_FILE = "_CALENDAR.sql"
+# Indice delle parti di una tabella compressa o divisa (--compress, --part-size)
+PARTS_SUFFIX = ".parts.json"
+
+
+# Crea la cartella di output <base>/<prefisso>_<timestamp>
+def output_folder(prefix, base="csv_out"):
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = Path(base) / f"{prefix}_{ts}"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# Scrive _IMPORT_ORDER.txt con i file nell'ordine delle FK (padri prima dei figli)
+def write_import_order(outdir, files):
+    lines = ["Ordine consigliato di import:"] + [f"- {name}" for name in files]
+    (outdir / IMPORT_ORDER_FILE).write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+# Legge _IMPORT_ORDER.txt: restituisce i nomi dei file CSV in ordine
+def read_import_order(outdir):
+    path = outdir / IMPORT_ORDER_FILE
+    if not path.exists():
+        return None
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line[2:].strip() for line in lines if line.startswith("- ")]
+
+
+# Scrive _MANIFEST.json: descrizione della generazione (seed, scala, tabelle
+# con righe, ultimo ID e ultima data), letta dalla generazione incrementale
+def write_manifest(outdir, manifest):
+    text = json.dumps(manifest, indent=1, ensure_ascii=False)
+    (outdir / MANIFEST_FILE).write_text(text + "\n", encoding="utf-8")
+
+
+# Legge _MANIFEST.json (None se la cartella non lo ha)
+def read_manifest(outdir):
+    path = outdir / MANIFEST_FILE
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# Cartella da cui `folder` è stata generata con --append (None per una
+# generazione completa o senza manifest). Un percorso relativo vale dalla
+# cartella da cui è stata lanciata la generazione: se da qui non esiste si
+# cerca accanto a `folder`, e può comunque mancare
+def previous_folder(folder):
+    manifest = read_manifest(folder)
+    if not manifest or not manifest.get("previous"):
+        return None
+    previous = Path(manifest["previous"])
+    if not previous.exists():
+        previous = folder.parent / previous.name
+    return previous
+
+
+# Scrive l'indice <tabella>.parts.json delle parti di una tabella; restituisce il nome del file
+def write_parts_index(outdir, index):
+    name = f"{index['table']}{PARTS_SUFFIX}"
+    (outdir / name).write_text(json.dumps(index, indent=1, ensure_ascii=False) + "\n", encoding="utf-8")
+    return name
+
+
+def read_parts_index(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+# Tabella di un file di _IMPORT_ORDER.txt (Rental.csv, Rental.csv.zst, Rental.parts.json, ...)
+def table_of(name):
+    return Path(name).name.split(".", 1)[0]
+
+
+# File di una tabella in `folder`: indice delle parti, CSV o CSV compresso (None se non c'è)
+def find_table_file(folder, table):
+    candidates = [f"{table}{PARTS_SUFFIX}", f"{table}.csv", f"{table}.csv.gz", f"{table}.csv.zst"]
+    return next((name for name in candidates if (folder / name).exists()), None)
+
+
+# File di dati di un elemento di _IMPORT_ORDER.txt: le parti elencate
+# nell'indice, nell'ordine delle righe, o il file stesso
+def data_files(folder, name):
+    if not name.endswith(PARTS_SUFFIX):
+        return [folder / name]
+    return [folder / part["file"] for part in read_parts_index(folder / name)["parts"]]
@@ -0,0 +1,139 @@
+"""
+Pool di valori Faker pre-generati e messi in cache su disco.
+
+Chiamare Faker riga per riga è lento (e il solo import del provider it_IT
+costa tempo all'avvio). Qui ogni tipo di valore (nomi, cognomi, email,
+indirizzi, aziende, ...) viene generato una sola volta per (locale, seed),
+deduplicato e salvato in `.cache/pools/` in un file compatto:
+
+    MAGIC | n (uint64) | offset[0..n] (uint64) | byte UTF-8 concatenati
+
+Il file viene aperto con mmap; in generazione si estraggono solo indici
+casuali con il generatore NumPy dello shard. Se il file esiste già Faker non
+viene nemmeno importato.
+"""
+import mmap
+import os
+from pathlib import Path
+
+import numpy as np
+
+FAKER_LOCALE = "it_IT"
+POOL_SIZE = 20_000
+CACHE_DIR = Path(os.environ.get("DATAGEN_CACHE", Path(__file__).resolve().parent.parent / ".cache")) / "pools"
+MAGIC = b"DGPOOL1\n"
+
+# Metodo Faker che produce ciascun tipo di valore
+KINDS = {
+    "first_name": lambda fake: fake.first_name(),
+    "last_name": lambda fake: fake.last_name(),
+    "email": lambda fake: fake.email(),
+    "phone_number": lambda fake: fake.phone_number(),
+    "company": lambda fake: fake.company(),
+    "street_address": lambda fake: fake.street_address(),
+    "city": lambda fake: fake.city(),
+    "postcode": lambda fake: fake.postcode(),
+    "sentence": lambda fake: fake.sentence(nb_words=4),
+}
+
+_fakers = {}
+_pools = {}
+
+
+# Faker condiviso dal processo corrente (la creazione è lenta, il reseed no)
+def faker(locale=FAKER_LOCALE):
+    if locale not in _fakers:
+        from faker import Faker
+        fake = Faker(locale)
+        # il provider it_IT costruisce l'elenco delle città da un set: l'ordine
+        # dipende da PYTHONHASHSEED, lo fissiamo per avere output riproducibile
+        for provider in fake.get_providers():
+            if isinstance(getattr(provider, "cities", None), list):
+                provider.cities = sorted(provider.cities)
+        _fakers[locale] = fake
+    return _fakers[locale]
+
+
+class ValuePool:
+    """Valori distinti di un tipo, letti da un file mmap."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path}: non è un file di pool valido")
+        count = int.from_bytes(self._mm[len(MAGIC):len(MAGIC) + 8], "little")
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=count + 1, offset=len(MAGIC) + 8)
+        self._base = len(MAGIC) + 8 + (count + 1) * 8
+        self._values = None
+        self._bounded = {}
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        a, b = self._offsets[i], self._offsets[i + 1]
+        return self._mm[self._base + a:self._base + b].decode("utf-8")
+
+    # Valori decodificati una volta sola, al primo campionamento
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = np.array([self[i] for i in range(len(self))], dtype=object)
+        return self._values
+
+    # Valori lunghi al più `max_len` caratteri (per le colonne VARCHAR(n))
+    def bounded(self, max_len):
+        if max_len not in self._bounded:
+            lengths = np.fromiter(map(len, self.values), dtype=np.int64, count=len(self))
+            self._bounded[max_len] = self.values[lengths <= max_len]
+        return self._bounded[max_len]
+
+    # `size` valori estratti (con ripetizione) col generatore NumPy `gen`;
+    # con `max_len` solo tra quelli che entrano nella colonna
+    def sample(self, gen, size, max_len=None):
+        values = self.values if max_len is None else self.bounded(max_len)
+        if not len(values):
+            raise ValueError(f"nessun valore del pool lungo al più {max_len} caratteri")
+        return values[gen.integers(0, len(values), size=size)].tolist()
+
+
+def _write_pool(path, values):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(encoded).to_bytes(8, "little"))
+        f.write(offsets.tobytes())
+        f.write(b"".join(encoded))
+    os.replace(tmp, path)
+
+
+# Genera con Faker fino a `size` valori distinti (si ferma se il provider si esaurisce)
+def build_values(kind, seed, size=POOL_SIZE, locale=FAKER_LOCALE):
+    fake = faker(locale)
+    fake.seed_instance(f"{seed}:{kind}")
+    make = KINDS[kind]
+    values = {}
+    misses = 0
+    while len(values) < size and misses < size:
+        v = make(fake)
+        if v in values:
+            misses += 1
+        else:
+            values[v] = None
+    return list(values)
+
+
+def get(kind, seed, size=POOL_SIZE, locale=FAKER_LOCALE):
+    """Pool di `kind` per (locale, seed, size): dalla cache, o generato e salvato."""
+    key = (kind, seed, size, locale)
+    if key not in _pools:
+        path = CACHE_DIR / f"{locale}-{seed}-{kind}-{size}.pool"
+        if not path.exists():
+            _write_pool(path, build_values(kind, seed, size, locale))
+        _pools[key] = ValuePool(path)
+    return _pools[key]
@@ -0,0 +1,150 @@
+"""
+Strumentazione della generazione: fasi, tempi, memoria, checksum, profili.
+
+Il motore (datagen.engine) esegue ogni fase (generazione di una tabella,
+ricostruzione dello stato con --append, scrittura rimandata, calendario,
+checksum) dentro `Recorder.stage`, che registra tempo reale, tempo CPU del
+processo principale e dei worker, righe, byte e picco di memoria residente.
+Le fasi finiscono in `_MANIFEST.json` insieme all'ambiente (versioni di
+Python e NumPy) e allo SHA-256 di ogni file scritto, così una generazione
+lenta o non riproducibile si può analizzare anche dopo.
+
+Con `--profile` ogni fase viene eseguita sotto cProfile: il profilo del
+processo principale e quelli degli shard eseguiti nei worker vengono uniti in
+`_PROFILE/<n>-<fase>-<tabella>.prof` (da aprire con pstats o snakeviz), con
+un riepilogo testuale delle funzioni più costose nel .txt accanto.
+
+Le fasi di tabelle indipendenti possono girare in thread diversi (vedi
+datagen.engine): la fase corrente è per thread, il tempo CPU di una fase è
+quello del suo thread (più i worker) e il suo profilo copre lo stesso thread;
+la CPU dei thread di scrittura compare solo nei totali.
+"""
+from contextlib import contextmanager
+import cProfile
+import hashlib
+import io
+import platform
+import pstats
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:         # Windows: niente getrusage, il picco di memoria resta None
+    resource = None
+
+PROFILE_DIR = "_PROFILE"
+PROFILE_TOP = 30           # funzioni nel riepilogo testuale di ogni fase
+CHUNK = 1 << 20
+
+
+# Picco di memoria residente (MB) del processo e dei worker terminati
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss è in KB su Linux, in byte su macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def environment():
+    """Versioni e piattaforma della generazione, per confrontare output diversi."""
+    import numpy
+    return {"python": platform.python_version(), "numpy": numpy.__version__, "platform": platform.platform()}
+
+
+def run_profiled(fn, path):
+    """Esegue `fn()` sotto cProfile e salva il profilo in `path` (usato nei worker)."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn)
+    finally:
+        profiler.dump_stats(path)
+
+
+class Recorder:
+    """Fasi di una generazione; con `profile` salva un profilo per fase in outdir/_PROFILE."""
+
+    def __init__(self, outdir, profile=False):
+        self.stages = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started = 0
+        self.profile_dir = outdir / PROFILE_DIR if profile else None
+        if self.profile_dir is not None:
+            self.profile_dir.mkdir(exist_ok=True)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    # Fase in corso nel thread corrente (None fuori da `stage`)
+    @property
+    def current(self):
+        return getattr(self._local, "record", None)
+
+    # Prefisso dei profili che gli shard di questa fase scrivono nei worker
+    def worker_profile(self):
+        if self.profile_dir is None or self.current is None:
+            return None
+        return str(self.profile_dir / f"{self.current['name']}.shard")
+
+    @contextmanager
+    def stage(self, kind, table=None):
+        """Registra una fase; il dizionario restituito accoglie righe e byte prodotti."""
+        with self._lock:
+            self._started += 1
+            name = f"{self._started:02d}-{kind}" + (f"-{table}" if table else "")
+        record = {"name": name, "stage": kind, "table": table, "rows": None, "bytes": None,
+                  "worker_cpu_seconds": 0.0}
+        self._local.record = record
+        profiler = cProfile.Profile() if self.profile_dir is not None else None
+        wall, cpu = time.perf_counter(), time.thread_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            record["wall_seconds"] = round(time.perf_counter() - wall, 4)
+            record["cpu_seconds"] = round(time.thread_time() - cpu + record["worker_cpu_seconds"], 4)
+            record["worker_cpu_seconds"] = round(record["worker_cpu_seconds"], 4)
+            record["peak_rss_mb"] = peak_rss_mb()
+            if profiler is not None:
+                self._save_profile(name, profiler)
+            with self._lock:
+                self.stages.append(record)
+            self._local.record = None
+
+    # Unisce il profilo del processo principale con quelli degli shard nei worker
+    def _save_profile(self, name, profiler):
+        shards = sorted(self.profile_dir.glob(f"{name}.shard-*.prof"))
+        stats = pstats.Stats(profiler)
+        for path in shards:
+            stats.add(str(path))
+        stats.dump_stats(self.profile_dir / f"{name}.prof")
+        for path in shards:
+            path.unlink()
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats("cumulative").print_stats(PROFILE_TOP)
+        (self.profile_dir / f"{name}.txt").write_text(text.getvalue(), encoding="utf-8")
+
+    def totals(self):
+        # la CPU dei worker è già contata nelle fasi: si somma a quella del processo principale
+        worker = sum(s["worker_cpu_seconds"] for s in self.stages)
+        return {"wall_seconds": round(time.perf_counter() - self._wall, 4),
+                "cpu_seconds": round(time.process_time() - self._cpu + worker, 4),
+                "peak_rss_mb": peak_rss_mb()}
+
+    def slowest(self, count=5):
+        return sorted(self.stages, key=lambda s: s["wall_seconds"], reverse=True)[:count]
@@ -0,0 +1,169 @@
+"""
+Generazione a shard con seed deterministici.
+
+Ogni tabella viene divisa in shard di `SHARD_SIZE` ID consecutivi. Ogni shard
+usa un proprio `random.Random` e un proprio generatore NumPy con seed derivato
+da (RANDOM_SEED, tabella, shard); i valori testuali vengono estratti dai pool
+Faker in cache (datagen.pools). Il contenuto di uno shard non dipende da quale
+processo lo genera, e la dimensione fissa degli shard rende l'output identico
+byte per byte qualunque sia il numero di worker.
+
+La generazione incrementale (datagen.delta) aggiunge ID a una tabella già
+generata: gli shard partono da `first` > 1 e hanno seed diversi da quelli
+della prima generazione, mentre le chiavi uniche proseguono la stessa
+permutazione (nessuna collisione con le righe esistenti).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from collections import deque
+import hashlib
+import random
+import time
+
+from datagen import keys, pools
+from datagen.profiling import run_profiled
+
+SHARD_SIZE = 10_000
+
+
+# Seed a 64 bit derivato da (seed globale, tabella, shard)
+def shard_seed(seed, table, shard):
+    digest = hashlib.sha256(f"{seed}:{table}:{shard}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class Shard:
+    """
+    Intervallo di ID [lo, hi) con generatori casuali dedicati; `first` è il
+    primo ID della generazione (1, o il successivo all'ultimo ID esistente
+    nella generazione incrementale).
+    """
+
+    def __init__(self, seed, table, index, lo, hi, first=1):
+        self.table = table
+        self.index = index
+        self.lo = lo
+        self.hi = hi
+        self.first = first
+        self.root_seed = seed
+        self.seed = shard_seed(seed, table, index if first == 1 else f"{first}+{index}")
+        self.rng = random.Random(self.seed)
+        self._np = None
+
+    def __len__(self):
+        return self.hi - self.lo
+
+    def ids(self):
+        return range(self.lo, self.hi)
+
+    # numpy.random.Generator dello shard, per le colonne generate in blocco
+    @property
+    def np(self):
+        if self._np is None:
+            import numpy
+            self._np = numpy.random.default_rng(self.seed)
+        return self._np
+
+    # Posizioni (ID - 1) delle righe dello shard e seed delle chiavi uniche di
+    # `name`: il seed è di tabella, non di shard, così le chiavi sono uniche su
+    # tutta la tabella (vedi datagen.keys)
+    def _positions(self):
+        import numpy
+        return numpy.arange(self.lo - 1, self.hi - 1)
+
+    def _key_seed(self, name):
+        return shard_seed(self.root_seed, self.table, f"keys:{name}")
+
+    # Chiavi composte uniche (colonne) dello spazio `space` (keys.KeySpace)
+    def unique_keys(self, space, name="key"):
+        return space.take(self._positions(), self._key_seed(name))
+
+    # Codici unici di `length` lettere maiuscole (es. codice fiscale)
+    def unique_codes(self, length, name="code"):
+        return keys.codes(self._positions(), self._key_seed(name), length, gen=self.np)
+
+    # Valori Faker di tipo `kind` tutti diversi tra loro su tutta la tabella
+    def unique_sample(self, kind, max_len=None):
+        pool = pools.get(kind, self.root_seed)
+        values = pool.values if max_len is None else pool.bounded(max_len)
+        return keys.pool_values(values, self._positions(), self._key_seed(kind))
+
+    # `size` valori Faker di tipo `kind` (vedi datagen.pools.KINDS), uno per riga
+    # se omesso; con `max_len` solo valori che entrano in un VARCHAR(max_len)
+    def sample(self, kind, size=None, max_len=None):
+        pool = pools.get(kind, self.root_seed)
+        return pool.sample(self.np, len(self) if size is None else size, max_len)
+
+
+# Suddivide gli ID [first, first + n) in shard di dimensione fissa
+def shard_ranges(n, first=1, size=SHARD_SIZE):
+    stop = first + n
+    return [(i, lo, min(lo + size, stop)) for i, lo in enumerate(range(first, stop, size))]
+
+
+# Righe di uno shard nel worker e tempo CPU speso; con `profile` (prefisso
+# di file) lo shard gira sotto cProfile, vedi datagen.profiling
+def _run_shard(fn, seed, table, index, lo, hi, first, args, profile=None):
+    cpu = time.process_time()
+    shard = Shard(seed, table, index, lo, hi, first)
+    if profile is None:
+        rows = list(fn(shard, *args))
+    else:
+        rows = run_profiled(lambda: list(fn(shard, *args)), f"{profile}-{index}.prof")
+    return rows, time.process_time() - cpu
+
+
+class WorkerPool:
+    """Pool di processi con il numero di worker a portata di mano."""
+
+    def __init__(self, executor, workers):
+        self.executor = executor
+        self.workers = workers
+
+    def submit(self, *args):
+        return self.executor.submit(_run_shard, *args)
+
+
+# Pool di processi per i worker (None = tutto nel processo corrente)
+@contextmanager
+def worker_pool(workers):
+    if workers is None or workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield WorkerPool(executor, workers)
+
+
+def generate(fn, table, n, *, seed, pool=None, args=(), first=1, single=False, usage=None, profile=None):
+    """
+    Esegue `fn(shard, *args)` su ogni shard di [first, first + n) e restituisce
+    le righe concatenate nell'ordine degli shard.
+
+    Con `pool` gli shard girano nei processi worker (al massimo due shard in
+    coda per worker, così la memoria resta limitata); senza pool girano qui,
+    in streaming. `single=True` genera tutta la tabella in un unico shard, per
+    le tabelle che hanno stato globale (es. vincoli di unicità su coppie).
+    Il tempo CPU dei worker si somma a `usage["worker_cpu_seconds"]`; con
+    `profile` i worker salvano un profilo per shard (`<profile>-<n>.prof`).
+    """
+    ranges = shard_ranges(n, first, size=max(n, 1) if single else SHARD_SIZE)
+    if pool is None:
+        for index, lo, hi in ranges:
+            yield from fn(Shard(seed, table, index, lo, hi, first), *args)
+        return
+
+    pending = deque()
+    jobs = iter(ranges)
+    window = 2 * pool.workers
+    for index, lo, hi in jobs:
+        pending.append(pool.submit(fn, seed, table, index, lo, hi, first, args, profile))
+        if len(pending) >= window:
+            break
+    while pending:
+        rows, cpu = pending.popleft().result()
+        if usage is not None:
+            usage["worker_cpu_seconds"] += cpu
+        for index, lo, hi in jobs:
+            pending.append(pool.submit(fn, seed, table, index, lo, hi, first, args, profile))
+            break
+        yield from rows
@@ -0,0 +1,771 @@
+"""
+Validazione di una cartella generata (`csv_out/<DB>_<timestamp>`) prima
+dell'import.
+
+Gli errori tipici dell'import (FK che non si risolvono, intestazioni finite
+tra i dati, colonne in un ordine diverso dalla DDL) con phpMyAdmin emergono
+solo dopo minuti di caricamento, a metà di una tabella. Qui ogni CSV viene
+letto una volta sola, nell'ordine di `_IMPORT_ORDER.txt`, a blocchi di
+CHUNK_BYTES byte, e confrontato con la DDL:
+
+- file: file elencati e presenti, tabelle note alla DDL, testo UTF-8; per
+  le tabelle divise in parti (`<tabella>.parts.json`) righe e byte di ogni
+  parte uguali a quelli dell'indice;
+- header: intestazione uguale alle colonne della DDL e nello stesso ordine,
+  nessuna intestazione ripetuta tra i dati;
+- columns: ogni riga ha tanti campi quanti l'intestazione;
+- pk / unique: chiavi primarie e vincoli UNIQUE senza duplicati;
+- fk: ogni valore delle FK esiste nella tabella padre (già letta);
+- null: nessun campo vuoto nelle colonne NOT NULL non testuali (il CSV
+  scrive NULL come campo vuoto);
+- length: testi entro VARCHAR(n) / CHAR(n), in caratteri;
+- date: date, datetime e orari nel formato ISO accettato da MySQL;
+- type: interi (fino a 18 cifre), decimali entro la precisione, numeri e
+  booleani (TRUE/FALSE, 0/1);
+- order: ogni tabella viene dopo le tabelle padre.
+
+Il blocco non diventa una lista di righe di stringhe: resta un array NumPy di
+byte, con inizio e fine di ogni campo ricavati dalle posizioni dei
+separatori, e i controlli sono operazioni vettoriali per colonna (cifre,
+caratteri fissi delle date, conteggi di byte per la lunghezza in caratteri).
+Oggetti Python si creano solo per le chiavi testuali o composte. I blocchi
+con virgolette passano prima dal modulo csv e vengono ricodificati con
+separatori di controllo, così i controlli sono gli stessi (le righe segnalate
+diventano numeri di record se un campo contiene un a capo).
+
+In memoria restano le chiavi, non le righe: gli ID interi in bitset NumPy (un
+bit per ID possibile, IdSet), le altre chiavi in insiemi Python (ValueSet).
+
+I CSV compressi (.gz, .zst) vengono decompressi in streaming; le parti di
+una tabella si validano una dopo l'altra come un'unica tabella (chiavi
+ripetute tra parti diverse sono duplicati), con i numeri di riga di ogni
+parte.
+
+Una cartella incrementale (--append) ha nel manifest la generazione
+precedente: la catena viene validata dalla prima cartella, così le FK verso
+righe delle generazioni precedenti si risolvono e gli ID ripetuti tra
+generazioni risultano duplicati.
+
+Uso:
+    python -m datagen.validate csv_out/BibliotecaDB_20251014_114658
+    python -m datagen.validate csv_out/PrivateTeacherDB_20251015_112817 --ddl prof_privato.sql --max-errors 50
+"""
+import argparse
+from collections import Counter
+import csv
+import io
+from itertools import islice
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+
+from datagen import ddl as ddl_module
+from datagen.compression import SUFFIXES, open_compressed
+from datagen.output import (CALENDAR_DDL_FILE, PARTS_SUFFIX, find_table_file, previous_folder, read_import_order,
+                            read_manifest, read_parts_index, table_of)
+
+CHUNK_BYTES = 1 << 22
+MAX_ERRORS = 20
+# Oltre questo ID le chiavi intere vanno in un insieme invece che nel bitset (128 MB)
+MAX_BITS = 1 << 30
+# Cifre al massimo di un intero e caratteri di un decimale (DECIMAL(65,30) e segno)
+MAX_DIGITS = 18
+MAX_DECIMAL = 67
+
+RULES = ("file", "header", "columns", "pk", "unique", "fk", "null", "length", "date", "type", "order")
+
+# Separatori (campo, riga) dei blocchi: CSV semplice o ricodificato dal modulo csv
+CSV_SEPARATORS = (b",", b"\n")
+CODED_SEPARATORS = (b"\x00", b"\x01")
+# Byte in coda al blocco: i controlli a posizione fissa non escono dall'array
+PADDING = bytes(32)
+# File di dati di una cartella: CSV (anche compressi) e indici delle parti
+DATA_SUFFIXES = tuple(f".csv{suffix}" for suffix in SUFFIXES.values()) + (PARTS_SUFFIX,)
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+_FORMAT_TEXT = {
+    "date": "non è una data AAAA-MM-GG",
+    "datetime": "non è un datetime AAAA-MM-GG HH:MM:SS",
+    "time": "non è un orario HH:MM:SS",
+    "int": f"non è un intero (al massimo {MAX_DIGITS} cifre)",
+    "bool": "non è un booleano (TRUE/FALSE, 0/1)",
+    "float": "non è un numero",
+}
+
+
+class IdSet:
+    """Insieme di ID interi: bitset NumPy per 0 <= ID < MAX_BITS, insieme Python oltre."""
+
+    def __init__(self):
+        self.bits = np.zeros(1 << 13, dtype=np.uint8)
+        self.other = set()
+
+    def _contains(self, ids):
+        found = np.zeros(len(ids), dtype=bool)
+        inside = (ids >= 0) & (ids < len(self.bits) * 8)
+        i = ids[inside]
+        found[inside] = (self.bits[i >> 3] >> (i & 7).astype(np.uint8)) & 1
+        if self.other and not inside.all():
+            found[~inside] = [v in self.other for v in ids[~inside].tolist()]
+        return found
+
+    def missing(self, ids):
+        """Posizioni degli ID assenti."""
+        return np.flatnonzero(~self._contains(ids))
+
+    def add(self, ids):
+        """Aggiunge gli ID e restituisce le posizioni dei duplicati (già presenti o ripetuti)."""
+        dup = self._contains(ids)
+        # gli ID generati sono crescenti: np.unique solo se non lo sono
+        if len(ids) > 1 and not (ids[1:] > ids[:-1]).all():
+            again = np.ones(len(ids), dtype=bool)
+            again[np.unique(ids, return_index=True)[1]] = False
+            dup |= again
+        small = (ids >= 0) & (ids < MAX_BITS)
+        if small.any():
+            top = int(ids[small].max()) >> 3
+            if top >= len(self.bits):
+                size = len(self.bits)
+                while size <= top:
+                    size *= 2
+                self.bits = np.concatenate([self.bits, np.zeros(size - len(self.bits), dtype=np.uint8)])
+            i = ids[small]
+            np.bitwise_or.at(self.bits, i >> 3, np.left_shift(1, i & 7).astype(np.uint8))
+        if not small.all():
+            self.other.update(ids[~small].tolist())
+        return np.flatnonzero(dup)
+
+
+class ValueSet:
+    """Insieme di chiavi testuali (bytes) o composte (tuple)."""
+
+    def __init__(self):
+        self.values = set()
+
+    def missing(self, values):
+        if self.values.issuperset(values):
+            return []
+        return [i for i, v in enumerate(values) if v not in self.values]
+
+    def add(self, values):
+        new = set(values)
+        if len(new) == len(values) and self.values.isdisjoint(new):
+            self.values |= new
+            return []
+        # ci sono duplicati: si cercano valore per valore
+        dup = []
+        for i, v in enumerate(values):
+            if v in self.values:
+                dup.append(i)
+            else:
+                self.values.add(v)
+        return dup
+
+
+class Report:
+    """Violazioni per file e regola: conteggio e le prime `limit` descrizioni."""
+
+    def __init__(self, limit=MAX_ERRORS):
+        self.limit = limit
+        self.counts = Counter()
+        self.samples = {}
+
+    def add(self, label, rule, lines, describe):
+        """`lines` sono le righe del file con la violazione (0: il file), `describe(i)` descrive la i-esima."""
+        if len(lines) == 0:
+            return
+        key = (label, rule)
+        self.counts[key] += len(lines)
+        samples = self.samples.setdefault(key, [])
+        for i, line in islice(enumerate(lines), max(0, self.limit - len(samples))):
+            samples.append(f"riga {line}: {describe(i)}" if line else describe(i))
+
+    def total(self, label=None):
+        return sum(n for (name, _), n in self.counts.items() if label is None or name == label)
+
+    def print_file(self, label, out):
+        for rule in RULES:
+            n = self.counts[(label, rule)]
+            if n == 0:
+                continue
+            samples = self.samples[(label, rule)]
+            for text in samples:
+                print(f"    [{rule}] {text}", file=out)
+            if n > len(samples):
+                print(f"    [{rule}] ... e altre {n - len(samples):,}", file=out)
+
+
+def _text(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    if isinstance(value, tuple):
+        return "(" + ", ".join(map(_text, value)) + ")"
+    return str(value)
+
+
+class Block:
+    """
+    Righe di un CSV come byte: `starts`/`ends` (righe × colonne) delimitano i
+    campi in `buf`, `lines` è la riga del file di ogni riga valida e `rows`
+    conta anche quelle scartate.
+    """
+
+    def __init__(self, buf, starts, ends, lines, rows):
+        self.buf = buf
+        self.starts = starts
+        self.ends = ends
+        self.lines = lines
+        self.rows = rows
+        self._prefix = {}
+        self._ints = {}
+
+    def __len__(self):
+        return len(self.lines)
+
+    def field(self, row, c):
+        return bytes(self.buf[self.starts[row, c]:self.ends[row, c]]).decode("utf-8", "replace")
+
+    # Byte della classe `kind` in [s, e): somme prefisse calcolate una volta per blocco
+    def count(self, kind, s, e):
+        prefix = self._prefix.get(kind)
+        if prefix is None:
+            b = self.buf
+            if kind == "nondigit":
+                mask = (b < 48) | (b > 57)
+            elif kind == "nonfloat":
+                mask = ((b < 48) | (b > 57)) & (b != 46) & (b != 101) & (b != 69) & (b != 43) & (b != 45)
+            else:   # "cont": byte di continuazione UTF-8, non iniziano un carattere
+                mask = (b & 0xC0) == 0x80
+            prefix = self._prefix[kind] = np.concatenate([[0], np.cumsum(mask, dtype=np.int32)])
+        return prefix[e] - prefix[s]
+
+    def ints(self, c):
+        """Valori interi della colonna `c` e maschera dei campi che sono interi validi."""
+        if c in self._ints:
+            return self._ints[c]
+        buf, s, e = self.buf, self.starts[:, c], self.ends[:, c]
+        first = buf[s]
+        neg = (first == 45) & (e > s)
+        s = s + (neg | (first == 43) & (e > s))
+        n = e - s
+        ok = (n >= 1) & (n <= MAX_DIGITS)
+        values = np.zeros(len(s), dtype=np.int64)
+        # cifra per cifra da destra: un passo per posizione, non per campo
+        for k in range(int(n[ok].max()) if ok.any() else 0):
+            inside = k < n
+            digit = buf[np.where(inside, e - 1 - k, 0)] - np.uint8(48)
+            ok &= ~inside | (digit <= 9)
+            values += np.where(inside, digit, 0).astype(np.int64) * 10 ** k
+        self._ints[c] = np.where(neg, -values, values), ok
+        return self._ints[c]
+
+    def strings(self, c):
+        """Valori della colonna `c` come bytes."""
+        s, e = self.starts[:, c], self.ends[:, c]
+        n = e - s
+        width = int(n.max()) if len(n) else 0
+        if width == 0:
+            return [b""] * len(n)
+        k = np.arange(width)
+        idx = np.minimum(s[:, None] + k, len(self.buf) - 1)
+        chars = np.where(k < n[:, None], self.buf[idx], 0).astype(np.uint8)
+        # i campi non contengono byte nulli: il tipo S<width> toglie quelli di riempimento
+        return np.ascontiguousarray(chars).view(f"S{width}").ravel().tolist()
+
+
+# Campi con il formato `template` ("9" = cifra, altro = carattere fisso) da `s`
+def _matches(buf, s, template):
+    ok = np.ones(len(s), dtype=bool)
+    for i, ch in enumerate(template):
+        b = buf[s + i]
+        ok &= ((b >= 48) & (b <= 57)) if ch == "9" else (b == ord(ch))
+    return ok
+
+
+def _number(buf, s, start, width):
+    value = np.zeros(len(s), dtype=np.int64)
+    for i in range(start, start + width):
+        value = value * 10 + buf[s + i] - 48
+    return value
+
+
+def _valid_date(buf, s):
+    y, m, d = _number(buf, s, 0, 4), _number(buf, s, 5, 2), _number(buf, s, 8, 2)
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    days = _MONTH_DAYS[np.clip(m, 0, 12)] + ((m == 2) & leap)
+    return _matches(buf, s, "9999-99-99") & (y >= 1000) & (m >= 1) & (m <= 12) & (d >= 1) & (d <= days)
+
+
+# HH:MM, HH:MM:SS o HH:MM:SS.ffffff
+def _valid_time(block, s, e):
+    buf, n = block.buf, e - s
+    ok = ((n == 5) | (n == 8) | (n >= 10) & (n <= 15)) & _matches(buf, s, "99:99") & (_number(buf, s, 3, 2) < 60)
+    ok &= (n < 8) | _matches(buf, s + 5, ":99") & (_number(buf, s, 6, 2) < 60)
+    fraction = n >= 10
+    if fraction.any():
+        ok &= ~fraction | (buf[s + 8] == 46) & (block.count("nondigit", np.minimum(s + 9, e), e) == 0)
+    return ok
+
+
+# Cifre con al più un punto, e non più di `integer` cifre prima del punto
+def _valid_decimal(buf, s, e, integer):
+    n = e - s
+    ok = (n >= 1) & (n <= MAX_DECIMAL)
+    dots = np.zeros(len(s), dtype=np.int64)
+    before = n.copy()
+    for k in range(int(n[ok].max()) if ok.any() else 0):
+        inside = k < n
+        char = buf[np.where(inside, s + k, 0)]
+        dot = inside & (char == 46)
+        ok &= ~inside | dot | (char - np.uint8(48) <= 9)
+        before = np.where(dot & (dots == 0), k, before)
+        dots += dot
+    # "0.5": lo zero prima del punto non conta nella precisione
+    before = np.where((before == 1) & (buf[s] == 48), 0, before)
+    return ok & (dots <= 1) & (n > dots) & (before <= integer)
+
+
+def _valid(block, column, c):
+    """Maschera dei campi validi per il tipo della colonna (i vuoti sono NULL); None se è un testo."""
+    kind = column.type
+    buf, s, e = block.buf, block.starts[:, c], block.ends[:, c]
+    n = e - s
+    if kind == "int":
+        ok = block.ints(c)[1]
+    elif kind == "bool":
+        first = buf[s]
+        ok = ((n == 1) & ((first == 48) | (first == 49)) | (n == 4) & _matches(buf, s, "TRUE")
+              | (n == 5) & _matches(buf, s, "FALSE"))
+    elif kind == "float":
+        ok = (n >= 1) & (block.count("nonfloat", s, e) == 0) & (block.count("nondigit", s, e) < n)
+    elif kind.startswith("decimal("):
+        precision, scale = map(int, kind[8:-1].split(","))
+        ok = _valid_decimal(buf, s + (((buf[s] == 45) | (buf[s] == 43)) & (n > 0)), e, precision - scale)
+    elif kind == "date":
+        ok = (n == 10) & _valid_date(buf, s)
+    elif kind == "datetime":
+        sep = buf[s + 10]
+        ok = (n >= 16) & _valid_date(buf, s) & ((sep == 32) | (sep == 84)) & _valid_time(block, s + 11, e)
+    elif kind == "time":
+        ok = _valid_time(block, s, e)
+    else:
+        return None
+    return ok | (n == 0)
+
+
+def _chunks(f):
+    """Blocchi di circa CHUNK_BYTES byte che finiscono a fine riga, mai dentro un campo tra virgolette."""
+    rest = b""
+    while True:
+        data = f.read(CHUNK_BYTES)
+        rest += data
+        if not data:
+            if rest:
+                yield rest if rest.endswith(b"\n") else rest + b"\n"
+            return
+        cut = rest.rfind(b"\n") + 1
+        # con un numero dispari di virgolette l'a capo è dentro un campo: serve altro testo
+        if cut == 0 or rest.count(b'"', 0, cut) % 2:
+            continue
+        yield rest[:cut]
+        rest = rest[cut:]
+
+
+def _prepend(first, chunks):
+    # File senza intestazione: la prima riga torna tra i dati
+    yield (first if first.endswith(b"\n") else first + b"\n") + next(chunks, b"")
+    yield from chunks
+
+
+def _find_all(data, pattern):
+    # Posizioni di `pattern` in `data`, anche con il separatore in comune
+    found, i = [], data.find(pattern)
+    while i >= 0:
+        found.append(i)
+        i = data.find(pattern, i + len(pattern) - 1)
+    return np.array(found, dtype=np.int64)
+
+
+def _keyset(tdef, columns):
+    if len(columns) == 1 and tdef.columns[columns[0]].type == "int":
+        return IdSet()
+    return ValueSet()
+
+
+# Valori di una chiave nel blocco senza i NULL (campi vuoti delle colonne non
+# testuali) e i campi non validi (già segnalati), e le righe da cui vengono
+def _key_values(block, columns, idx, keyset):
+    keep = np.ones(len(block), dtype=bool)
+    parts = []
+    for column, c in zip(columns, idx):
+        if column.type != "str":
+            keep &= block.ends[:, c] > block.starts[:, c]
+        if isinstance(keyset, IdSet) or len(columns) > 1 and column.type == "int":
+            values, ok = block.ints(c)
+            keep &= ok
+            parts.append(values)
+        else:
+            parts.append(block.strings(c))
+    rows = np.flatnonzero(keep)
+    if isinstance(keyset, IdSet):
+        return parts[0][rows], rows
+    if len(parts) == 1:
+        values = parts[0]
+    else:
+        values = list(zip(*(p.tolist() if isinstance(p, np.ndarray) else p for p in parts)))
+    if len(rows) < len(block):
+        values = [values[r] for r in rows]
+    return values, rows
+
+
+class Validator:
+    """
+    Valida i CSV di una o più cartelle in ordine di import. Le chiavi lette
+    (PK, UNIQUE, colonne referenziate) restano tra una tabella e l'altra e
+    tra una cartella e la successiva della stessa catena.
+    """
+
+    def __init__(self, schema, limit=MAX_ERRORS, out=sys.stdout):
+        self.schema = schema
+        self.report = Report(limit)
+        self.out = out
+        self.keys = {}
+        self.done = set()
+        self.files = 0
+        self.rows = 0
+        # colonne referenziate da FK: le loro chiavi servono alle tabelle figlie
+        self.referenced = {(schema[parent].name, ref) for t in schema for parent, ref in t.fks.values()
+                           if parent in schema}
+
+    def _key(self, tdef, columns):
+        key = (tdef.name, tuple(columns))
+        if key not in self.keys:
+            self.keys[key] = _keyset(tdef, columns)
+        return self.keys[key]
+
+    def folder(self, folder):
+        """Valida una cartella: i CSV nell'ordine di _IMPORT_ORDER.txt (o della DDL)."""
+        print(folder.name, file=self.out)
+        names = read_import_order(folder)
+        present = sorted(p.name for p in folder.iterdir() if p.name.endswith(DATA_SUFFIXES))
+        if names is None:
+            names = [n for n in (find_table_file(folder, t.name) for t in self.schema.order()) if n is not None]
+            names += [n for n in present if n not in names]
+        # le parti elencate da un indice non vanno elencate in _IMPORT_ORDER.txt
+        listed = set(names)
+        for i, name in enumerate(names):
+            label, path, table = f"{folder.name}/{name}", folder / name, table_of(name)
+            rows = None
+            if not name.endswith(DATA_SUFFIXES):
+                self.report.add(label, "file", [0], lambda i: "si validano solo i CSV (generare con --format csv)")
+            elif not path.exists():
+                self.report.add(label, "file", [0], lambda i: "elencato in _IMPORT_ORDER.txt ma assente")
+            elif table not in self.schema:
+                self.report.add(label, "file", [0], lambda i: f"la tabella {table} non è nella DDL")
+            elif name.endswith(PARTS_SUFFIX):
+                parts = read_parts_index(path)["parts"]
+                listed.update(part["file"] for part in parts)
+                for label, rows in self._parts(folder, parts, self.schema[table], later=names[i + 1:]):
+                    self._print(label, rows)
+                continue
+            else:
+                rows = self.table(path, self.schema[table], label, later=names[i + 1:])
+            self._print(label, rows)
+        for name in present:
+            if name not in listed:
+                label = f"{folder.name}/{name}"
+                self.report.add(label, "file", [0], lambda i: "CSV non elencato in _IMPORT_ORDER.txt")
+                self._print(label)
+
+    # Parti di una tabella (indice <tabella>.parts.json): ognuna con righe e byte
+    # dichiarati nell'indice; le FK verso la tabella stessa si ricontrollano
+    # dopo l'ultima parte. Restituisce [(etichetta, righe)]
+    def _parts(self, folder, parts, tdef, later=()):
+        pending, results = [], []
+        for part in parts:
+            label, path = f"{folder.name}/{part['file']}", folder / part["file"]
+            rows = None
+            if not path.exists():
+                self.report.add(label, "file", [0], lambda i: "elencata nell'indice delle parti ma assente")
+            else:
+                rows = self.table(path, tdef, label, later, pending)
+                if rows != part["rows"]:
+                    self.report.add(label, "file", [0], lambda i: f"{rows:,} righe, l'indice ne dichiara "
+                                                                  f"{part['rows']:,}")
+                if path.stat().st_size != part["bytes"]:
+                    self.report.add(label, "file", [0], lambda i: f"{path.stat().st_size:,} byte, l'indice ne "
+                                                                  f"dichiara {part['bytes']:,}")
+            results.append((label, rows))
+        for check in pending:
+            check()
+        self.done.add(tdef.name)
+        return results
+
+    def _print(self, label, rows=None):
+        n = self.report.total(label)
+        status = "ok" if n == 0 else f"{n:,} violazioni"
+        rows = "" if rows is None else f"{rows:,} righe"
+        print(f"  {Path(label).name:<28}{rows:>18}  {status}", file=self.out)
+        self.report.print_file(label, self.out)
+
+    # Posizione di ogni colonna della DDL nel CSV, dall'intestazione
+    def _header(self, label, tdef, header):
+        expected = list(tdef.columns)
+        if header == expected:
+            return dict(zip(expected, range(len(expected)))), False
+        names = {c.lower(): c for c in expected}
+        found = [names.get(h.strip().lower()) for h in header]
+        if not any(found):
+            # nessun nome noto: la prima riga è già di dati
+            self.report.add(label, "header", [1], lambda i: "manca l'intestazione, la prima riga è di dati")
+            return dict(zip(expected, range(len(expected)))), True
+        positions = {c: i for i, c in enumerate(found) if c is not None}
+        missing = [c for c in expected if c not in positions]
+        extra = [h for h, c in zip(header, found) if c is None]
+        if missing:
+            self.report.add(label, "header", [1], lambda i: f"colonne mancanti: {', '.join(missing)}")
+        if extra:
+            self.report.add(label, "header", [1], lambda i: f"colonne non nella DDL: {', '.join(extra)}")
+        if [c for c in found if c is not None] != [c for c in expected if c in positions]:
+            # l'import di phpMyAdmin assegna i campi per posizione
+            self.report.add(label, "header", [1], lambda i: f"colonne in ordine diverso dalla DDL: "
+                                                          f"{', '.join(header)} invece di {', '.join(expected)}")
+        return positions, False
+
+    def table(self, path, tdef, label, later=(), pending=None):
+        """
+        Valida un CSV (anche compresso) della tabella `tdef`; restituisce le
+        righe lette. Con `pending` (una parte della tabella) i controlli da
+        ripetere a fine tabella vi vengono aggiunti invece che eseguiti.
+        """
+        last = pending is None
+        pending = [] if last else pending
+        with open_compressed(path) as f:
+            first = f.readline()
+            text = first.removeprefix(b"\xef\xbb\xbf").decode("utf-8", "replace")
+            header = next(csv.reader([text]), None)
+            if header is None:
+                self.report.add(label, "header", [1], lambda i: "file vuoto, senza intestazione")
+                if last:
+                    self.done.add(tdef.name)
+                return 0
+            positions, headless = self._header(label, tdef, header)
+            checks = self._checks(label, tdef, positions, later)
+            line = start = 1 if headless else 2
+            chunks = _prepend(first, _chunks(f)) if headless else _chunks(f)
+            for chunk in chunks:
+                block = self._block(label, chunk, header, line, headless)
+                line += block.rows
+                if len(block):
+                    for check in checks:
+                        check(block, pending)
+        if last:
+            for check in pending:
+                check()
+            self.done.add(tdef.name)
+        self.files += 1
+        self.rows += line - start
+        return line - start
+
+    # Blocco di righe da un pezzo di file, senza le righe con un numero di
+    # campi sbagliato e le intestazioni ripetute (segnalate)
+    def _block(self, label, chunk, header, line, headless):
+        width = len(header)
+        try:
+            text = chunk.decode("utf-8")
+        except UnicodeDecodeError as e:
+            bad = line + chunk.count(b"\n", 0, e.start)
+            self.report.add(label, "file", [bad], lambda i: "testo non UTF-8")
+            text = chunk.decode("utf-8", "replace")
+        fsep, rsep = CSV_SEPARATORS
+        if b'"' in chunk:
+            # campi tra virgolette: li divide il modulo csv, poi separatori che non compaiono nei dati
+            fsep, rsep = CODED_SEPARATORS
+            rows = csv.reader(io.StringIO(text))
+            chunk = (rsep.decode().join(map(fsep.decode().join, rows)).encode("utf-8") + rsep)
+        header_row = fsep.join(h.encode("utf-8") for h in header)
+        buf = np.frombuffer(chunk + PADDING, dtype=np.uint8)
+        data = buf[:len(chunk)]
+        seps = np.flatnonzero((data == fsep[0]) | (data == rsep[0]))
+        last = np.flatnonzero(buf[seps] == rsep[0])
+        first = np.concatenate([[0], last[:-1] + 1])
+        fields = last - first + 1
+        good = fields == width
+        if not good.all():
+            wrong = np.flatnonzero(~good)
+            self.report.add(label, "columns", line + wrong, lambda i: f"{fields[wrong[i]]} campi invece di {width}")
+        if not headless and header_row in chunk:
+            row_starts = np.concatenate([[0], seps[last[:-1]] + 1])
+            found = [_find_all(rsep + chunk, rsep + header_row + end) for end in (rsep, b"\r" + rsep)]
+            repeated = np.searchsorted(row_starts, np.sort(np.concatenate(found)))
+            good[repeated] = False
+            self.report.add(label, "header", line + repeated, lambda i: "intestazione ripetuta tra i dati")
+        starts = np.concatenate([[0], seps[:-1] + 1])
+        idx = first[good][:, None] + np.arange(width)
+        starts, ends = starts[idx], seps[idx]
+        # righe chiuse da \r\n: il \r non fa parte dell'ultimo campo
+        if b"\r" in chunk:
+            ends[:, -1] -= (buf[ends[:, -1] - 1] == 13) & (ends[:, -1] > starts[:, -1])
+        return Block(buf, starts, ends, line + np.flatnonzero(good), len(last))
+
+    def _checks(self, label, tdef, positions, later=()):
+        checks = []
+        for name, column in tdef.columns.items():
+            if name not in positions:
+                continue
+            c = positions[name]
+            if column.type != "str" and not column.nullable:
+                checks.append(self._not_null(label, name, c))
+            if column.type != "str":
+                checks.append(self._format(label, column, c))
+            if column.length is not None:
+                checks.append(self._length(label, column, c))
+        # prima le chiavi della tabella, poi le FK (anche verso la tabella stessa)
+        keys = [(tuple(tdef.pk), "pk")] if tdef.pk else []
+        keys += [(cols, "unique") for cols in tdef.unique if cols != tuple(tdef.pk)]
+        keys += [((ref,), None) for table, ref in sorted(self.referenced)
+                 if table == tdef.name and (ref,) not in [k for k, _ in keys]]
+        for cols, rule in keys:
+            if all(col in positions for col in cols):
+                checks.append(self._unique(label, tdef, cols, [positions[col] for col in cols], rule))
+        for col, (parent, ref) in tdef.fks.items():
+            if col not in positions:
+                continue
+            if parent not in self.schema:
+                self.report.add(label, "fk", [0], lambda i: f"{col}: la tabella {parent} non è nella DDL")
+                continue
+            parent = self.schema[parent].name
+            if parent != tdef.name and parent not in self.done:
+                if parent in map(table_of, later):
+                    self.report.add(label, "order", [0], lambda i: f"va importato dopo {parent}")
+                else:
+                    self.report.add(label, "fk", [0], lambda i: f"{col}: manca {parent}, FK non verificabile")
+                continue
+            checks.append(self._fk(label, tdef.columns[col], positions[col], parent, ref, tdef.name))
+        return checks
+
+    def _not_null(self, label, name, c):
+        def check(block, pending):
+            empty = np.flatnonzero(block.ends[:, c] == block.starts[:, c])
+            self.report.add(label, "null", block.lines[empty], lambda i: f"{name} vuoto (NOT NULL)")
+        return check
+
+    def _format(self, label, column, c):
+        rule = "date" if column.type in ("date", "datetime", "time") else "type"
+        text = _FORMAT_TEXT.get(column.type) or f"non è un {column.sql_type.upper()}"
+
+        def check(block, pending):
+            bad = np.flatnonzero(~_valid(block, column, c))
+            self.report.add(label, rule, block.lines[bad],
+                            lambda i: f"{column.name} {block.field(bad[i], c)!r} {text}")
+        return check
+
+    def _length(self, label, column, c):
+        def check(block, pending):
+            s, e = block.starts[:, c], block.ends[:, c]
+            n = e - s
+            # in UTF-8 un carattere occupa almeno un byte: si contano i caratteri solo se serve
+            if n.max() <= column.length:
+                return
+            chars = n - block.count("cont", s, e)
+            bad = np.flatnonzero(chars > column.length)
+            self.report.add(label, "length", block.lines[bad],
+                            lambda i: f"{column.name} di {chars[bad[i]]} caratteri, oltre {column.sql_type.upper()}")
+        return check
+
+    def _unique(self, label, tdef, cols, idx, rule):
+        keyset = self._key(tdef, cols)
+        columns = [tdef.columns[col] for col in cols]
+        shown = "/".join(cols)
+
+        def check(block, pending):
+            values, rows = _key_values(block, columns, idx, keyset)
+            dup = keyset.add(values)
+            if len(dup) and rule is not None:
+                self.report.add(label, rule, block.lines[rows[dup]],
+                                lambda i: f"{shown} = {_text(values[dup[i]])} duplicato")
+        return check
+
+    def _fk(self, label, column, c, parent, ref, table):
+        # il tipo della chiave padre decide se il valore si legge come intero o come testo
+        keyset = self._key(self.schema[parent], (ref,))
+
+        def report(values, lines):
+            self.report.add(label, "fk", lines,
+                            lambda i: f"{column.name} = {_text(values[i])} non esiste in {parent}.{ref}")
+
+        def check(block, pending):
+            values, rows = _key_values(block, [column], [c], keyset)
+            miss = keyset.missing(values)
+            if len(miss) == 0:
+                return
+            missing, lines = [values[j] for j in miss], block.lines[rows[miss]]
+            if parent != table:
+                report(missing, lines)
+                return
+
+            # FK verso la tabella stessa: la riga padre può venire dopo, si ricontrolla alla fine
+            def recheck():
+                left = keyset.missing(np.asarray(missing) if isinstance(keyset, IdSet) else missing)
+                report([missing[j] for j in left], lines[left])
+            pending.append(recheck)
+        return check
+
+
+# Cartelle da validare: la catena delle generazioni precedenti (manifest), poi `folder`
+def chain(folder, out=sys.stderr):
+    folders = [folder]
+    while (previous := previous_folder(folders[0])) is not None:
+        if not previous.exists():
+            print(f"{folders[0].name}: generazione precedente {previous.name} non trovata, "
+                  f"le FK verso le sue righe risulteranno mancanti", file=out)
+            break
+        folders.insert(0, previous)
+    return folders
+
+
+def schema_for(folder, sql=None):
+    """DDL della cartella: `sql` o quella registrata nel manifest, più Calendar se presente."""
+    if sql is None:
+        sql = (read_manifest(folder) or {}).get("ddl")
+        if sql is None or not Path(sql).exists():
+            raise SystemExit(f"{folder}: DDL non indicata nel manifest, usare --ddl file.sql")
+    schema = ddl_module.load(sql)
+    calendar = folder / CALENDAR_DDL_FILE
+    if calendar.exists() and "Calendar" not in schema:
+        schema = ddl_module.DDLSchema([*schema, *ddl_module.parse(calendar.read_text(encoding="utf-8"))])
+    return schema
+
+
+def validate(folder, sql=None, *, limit=MAX_ERRORS, out=sys.stdout):
+    """Valida `folder` (e le generazioni precedenti); restituisce il Validator con il report."""
+    folder = Path(folder)
+    validator = Validator(schema_for(folder, sql), limit=limit, out=out)
+    start = time.perf_counter()
+    for f in chain(folder):
+        validator.folder(f)
+    elapsed = time.perf_counter() - start
+    by_rule = Counter()
+    for (_, rule), n in validator.report.counts.items():
+        by_rule[rule] += n
+    total = validator.report.total()
+    summary = ", ".join(f"{rule} {by_rule[rule]:,}" for rule in RULES if by_rule[rule])
+    print(f"Totale: {validator.files} file, {validator.rows:,} righe in {elapsed:.2f} s "
+          f"({validator.rows / max(elapsed, 1e-9):,.0f} righe/s): "
+          + (f"{total:,} violazioni ({summary})" if total else "nessuna violazione"), file=out)
+    return validator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valida una cartella di CSV generati prima dell'import")
+    parser.add_argument("folder", type=Path, help="cartella csv_out/<DB>_<ts>")
+    parser.add_argument("--ddl", type=Path, help="file .sql dello schema (default: quello del manifest)")
+    parser.add_argument("--max-errors", type=int, default=MAX_ERRORS, help="violazioni mostrate per file e regola")
+    args = parser.parse_args(argv)
+    validator = validate(args.folder, args.ddl, limit=args.max_errors)
+    sys.exit(1 if validator.report.total() else 0)
+
+
+if __name__ == "__main__":
+    main()
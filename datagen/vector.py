@@ -0,0 +1,66 @@
+"""
+Generazione vettoriale con NumPy delle colonne numeriche e categoriche.
+
+Invece di una chiamata a `random.choice`/`random.uniform` per riga, ogni
+funzione estrae l'intera colonna di uno shard in un colpo solo con il
+`numpy.random.Generator` dello shard (`shard.np`), e restituisce liste Python
+pronte da zippare nelle righe. Le date sono offset interi sommati a un'epoca
+e formattate in ISO dal calendario precalcolato (datagen.dates), senza
+costruire oggetti `date` riga per riga.
+"""
+from datetime import date
+
+import numpy as np
+
+from datagen import dates
+
+_UNIX_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+# Valori categorici, con pesi opzionali (p deve sommare a 1)
+def choice(gen, values, size, p=None):
+    idx = gen.choice(len(values), size=size, p=p)
+    return np.asarray(values, dtype=object)[idx].tolist()
+
+
+# ID presi uniformemente da un range (o da una sequenza) di chiavi valide
+def pick_ids(gen, ids, size):
+    if isinstance(ids, range) and ids.step == 1:
+        return gen.integers(ids.start, ids.stop, size=size).tolist()
+    return choice(gen, ids, size)
+
+
+# Interi uniformi in [low, high], estremi inclusi come random.randint
+def integers(gen, low, high, size):
+    return gen.integers(low, high + 1, size=size).tolist()
+
+
+# Stringhe di `length` lettere maiuscole casuali (come Faker bothify("???..."))
+def letters(gen, length, size):
+    codes = gen.integers(ord("A"), ord("Z") + 1, size=(size, length), dtype=np.uint8)
+    return np.char.decode(codes.view(f"S{length}").ravel(), "ascii").tolist()
+
+
+# Importi uniformi in [low, high] arrotondati a `decimals` cifre
+def amounts(gen, low, high, size, decimals=2):
+    return np.round(gen.uniform(low, high, size=size), decimals).tolist()
+
+
+# Offset in giorni uniformi in [0, days]
+def day_offsets(gen, days, size):
+    return gen.integers(0, days + 1, size=size)
+
+
+# Date ISO (YYYY-MM-DD) da un'epoca più offset in giorni
+def iso_dates(epoch, offsets):
+    return dates.iso(dates.day(epoch) + np.asarray(offsets, dtype="int64"))
+
+
+# Date ISO da ordinali proleptici (date.toordinal())
+def iso_ordinals(ordinals):
+    return dates.iso(np.asarray(ordinals, dtype="int64") - _UNIX_ORDINAL)
+
+
+# Datetime ISO con spazio (YYYY-MM-DD HH:MM:SS) da un'epoca più offset in secondi
+def iso_datetimes(epoch, seconds):
+    return dates.iso_datetimes(dates.day(epoch) * 86400 + np.asarray(seconds, dtype="int64"))
@@ -0,0 +1,394 @@
+"""
+Writer (CSV, Parquet, Arrow IPC, SQL) per l'output dei generatori.
+
+Le righe sono tuple con i valori nell'ordine delle colonne. Il CSV viene
+scritto con csv.writer, un blocco di righe alla volta; solo le colonne
+bool/date/datetime/time passano per la normalizzazione (TRUE/FALSE, ISO
+8601).
+
+Le righe vengono codificate a blocchi di `BLOCK_ROWS` in testo UTF-8 dal
+thread che le genera, e i blocchi passano per una coda limitata a un thread
+di scrittura (`BackgroundFile`) con un buffer grande: la scrittura su disco
+si sovrappone alla generazione, e se il disco è più lento la coda piena
+ferma il generatore invece di accumulare memoria.
+
+Con `write_csv_parts` gli stessi blocchi vengono compressi (gzip o zstd, vedi
+datagen.compression) da un pool di thread, un blocco indipendente per volta,
+e scritti nell'ordine originale in file di al massimo `part_bytes` byte
+(`Rental.part-0001.csv.zst`, ...), ognuno con l'intestazione: le parti si
+possono caricare in parallelo. L'indice restituito elenca per ogni parte le
+righe contenute, i byte e lo SHA-256, calcolato dal thread di scrittura.
+
+`write_sql` scrive invece INSERT multi-riga (la sezione dati di un dump,
+vedi datagen.dump): i valori di un blocco diventano letterali SQL una colonna
+alla volta (map/join, apici raddoppiati solo nelle colonne che ne hanno) e
+le righe si uniscono con join, senza concatenare stringhe riga per riga.
+
+Per i formati colonnari le righe prodotte dai gen_* vengono raccolte in
+blocchi di `row_group_size` righe e trasposte in colonne; ogni blocco diventa
+un row group Parquet (o un record batch Arrow) con colonne tipizzate. I tipi
+sono quelli dichiarati nelle tabelle dei generatori:
+
+    int, float, str, bool, date, datetime, time, decimal(p,s)
+
+Richiede pyarrow (`pip install pyarrow`), importato solo se serve.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import islice
+import csv
+import hashlib
+import io
+import queue
+import re
+import threading
+
+from datagen.compression import SUFFIXES, THREADS, compressor
+
+FORMATS = ("csv", "parquet", "arrow-ipc", "sql")
+EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow-ipc": ".arrow", "sql": ".sql"}
+ROW_GROUP_SIZE = 100_000
+BLOCK_ROWS = 4096           # righe CSV codificate per blocco
+QUEUE_BLOCKS = 8            # blocchi in coda verso il thread di scrittura
+WRITE_BUFFER = 1 << 20      # buffer del file (byte)
+SQL_ROWS = 1000             # righe per INSERT multi-riga
+SQL_COMMIT = 100            # INSERT per transazione
+
+_DECIMAL = re.compile(r"decimal\((\d+),\s*(\d+)\)")
+
+
+# Colonne i cui valori vanno normalizzati prima di finire nel CSV
+_CSV_NORMALIZED = {"bool", "date", "datetime", "time"}
+
+
+def _csv_value(v):
+    if v.__class__ is str:
+        return v
+    if v is True:
+        return "TRUE"
+    if v is False:
+        return "FALSE"
+    if isinstance(v, (date, datetime, time)):
+        return v.isoformat()
+    return v
+
+
+class BackgroundFile:
+    """
+    File binario scritto da un thread dedicato: `write` mette il blocco in una
+    coda di al massimo `depth` blocchi e ritorna subito (o aspetta se la coda è
+    piena). Un errore di scrittura viene rilanciato alla `write` successiva o
+    alla chiusura. `bytes` conta i byte passati a `write`; con `digest` il
+    thread di scrittura calcola anche lo SHA-256 del file (`sha256` dopo la
+    chiusura).
+    """
+
+    def __init__(self, path, depth=QUEUE_BLOCKS, buffering=WRITE_BUFFER, digest=False):
+        self._file = open(path, "wb", buffering=buffering)
+        self._queue = queue.Queue(depth)
+        self._error = None
+        self._digest = hashlib.sha256() if digest else None
+        self.bytes = 0
+        self.sha256 = None
+        self.closed = False
+        self._thread = threading.Thread(target=self._drain, name=f"writer:{path}", daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        # dopo un errore continua a svuotare la coda, così il produttore non resta bloccato
+        while (block := self._queue.get()) is not None:
+            if self._error is None:
+                try:
+                    self._file.write(block)
+                    if self._digest is not None:
+                        self._digest.update(block)
+                except BaseException as e:
+                    self._error = e
+
+    def write(self, block):
+        if self._error is not None:
+            raise self._error
+        self.bytes += len(block)
+        self._queue.put(block)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        if self._digest is not None:
+            self.sha256 = self._digest.hexdigest()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _csv_blocks(columns, rows):
+    # Intestazione, poi (testo UTF-8, righe) di ogni blocco di BLOCK_ROWS righe
+    fixed = [i for i, (_, t) in enumerate(columns) if t in _CSV_NORMALIZED]
+    text = io.StringIO(newline="")
+    writer = csv.writer(text)
+    writer.writerow([name for name, _ in columns])
+    yield text.getvalue().encode("utf-8")
+    rows = iter(rows)
+    while True:
+        text.seek(0)
+        text.truncate()
+        block = list(islice(rows, BLOCK_ROWS))
+        if not block:
+            return
+        if fixed:
+            for n, values in enumerate(block):
+                values = block[n] = list(values)
+                for i in fixed:
+                    values[i] = _csv_value(values[i])
+        writer.writerows(block)
+        yield text.getvalue().encode("utf-8"), len(block)
+        if len(block) < BLOCK_ROWS:
+            return
+
+
+def write_csv(path, columns, rows):
+    """
+    Scrive `rows` (tuple) in `path` come CSV con intestazione.
+    Le righe vengono consumate a blocchi di BLOCK_ROWS, codificate qui e
+    scritte da un thread in background. Restituisce il numero di righe.
+    """
+    blocks = _csv_blocks(columns, rows)
+    total = 0
+    with BackgroundFile(path) as f:
+        f.write(next(blocks))
+        for data, n in blocks:
+            f.write(data)
+            total += n
+    return total
+
+
+def _compressed(blocks, compress, threads):
+    # Blocchi compressi da `threads` thread, restituiti nell'ordine originale;
+    # al massimo 2 * threads blocchi in volo
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="compress") as pool:
+        pending = deque()
+        for data, n in blocks:
+            pending.append((pool.submit(compress, data), n))
+            if len(pending) >= 2 * threads:
+                future, n = pending.popleft()
+                yield future.result(), n
+        while pending:
+            future, n = pending.popleft()
+            yield future.result(), n
+
+
+def part_name(table, number=None, compress="none"):
+    """Nome del file di una tabella: `T.csv[.gz|.zst]`, o `T.part-0001.csv[...]` per le parti."""
+    part = "" if number is None else f".part-{number:04d}"
+    return f"{table}{part}.csv{SUFFIXES[compress]}"
+
+
+def write_csv_parts(outdir, table, columns, rows, compress="none", part_bytes=None, threads=THREADS):
+    """
+    Scrive `rows` (tuple) come CSV compresso con `compress` (gzip, zstd o
+    none), diviso in parti di al massimo `part_bytes` byte su disco (tranne
+    un blocco più grande del limite), ognuna con la propria intestazione. I
+    blocchi vengono compressi in parallelo da `threads` thread; le parti non
+    dipendono dal numero di thread.
+
+    Restituisce (righe, indice): l'indice elenca per ogni parte file, prima
+    e ultima riga (numerate da 1 sull'intera tabella), righe, byte e SHA-256.
+    """
+    compress_block = compressor(compress) if compress != "none" else None
+    blocks = _csv_blocks(columns, rows)
+    header = next(blocks)
+    if compress_block is not None:
+        header = compress_block(header)
+        blocks = _compressed(blocks, compress_block, threads)
+    parts, total, f = [], 0, None
+
+    def next_part(f):
+        if f is not None:
+            f.close()
+            parts[-1].update(bytes=f.bytes, sha256=f.sha256)
+        name = part_name(table, len(parts) + 1 if part_bytes else None, compress)
+        parts.append({"file": name, "first_row": total + 1, "last_row": total, "rows": 0})
+        f = BackgroundFile(outdir / name, digest=True)
+        f.write(header)
+        return f
+
+    try:
+        f = next_part(None)
+        for data, n in blocks:
+            if part_bytes and parts[-1]["rows"] and f.bytes + len(data) > part_bytes:
+                f = next_part(f)
+            f.write(data)
+            total += n
+            parts[-1]["rows"] += n
+            parts[-1]["last_row"] = total
+        f.close()
+        parts[-1].update(bytes=f.bytes, sha256=f.sha256)
+    finally:
+        if f is not None:
+            f.close()
+    index = {"table": table, "compression": compress, "part_bytes": part_bytes, "rows": total,
+             "columns": [name for name, _ in columns], "parts": parts}
+    return total, index
+
+
+# Letterali SQL (dump con NO_BACKSLASH_ESCAPES: nei testi si raddoppia solo l'apice)
+_SQL_BOOL = {True: "1", False: "0", "TRUE": "1", "FALSE": "0", "1": "1", "0": "0", None: "NULL"}
+_SQL_QUOTED = {"str", "date", "datetime", "time"}
+
+
+def _sql_literals(values, type_name):
+    # Letterali di una colonna di un blocco, convertiti per colonna e non per riga
+    if type_name == "bool":
+        return list(map(_SQL_BOOL.__getitem__, values))
+    nulls = None in values
+    if type_name in _SQL_QUOTED:
+        if type_name != "str":
+            values = map(_csv_value, values)
+        elif nulls or "'" in "".join(values):
+            values = [v if v is None else v.replace("'", "''") for v in values]
+        if nulls:
+            return ["NULL" if v is None else f"'{v}'" for v in values]
+        return list(map("'{}'".format, values))
+    if nulls:
+        return ["NULL" if v is None else str(v) for v in values]
+    return list(map(str, values))
+
+
+def write_sql(path, table, columns, rows, rows_per_insert=SQL_ROWS, commit_every=SQL_COMMIT):
+    """
+    Scrive `rows` (tuple) in `path` come INSERT multi-riga di `rows_per_insert`
+    righe nella tabella `table`, con un COMMIT ogni `commit_every` INSERT e a
+    fine tabella (la sezione dati di un dump, vedi datagen.dump). I valori
+    vengono convertiti in letterali una colonna alla volta e le righe unite
+    con join, senza concatenare stringhe riga per riga. Restituisce il
+    numero di righe.
+    """
+    names = ", ".join(f"`{name}`" for name, _ in columns)
+    types = [t for _, t in columns]
+    insert = f"INSERT INTO `{table}` ({names}) VALUES\n("
+    total = statements = pending = 0
+    out = [f"\n-- Tabella {table}\n"]
+    rows = iter(rows)
+    with BackgroundFile(path) as f:
+        while block := list(islice(rows, rows_per_insert)):
+            literals = [_sql_literals(values, t) for values, t in zip(zip(*block), types)]
+            out += (insert, "),\n(".join(map(", ".join, zip(*literals))), ");\n")
+            total += len(block)
+            pending += len(block)
+            statements += 1
+            if statements % commit_every == 0:
+                out.append("COMMIT;\n")
+            if pending >= BLOCK_ROWS:
+                f.write("".join(out).encode("utf-8"))
+                out, pending = [], 0
+        if statements % commit_every:
+            out.append("COMMIT;\n")
+        f.write("".join(out).encode("utf-8"))
+    return total
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("I formati parquet/arrow-ipc richiedono pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _as_date(v):
+    return date.fromisoformat(v) if isinstance(v, str) else v
+
+
+def _as_datetime(v):
+    return datetime.fromisoformat(v) if isinstance(v, str) else v
+
+
+def _as_time(v):
+    return time.fromisoformat(v) if isinstance(v, str) else v
+
+
+def _as_bool(v):
+    return v in ("TRUE", "1") if isinstance(v, str) else bool(v)
+
+
+# Tipo Arrow e funzione di conversione dei valori per ogni tipo dichiarato
+def arrow_type(pa, type_name):
+    m = _DECIMAL.fullmatch(type_name)
+    if m:
+        precision, scale = int(m.group(1)), int(m.group(2))
+        fmt = f"{{:.{scale}f}}"
+        return pa.decimal128(precision, scale), lambda v: Decimal(fmt.format(v))
+    return {
+        "int": (pa.int32(), None),
+        "float": (pa.float64(), None),
+        "str": (pa.string(), None),
+        "bool": (pa.bool_(), _as_bool),
+        "date": (pa.date32(), _as_date),
+        "datetime": (pa.timestamp("s"), _as_datetime),
+        "time": (pa.time32("s"), _as_time),
+    }[type_name]
+
+
+def write_columnar(path, columns, rows, fmt="parquet", row_group_size=ROW_GROUP_SIZE):
+    """
+    Scrive `rows` (tuple) in `path` come Parquet o Arrow IPC.
+    `columns` è la lista (nome, tipo) della tabella, nell'ordine della DDL.
+    Restituisce il numero di righe scritte.
+    """
+    pa = _pyarrow()
+    names = [name for name, _ in columns]
+    types, converters = zip(*(arrow_type(pa, t) for _, t in columns))
+    schema = pa.schema(list(zip(names, types)))
+
+    if fmt == "parquet":
+        writer = pa.parquet.ParquetWriter(str(path), schema, compression="zstd")
+        write = writer.write_table
+    elif fmt == "arrow-ipc":
+        writer = pa.ipc.new_file(str(path), schema)
+        write = writer.write
+    else:
+        raise ValueError(f"formato colonnare non supportato: {fmt!r}")
+
+    def flush(batch):
+        arrays = []
+        for values, typ, conv in zip(batch, types, converters):
+            if conv is not None:
+                values = [None if v is None else conv(v) for v in values]
+            arrays.append(pa.array(values, type=typ))
+        write(pa.Table.from_arrays(arrays, schema=schema) if fmt == "parquet"
+              else pa.record_batch(arrays, schema=schema))
+
+    total = 0
+    rows = iter(rows)
+    try:
+        while True:
+            block = list(islice(rows, row_group_size))
+            if block or total == 0:
+                # righe -> colonne
+                flush(list(zip(*block)) if block else [[] for _ in names])
+            total += len(block)
+            if len(block) < row_group_size:
+                break
+    finally:
+        writer.close()
+    return total
+
+
+def write_table(path, columns, rows, fmt="csv", row_group_size=ROW_GROUP_SIZE):
+    """Scrive una tabella nel formato `fmt`; restituisce il numero di righe."""
+    if fmt == "csv":
+        return write_csv(path, columns, rows)
+    return write_columnar(path, columns, rows, fmt, row_group_size)
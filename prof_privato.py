@@ -1,10 +1,14 @@
-import csv
+from array import array
+from datetime import date, timedelta
 from pathlib import Path
-from datetime import date, datetime, timedelta
 import random
-from faker import Faker
 
-fake = Faker("it_IT")
+import numpy as np
+
+from datagen import dates, engine, vector
+from datagen.distributions import Uniform, Weighted, Zipf
+from datagen.engine import Schema, Table
+from datagen.sharding import shard_seed
 
 # Configuration
 N_STUDENTS = 15
@@ -12,164 +16,197 @@ N_SUBJECTS = 3
 N_LESSONS = 200
 N_PAYMENTS = 150
 
+# Every table shard gets its own seed derived from (RANDOM_SEED, table, shard),
+# see datagen.sharding: output is identical whatever the number of workers.
 RANDOM_SEED = 1234
-Faker.seed(RANDOM_SEED)
-random.seed(RANDOM_SEED)
 
-# Dates for lessons: last 30 days
-lesson_dates = [date.today() - timedelta(days=x) for x in range(30)]
+# Payments come up to 15 days after the lesson
+PAYMENT_DELAY_DAYS = 15
 
-# Pick 5 dates with more lessons ("hot dates")
-hot_dates = random.sample(lesson_dates, 3)
+# Dates for lessons: last 30 days
+LESSONS_START = date.today() - timedelta(days=29)
+LESSONS_END = date.today()
 
 # Allowed lesson start times
 start_times = ["15:00:00", "16:30:00", "18:00:00"]
-
-def make_output_folder(base="csv_out"):
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = Path(base) / f"PrivateTeacherDB_{timestamp}"
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-def write_csv(filepath, fields, rows):
-    with open(filepath, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fields)
-        writer.writeheader()
-        writer.writerows(rows)
-
-def generate_students(n):
+tariff_categories = ["Standard", "Premium", "Economy"]
+
+# Skewed columns (datagen.distributions), changed with --dist / --uniform:
+# a few busy days get most lessons ("hot dates"), regular students book
+# more often, late afternoon and Standard tariff are the most common
+DISTRIBUTIONS = {
+    "Lesson.LessonDate": Zipf(1.1),
+    "Lesson.StudentID": Zipf(0.8),
+    "Lesson.StartTime": Weighted(3, 4, 2),
+    "Lesson.Category": Weighted(6, 2, 2),
+}
+LESSON_COLUMNS = ["LessonDate", "StudentID", "StartTime", "Category"]
+
+# Each generate_* function gets a shard (a range of IDs with its own random
+# generators) and yields one tuple per row, values in the DDL column order
+def generate_students(shard):
     grades = ["1A", "2B", "3C", "4D", "5E"]
-    students = []
-    for i in range(1, n + 1):
-        students.append({
-            "StudentID": i,
-            "FirstName": fake.first_name(),
-            "LastName": fake.last_name(),
-            "Email": fake.email(),
-            "Grade": random.choice(grades),
-            "IsDeleted": 0
-        })
-    return students
-
-def generate_subjects(n):
-    subjects = []
+    # Text values come from the cached Faker pools (datagen.pools)
+    columns = zip(shard.ids(), shard.sample("first_name"), shard.sample("last_name"), shard.sample("email"),
+                  vector.choice(shard.np, grades, len(shard)))
+    for i, first_name, last_name, email, grade in columns:
+        yield (
+            i,           # StudentID
+            first_name,  # FirstName
+            last_name,   # LastName
+            email,       # Email
+            grade,       # Grade
+            0,           # IsDeleted
+        )
+
+def generate_subjects(shard):
     predefined_subjects = ["Math", "French", "History"]
-    for i, subject_name in enumerate(predefined_subjects, start=1):
-        subjects.append({
-            "SubjectID": i,
-            "SubjectName": subject_name,
-            "HourlyRate": round(random.uniform(15, 50), 2),
-            "IsDeleted": 0
-        })
-    return subjects
-
-def generate_lessons(n, students, subjects):
-    lessons = []
-    lesson_id = 1
-
-    # 60% lessons on hot dates, 40% on other dates
-    hot_count = int(n * 0.6)
-    other_count = n - hot_count
-
-    tariff_categories = ["Standard", "Premium", "Economy"]
-
-    for _ in range(hot_count):
-        date_ = random.choice(hot_dates)
-        start_time = random.choice(start_times)
-        duration = 90  # Fixed duration of 90 minutes
-        student = random.choice(students)
-        subject = random.choice(subjects)
-        category = random.choice(tariff_categories)
-        expected_amount = round((duration / 60) * subject["HourlyRate"], 2)
-        lessons.append({
-            "LessonID": lesson_id,
-            "ExpectedAmount": expected_amount,
-            "LessonDate": date_.isoformat(),
-            "StartTime": start_time,
-            "DurationMinutes": duration,
-            "StudentID": student["StudentID"],
-            "SubjectID": subject["SubjectID"],
-            "Category": category,
-            "IsDeleted": 0
-        })
-        lesson_id += 1
-
-    for _ in range(other_count):
-        date_ = random.choice([d for d in lesson_dates if d not in hot_dates])
-        start_time = random.choice(start_times)
-        duration = 90  # Fixed duration of 90 minutes
-        student = random.choice(students)
-        subject = random.choice(subjects)
-        category = random.choice(tariff_categories)
-        expected_amount = round((duration / 60) * subject["HourlyRate"], 2)
-        lessons.append({
-            "LessonID": lesson_id,
-            "ExpectedAmount": expected_amount,
-            "LessonDate": date_.isoformat(),
-            "StartTime": start_time,
-            "DurationMinutes": duration,
-            "StudentID": student["StudentID"],
-            "SubjectID": subject["SubjectID"],
-            "Category": category,
-            "IsDeleted": 0
-        })
-        lesson_id += 1
-
-    return lessons
-
-def generate_payments(n, lessons):
-    payments = []
-    payment_id = 1
-
-    # Randomly pick lessons to have payments
-    lessons_paid = random.sample(lessons, k=min(n, len(lessons)))
-
-    for lesson in lessons_paid:
-        paid_fraction = random.choice([1.0, 0.5, 0.75])
-        amount_paid = round(lesson["ExpectedAmount"] * paid_fraction, 2)
-        payment_date = datetime.strptime(lesson["LessonDate"], "%Y-%m-%d").date() + timedelta(days=random.randint(0, 15))
-        payments.append({
-            "PaymentID": payment_id,
-            "LessonID": lesson["LessonID"],
-            "PaymentDate": payment_date.isoformat(),
-            "AmountPaid": amount_paid,
-            "IsDeleted": 0
-        })
-        payment_id += 1
-
-    return payments
-
-def main():
-    output_folder = make_output_folder()
-
-    students = generate_students(N_STUDENTS)
-    subjects = generate_subjects(N_SUBJECTS)
-    lessons = generate_lessons(N_LESSONS, students, subjects)
-    payments = generate_payments(N_PAYMENTS, lessons)
-
-    write_csv(output_folder / "Student.csv", ["StudentID", "FirstName", "LastName", "Email", "Grade", "IsDeleted"], students)
-    write_csv(output_folder / "Subject.csv", ["SubjectID", "SubjectName", "HourlyRate", "IsDeleted"], subjects)
-    # Match the exact column order of the SQL table: LessonID, LessonDate, ExpectedAmount, StartTime, DurationMinutes, StudentID, SubjectID, Category
-    write_csv(
-        output_folder / "Lesson.csv",
-        [
-            "LessonID",
-            "LessonDate",
-            "ExpectedAmount",
-            "StartTime",
-            "DurationMinutes",
-            "StudentID",
-            "SubjectID",
-            "Category",
-            "IsDeleted",
-        ],
-        lessons,
+    for i in shard.ids():
+        yield (
+            i,                                    # SubjectID
+            predefined_subjects[i - 1],           # SubjectName
+            round(shard.rng.uniform(15, 50), 2),  # HourlyRate
+            0,                                    # IsDeleted
+        )
+
+def generate_lessons(shard, start, days, student_ids, hourly_rates, distributions):
+    # Every column of the shard is drawn in one go with numpy; days, students,
+    # start times and categories follow their distributions (DISTRIBUTIONS)
+    date_dist, student_dist, time_dist, category_dist = distributions
+    duration = 90  # Fixed duration of 90 minutes
+    gen, size = shard.np, len(shard)
+    rates = np.round(np.asarray(hourly_rates) * (duration / 60), 2)
+    subject_idx = gen.integers(0, len(hourly_rates), size=size)
+
+    columns = zip(
+        shard.ids(),
+        vector.iso_dates(start, date_dist.days(gen, start, days, size)),
+        time_dist.pick(gen, start_times, size),
+        student_dist.pick(gen, student_ids, size),
+        (subject_idx + 1).tolist(),
+        rates[subject_idx].tolist(),
+        category_dist.pick(gen, tariff_categories, size),
     )
-    write_csv(output_folder / "Payment.csv", ["PaymentID", "LessonID", "PaymentDate", "AmountPaid", "IsDeleted"], payments)
+    for lesson_id, date_, start_time, student_id, subject_id, expected_amount, category in columns:
+        yield (
+            lesson_id,        # LessonID
+            date_,            # LessonDate
+            expected_amount,  # ExpectedAmount
+            start_time,       # StartTime
+            duration,         # DurationMinutes
+            student_id,       # StudentID
+            subject_id,       # SubjectID
+            category,         # Category
+            0,                # IsDeleted
+        )
+
+def pick_paid_lessons(n_payments, n_lessons, first=1):
+    # Randomly pick lessons to have payments; kept as one byte per generated
+    # lesson (position = LessonID - first LessonID). The seed is keyed by the
+    # last LessonID before this run (0 for a full run), so each --append
+    # delta draws its own sample
+    rng = random.Random(shard_seed(RANDOM_SEED, "paid_lessons", first - 1))
+    paid = bytearray(n_lessons)
+    for lesson_id in rng.sample(range(1, n_lessons + 1), k=min(n_payments, n_lessons)):
+        paid[lesson_id - 1] = 1
+    return paid
+
+def generate_payments(shard, paid_lessons):
+    # paid_lessons: (LessonID, ExpectedAmount, LessonDate) per paid lesson, in LessonID order
+    gen, size = shard.np, len(shard)
+    lo, hi = shard.lo - shard.first, shard.hi - shard.first
+    fractions = vector.choice(gen, [1.0, 0.5, 0.75], size)
+    amounts = np.round(np.asarray(paid_lessons.amount[lo:hi]) * fractions, 2).tolist()
+    days = np.asarray(paid_lessons.day[lo:hi], dtype="int64") + vector.day_offsets(gen, PAYMENT_DELAY_DAYS, size)
+    payment_dates = dates.iso(days)
+    columns = zip(shard.ids(), paid_lessons.lesson_id[lo:hi], payment_dates, amounts)
+    for payment_id, lesson_id, payment_date, amount_paid in columns:
+        yield (
+            payment_id,    # PaymentID
+            lesson_id,     # LessonID
+            payment_date,  # PaymentDate
+            amount_paid,   # AmountPaid
+            0,             # IsDeleted
+        )
+
+class PaidLessons:
+    # Compact columns (LessonID, ExpectedAmount, LessonDate day index) of the paid lessons
+    def __init__(self):
+        self.lesson_id = array("I")
+        self.amount = array("d")
+        self.day = array("I")
+
+    def __len__(self):
+        return len(self.lesson_id)
+
+    def __getitem__(self, i):
+        return self.lesson_id[i], self.amount[i], self.day[i]
+
+    def collect(self, lessons, paid, columns, first=1):
+        # Pass lessons through unchanged, remembering the ones that get a payment;
+        # `columns` picks (LessonID, ExpectedAmount, LessonDate) out of a lesson row
+        for lesson in lessons:
+            lesson_id, amount, lesson_date = columns(lesson)
+            if paid[lesson_id - first]:
+                self.lesson_id.append(lesson_id)
+                self.amount.append(amount)
+                self.day.append(dates.day(lesson_date))
+            yield lesson
+
+# Remember the hourly rates of the subjects (lessons are priced from them)
+def keep_rates(ctx, subjects):
+    rates = ctx.state["hourly_rates"] = array("d")
+    hourly_rate = ctx.schema["Subject"].getter("HourlyRate")
+    for subject in subjects:
+        rates.append(hourly_rate(subject))
+        yield subject
+
+# Remember the paid lessons (payments are generated from them)
+def keep_paid_lessons(ctx, lessons):
+    paid_lessons = ctx.state["paid_lessons"] = PaidLessons()
+    first = ctx.first_id("Lesson")
+    paid = pick_paid_lessons(ctx.per_window(ctx.scaled(N_PAYMENTS)), ctx.rows("Lesson"), first)
+    columns = ctx.schema["Lesson"].getter("LessonID", "ExpectedAmount", "LessonDate")
+    return paid_lessons.collect(lessons, paid, columns, first)
+
+# Days of the optional Calendar table (--calendar): lessons and their payments
+def calendar_window(ctx):
+    start, end = ctx.window(LESSONS_START, LESSONS_END)
+    return start, end + timedelta(days=PAYMENT_DELAY_DAYS)
+
+# Lesson days: the last 30 days, or the new days after the previous data with --append
+def lesson_args(ctx):
+    start, end = ctx.window(LESSONS_START, LESSONS_END)
+    distributions = tuple(ctx.distribution(f"Lesson.{column}") for column in LESSON_COLUMNS)
+    return start, (end - start).days, ctx.ids("Student"), ctx.state["hourly_rates"], distributions
+
+# The most likely lesson days of the LessonDate distribution
+def hot_dates(ctx, count=3):
+    start, end = ctx.window(LESSONS_START, LESSONS_END)
+    first = dates.day(start)
+    top = ctx.distribution("Lesson.LessonDate").top((end - start).days + 1, count, first)
+    return dates.iso(first + np.asarray(top, dtype="int64"))
+
+# PrivateTeacherDB schema: columns, types, keys and lengths come from the DDL
+# (prof_privato.sql), the spec only adds generators and row counts.
+# datagen.engine generates the tables in FK order and streams them to disk;
+# payments are built from the paid lessons collected in this process, so they
+# are not sent to the worker processes. Lessons and payments are the activity
+# tables: --append only generates new ones (delta=date column).
+SCHEMA = Schema("PrivateTeacherDB", seed=RANDOM_SEED, sql=Path(__file__).with_name("prof_privato.sql"), tables=[
+    Table("Student", generate_students, N_STUDENTS),
+    # the subjects are a fixed list: --scale does not multiply them
+    Table("Subject", generate_subjects, N_SUBJECTS, keep=keep_rates, scaled=False),
+    Table("Lesson", generate_lessons, N_LESSONS, args=lesson_args, keep=keep_paid_lessons, delta="LessonDate"),
+    Table("Payment", generate_payments, lambda ctx: len(ctx.state["paid_lessons"]),
+          args=lambda ctx: (ctx.state["paid_lessons"],), parallel=False, delta=True),
+], calendar=calendar_window, distributions=DISTRIBUTIONS)
 
-    print(f"CSV files generated at: {output_folder.resolve()}")
-    hot_strs = {d.isoformat() for d in hot_dates}
-    print("Hot dates (more lessons):", sorted(hot_strs))
+def main():
+    ctx = engine.main(SCHEMA, description="CSV generator for PrivateTeacherDB")
+    print(f"{ctx.fmt} files generated at: {ctx.outdir.resolve()}")
+    if not isinstance(ctx.distribution("Lesson.LessonDate"), Uniform):
+        print("Hot dates (more lessons):", sorted(hot_dates(ctx)))
 
 if __name__ == "__main__":
     main()
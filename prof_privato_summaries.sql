@@ -0,0 +1,154 @@
+-- Riepiloghi materializzati di prof_privato.sql, aggiornati in modo incrementale.
+-- Generato da: python -m datagen.summaries sql prof_privato
+-- Refresh: CALL Refresh_<report>(); dopo modifiche a righe già elaborate: CALL Rebuild_<report>();
+
+CREATE TABLE IF NOT EXISTS Summary_Watermark (
+    Summary VARCHAR(64) NOT NULL,
+    SourceTable VARCHAR(64) NOT NULL,
+    LastID BIGINT,
+    RefreshedAt DATETIME,
+    PRIMARY KEY (Summary, SourceTable)
+);
+
+CREATE TABLE IF NOT EXISTS MV_Monthly_Revenue_Summary (
+    YearMonth CHAR(7) NOT NULL,
+    TotalRevenue DECIMAL(14,2),
+    LessonsPaid BIGINT,
+    PRIMARY KEY (YearMonth)
+);
+
+CREATE OR REPLACE VIEW Monthly_Revenue_Summary_Fast AS
+SELECT YearMonth, ROUND(TotalRevenue, 2) AS TotalRevenue, LessonsPaid
+FROM MV_Monthly_Revenue_Summary;
+
+CREATE TABLE IF NOT EXISTS MV_Payer_Financial_Situation (
+    StudentID INT NOT NULL,
+    FirstName VARCHAR(50),
+    LastName VARCHAR(50),
+    TotalExpected DECIMAL(14,2),
+    TotalPaid DECIMAL(14,2),
+    PRIMARY KEY (StudentID)
+);
+
+CREATE OR REPLACE VIEW Payer_Financial_Situation_Fast AS
+SELECT StudentID, FirstName, LastName,
+       ROUND(TotalExpected, 2) AS TotalExpected,
+       ROUND(TotalPaid, 2) AS TotalPaid,
+       ROUND(TotalExpected - TotalPaid, 2) AS Balance
+FROM MV_Payer_Financial_Situation;
+
+DELIMITER $$
+
+DROP PROCEDURE IF EXISTS Refresh_Monthly_Revenue_Summary_Fast$$
+CREATE PROCEDURE Refresh_Monthly_Revenue_Summary_Fast()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di Payment
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Monthly_Revenue_Summary_Fast' AND SourceTable = 'Payment';
+    SELECT IFNULL(MAX(PaymentID), 0) INTO v_hi FROM Payment;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Monthly_Revenue_Summary (YearMonth, TotalRevenue, LessonsPaid)
+        SELECT * FROM (
+                    SELECT SUBSTR(P.PaymentDate, 1, 7) AS YearMonth,
+                           SUM(P.AmountPaid) AS TotalRevenue,
+                           COUNT(DISTINCT CASE WHEN NOT EXISTS (
+                               SELECT 1 FROM Payment P0
+                               WHERE P0.LessonID = P.LessonID AND P0.IsDeleted = 0 AND P0.AmountPaid IS NOT NULL
+                                 AND P0.PaymentID <= v_lo
+                                 AND SUBSTR(P0.PaymentDate, 1, 7) = SUBSTR(P.PaymentDate, 1, 7)
+                           ) THEN P.LessonID END) AS LessonsPaid
+                    FROM Payment P
+                    JOIN Lesson L ON L.LessonID = P.LessonID
+                    JOIN Student ST ON L.StudentID = ST.StudentID
+                    JOIN Subject SB ON L.SubjectID = SB.SubjectID
+                    WHERE L.IsDeleted = 0 AND ST.IsDeleted = 0 AND SB.IsDeleted = 0 AND P.IsDeleted = 0 AND P.AmountPaid IS NOT NULL
+                      AND P.PaymentID > v_lo AND P.PaymentID <= v_hi
+                    GROUP BY SUBSTR(P.PaymentDate, 1, 7)) AS d
+        ON DUPLICATE KEY UPDATE
+            TotalRevenue = MV_Monthly_Revenue_Summary.TotalRevenue + VALUES(TotalRevenue),
+            LessonsPaid = MV_Monthly_Revenue_Summary.LessonsPaid + VALUES(LessonsPaid);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Monthly_Revenue_Summary_Fast' AS Summary, 'Payment' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_Monthly_Revenue_Summary_Fast$$
+CREATE PROCEDURE Rebuild_Monthly_Revenue_Summary_Fast()
+BEGIN
+    DELETE FROM MV_Monthly_Revenue_Summary;
+    DELETE FROM Summary_Watermark WHERE Summary = 'Monthly_Revenue_Summary_Fast';
+    CALL Refresh_Monthly_Revenue_Summary_Fast();
+END$$
+
+DROP PROCEDURE IF EXISTS Refresh_Payer_Financial_Situation_Fast$$
+CREATE PROCEDURE Refresh_Payer_Financial_Situation_Fast()
+BEGIN
+    DECLARE v_lo BIGINT DEFAULT 0;
+    DECLARE v_hi BIGINT DEFAULT 0;
+    -- righe nuove di Lesson
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Payer_Financial_Situation_Fast' AND SourceTable = 'Lesson';
+    SELECT IFNULL(MAX(LessonID), 0) INTO v_hi FROM Lesson;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Payer_Financial_Situation (StudentID, FirstName, LastName, TotalExpected, TotalPaid)
+        SELECT * FROM (
+                    SELECT ST.StudentID AS StudentID, ST.FirstName AS FirstName, ST.LastName AS LastName,
+                           COALESCE(SUM(L.ExpectedAmount), 0) AS TotalExpected, 0 AS TotalPaid
+                    FROM Lesson L
+                    JOIN Student ST ON L.StudentID = ST.StudentID
+                    JOIN Subject SB ON L.SubjectID = SB.SubjectID
+                    WHERE L.IsDeleted = 0 AND ST.IsDeleted = 0 AND SB.IsDeleted = 0 AND L.LessonID > v_lo AND L.LessonID <= v_hi
+                    GROUP BY ST.StudentID, ST.FirstName, ST.LastName) AS d
+        ON DUPLICATE KEY UPDATE
+            FirstName = VALUES(FirstName),
+            LastName = VALUES(LastName),
+            TotalExpected = MV_Payer_Financial_Situation.TotalExpected + VALUES(TotalExpected),
+            TotalPaid = MV_Payer_Financial_Situation.TotalPaid + VALUES(TotalPaid);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Payer_Financial_Situation_Fast' AS Summary, 'Lesson' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+    -- righe nuove di Payment
+    SELECT IFNULL(MAX(LastID), 0) INTO v_lo FROM Summary_Watermark
+     WHERE Summary = 'Payer_Financial_Situation_Fast' AND SourceTable = 'Payment';
+    SELECT IFNULL(MAX(PaymentID), 0) INTO v_hi FROM Payment;
+    IF v_hi > v_lo THEN
+        INSERT INTO MV_Payer_Financial_Situation (StudentID, FirstName, LastName, TotalExpected, TotalPaid)
+        SELECT * FROM (
+                    SELECT ST.StudentID AS StudentID, ST.FirstName AS FirstName, ST.LastName AS LastName,
+                           0 AS TotalExpected, COALESCE(SUM(P.AmountPaid), 0) AS TotalPaid
+                    FROM Payment P
+                    JOIN Lesson L ON L.LessonID = P.LessonID
+                    JOIN Student ST ON L.StudentID = ST.StudentID
+                    JOIN Subject SB ON L.SubjectID = SB.SubjectID
+                    WHERE L.IsDeleted = 0 AND ST.IsDeleted = 0 AND SB.IsDeleted = 0 AND P.IsDeleted = 0 AND P.PaymentID > v_lo AND P.PaymentID <= v_hi
+                    GROUP BY ST.StudentID, ST.FirstName, ST.LastName) AS d
+        ON DUPLICATE KEY UPDATE
+            FirstName = VALUES(FirstName),
+            LastName = VALUES(LastName),
+            TotalExpected = MV_Payer_Financial_Situation.TotalExpected + VALUES(TotalExpected),
+            TotalPaid = MV_Payer_Financial_Situation.TotalPaid + VALUES(TotalPaid);
+        INSERT INTO Summary_Watermark (Summary, SourceTable, LastID, RefreshedAt)
+        SELECT * FROM (SELECT 'Payer_Financial_Situation_Fast' AS Summary, 'Payment' AS SourceTable, v_hi AS LastID, CURRENT_TIMESTAMP AS RefreshedAt) AS d
+        ON DUPLICATE KEY UPDATE
+            LastID = VALUES(LastID),
+            RefreshedAt = VALUES(RefreshedAt);
+    END IF;
+END$$
+
+DROP PROCEDURE IF EXISTS Rebuild_Payer_Financial_Situation_Fast$$
+CREATE PROCEDURE Rebuild_Payer_Financial_Situation_Fast()
+BEGIN
+    DELETE FROM MV_Payer_Financial_Situation;
+    DELETE FROM Summary_Watermark WHERE Summary = 'Payer_Financial_Situation_Fast';
+    CALL Refresh_Payer_Financial_Situation_Fast();
+END$$
+
+DELIMITER ;
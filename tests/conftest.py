@@ -0,0 +1,15 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# datagen e i generatori vivono nella radice del repository
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def small_shards(monkeypatch):
+    """Shard piccoli: anche le tabelle di prova si dividono in più shard."""
+    from datagen import sharding
+    monkeypatch.setattr(sharding, "SHARD_SIZE", 64)
@@ -0,0 +1,80 @@
+import csv
+from collections import Counter
+import random
+
+import numpy as np
+import pytest
+
+from attivita_didattiche import attivita_didattiche as ad
+from attivita_didattiche.attivita_didattiche import CorsiUF, Iscritti, Occupazione
+from datagen import engine
+
+
+def read(folder, table):
+    with open(folder / f"{table}.csv", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_occupazione_returns_the_next_free_cell():
+    occ = Occupazione(2, 5)
+    assert occ.free(0, 3) == 3
+    occ.take(0, 3)
+    occ.take(0, 4)
+    assert not occ.is_free(0, 3)
+    assert occ.free(0, 3) == 0          # ricomincia da capo
+    assert occ.free(1, 3) == 3          # le righe sono indipendenti
+    for c in range(3):
+        occ.take(0, c)
+    assert occ.free(0, 0) is None
+
+
+def test_occupazione_never_hands_out_a_taken_cell():
+    rng = random.Random(0)
+    occ = Occupazione(3, 40)
+    taken = set()
+    for _ in range(3 * 40):
+        row = rng.randrange(3)
+        col = occ.free(row, rng.randrange(45))
+        if col is None:
+            assert all((row, c) in taken for c in range(40))
+            continue
+        assert (row, col) not in taken and occ.is_free(row, col)
+        occ.take(row, col)
+        taken.add((row, col))
+
+
+def test_iscritti_and_corsi_uf():
+    iscritti = Iscritti()
+    for corso, studente in [(1, 10), (3, 11), (1, 12), (3, 13), (1, 14)]:
+        iscritti.add(corso, studente)
+    iscritti.finish(3)
+    drawn = iscritti.sample(np.random.default_rng(0), [1, 3] * 50)
+    assert set(drawn[::2]) == {10, 12, 14} and set(drawn[1::2]) == {11, 13}
+    corsi_uf = CorsiUF()
+    for corso, uf, docente in [(1, 1, 5), (2, 1, 6), (3, 2, 7)]:
+        corsi_uf.add(corso, uf, docente)
+    corsi_uf.finish()
+    assert len(corsi_uf) == 3
+    assert corsi_uf.with_students(iscritti).tolist() == [1, 3]
+
+
+def test_generated_rows_are_consistent(tmp_path, small_shards):
+    engine.run(ad.SCHEMA, tmp_path, workers=2, scale=3)
+    lezioni = read(tmp_path, "lezione")
+    corsi_uf = {r["corso_uf_id"]: r for r in read(tmp_path, "corso_uf")}
+    # nessuna aula e nessun docente in due lezioni dello stesso slot
+    for key in ("aula_id", "docente_id"):
+        assert max(Counter((r[key], r["data_ora_inizio"]) for r in lezioni).values()) == 1
+    assert all(r["docente_id"] == corsi_uf[r["corso_uf_id"]]["docente_id"] for r in lezioni)
+    enrolled = {(r["corso_id"], r["studente_id"]) for r in read(tmp_path, "iscrizione")}
+    for v in read(tmp_path, "valutazione"):
+        cuf = corsi_uf[v["corso_uf_id"]]
+        assert (v["corso_id"], v["unita_formativa_id"], v["docente_id"]) == (
+            cuf["corso_id"], cuf["unita_formativa_id"], cuf["docente_id"])
+        assert (v["corso_id"], v["studente_id"]) in enrolled
+
+
+def test_too_many_lessons_for_the_rooms(tmp_path, monkeypatch):
+    monkeypatch.setattr(ad, "LEZIONI_DAYS", 2)
+    with pytest.raises(ValueError, match="no free slot"):
+        engine.run(ad.SCHEMA, tmp_path)
@@ -0,0 +1,79 @@
+import json
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+import bench_generators  # noqa: E402
+import bench_queries  # noqa: E402
+
+
+def run(tables, total):
+    return {"runs": {"biblioteca": {"1": {"tables": tables, "total": total}}}}
+
+
+def stats(rows=1000, seconds=1.0, rss=50.0, size=10_000):
+    return {"rows": rows, "seconds": seconds, "bytes": size, "peak_rss_mb": rss,
+            "rows_per_sec": round(rows / seconds)}
+
+
+def test_run_one_reports_every_table():
+    result = bench_generators.run_one("prof_privato", 0.5, 1, "csv")
+    tables, total = result["tables"], result["total"]
+    assert {"Student", "Subject", "Lesson", "Payment"} <= set(tables)
+    assert total["rows"] == sum(t["rows"] for t in tables.values())
+    assert total["bytes"] == sum(t["bytes"] for t in tables.values()) > 0
+    assert total["peak_rss_mb"] > 0
+
+
+def test_child_process_prints_json():
+    out = bench_generators.run_isolated("prof_privato", 0.5, 1, "csv")
+    assert out["total"]["rows"] == bench_generators.run_one("prof_privato", 0.5, 1, "csv")["total"]["rows"]
+    assert json.loads(json.dumps(out)) == out
+
+
+def test_compare_flags_only_regressions_over_the_threshold():
+    base = run({"Rental": stats()}, stats())
+    assert bench_generators.compare(base, run({"Rental": stats(seconds=1.1)}, stats(seconds=1.1)), 0.2) == []
+    worse = run({"Rental": stats(seconds=1.5, size=20_000)}, stats(rss=80.0))
+    assert sorted((table, metric) for _, _, table, metric, _, _ in bench_generators.compare(base, worse, 0.2)) == [
+        ("Rental", "bytes"), ("Rental", "rows_per_sec"), ("Rental", "seconds"), ("TOTALE", "peak_rss_mb")]
+    # tempi troppo brevi per essere confrontati, tabelle e scale nuove
+    fast = run({"Rental": stats(seconds=0.01)}, stats())
+    assert bench_generators.compare(fast, run({"Rental": stats(seconds=0.04)}, stats()), 0.2) == []
+    assert bench_generators.compare(base, run({"Book": stats(seconds=9)}, stats()), 0.2) == []
+    assert bench_generators.compare({"runs": {}}, worse, 0.2) == []
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert [bench_queries.percentile(values, p) for p in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert bench_queries.percentile([7.0], 99) == 7.0
+
+
+def test_date_windows_slide_back_from_today():
+    windows = bench_queries._date_windows({"from": "'2024-01-01'", "to": "'2024-01-31'", "n": "5"}, 3)
+    today = bench_queries.date.today()
+    assert windows[0]["to"] == f"'{today}'"
+    assert [w["from"] for w in windows] == [f"'{today - bench_queries.timedelta(days=30 + 31 * k)}'"
+                                            for k in range(3)]
+    assert all("n" not in w for w in windows)
+    assert bench_queries._date_windows({"n": "5"}, 3) == [{}]
+
+
+def test_query_benchmark_on_sqlite():
+    result = bench_queries.run_one("prof_privato", 0.2, None, 3, 2, 1)
+    assert result["rows_loaded"] > 0
+    _, queries = bench_queries.indexes.workload((bench_queries.ROOT / "prof_privato.sql").read_text(encoding="utf-8"))
+    assert list(result["queries"]) == [q.title for q in queries]
+    for q in result["queries"].values():
+        assert q["runs"] == 3 and q["p50_ms"] <= q["p95_ms"] <= q["p99_ms"]
+        assert q["examined_unit"] == "vm_kinstr"
+
+
+def test_query_compare_ignores_sub_millisecond_noise():
+    def results(p50, p95, p99):
+        return {"runs": {"biblioteca": {"1": {"queries": {"Q": {"p50_ms": p50, "p95_ms": p95, "p99_ms": p99}}}}}}
+
+    base = results(0.2, 0.5, 2.0)
+    assert bench_queries.compare(base, results(0.9, 0.9, 2.3), 0.2) == []
+    assert [r[3] for r in bench_queries.compare(base, results(1.5, 0.5, 3.0), 0.2)] == ["p50_ms", "p99_ms"]
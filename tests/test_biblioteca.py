@@ -0,0 +1,89 @@
+import csv
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+import biblioteca
+from biblioteca import CopyStore
+from datagen import engine
+
+
+def store_with(copies, status=biblioteca.AVAILABLE):
+    store = CopyStore()
+    for book_id in range(1, copies + 1):
+        store.add(book_id, 1, status, 0)
+    return store
+
+
+def test_a_copy_is_never_booked_twice_on_the_same_day():
+    store = store_with(3)
+    rng = random.Random(0)
+    booked = [store.book(rng, 0, 9) for _ in range(3)]
+    assert sorted(booked) == [1, 2, 3]
+    assert store.book(rng, 5, 6) is None
+    assert store.book(rng, 10, 12) is not None
+    assert all(not store.is_free(copy_id, 9, 9) for copy_id in booked)
+
+
+def test_status_follows_unreturned_rentals():
+    store = store_with(2)
+    store.add(3, 1, biblioteca.MAINTENANCE, 0)
+    rng = random.Random(0)
+    out = store.book(rng, 0, 30, out=True)
+    assert store.get_status(out) == "Rented"
+    assert store.get_status(3 - out) == "Available"
+    assert store.get_status(3) == "Maintenance"
+    assert store.rentable_count() == 2
+
+
+def test_held_copies_are_skipped():
+    store = store_with(2)
+    store.hold(1, 5, False)
+    store.hold(1, 20, True)
+    assert store.bookings(1) == [(0, 20)]
+    assert store.get_status(1) == "Rented"
+    assert store.book(random.Random(0), 10, 15) == 2
+
+
+def intervals(*folders):
+    by_copy = defaultdict(list)
+    for folder in folders:
+        with open(folder / "Rental.csv", encoding="utf-8", newline="") as f:
+            for r in csv.DictReader(f):
+                end = "9999-12-31" if r["Returned"].upper() == "FALSE" else r["EndDate"]
+                by_copy[r["BookCopyID"]].append((r["StartDate"], end))
+    return by_copy
+
+
+def test_append_does_not_book_copies_still_out(tmp_path):
+    folders = [tmp_path / name for name in ("base", "delta", "delta2")]
+    for folder in folders:
+        folder.mkdir()
+    engine.run(biblioteca.SCHEMA, folders[0], scale=5)
+    until = biblioteca.RENTALS_END + timedelta(days=60)
+    engine.run(biblioteca.SCHEMA, folders[1], scale=5, previous=folders[0], until=until)
+    engine.run(biblioteca.SCHEMA, folders[2], scale=5, previous=folders[1], until=until + timedelta(days=60))
+    for periods in intervals(*folders).values():
+        periods.sort()
+        assert all(b[0] > a[1] for a, b in zip(periods, periods[1:]))
+
+
+def test_append_reads_legacy_booleans(tmp_path):
+    # cartelle generate prima di TRUE/FALSE: Returned scritto True/False
+    base, delta = tmp_path / "base", tmp_path / "delta"
+    base.mkdir()
+    delta.mkdir()
+    engine.run(biblioteca.SCHEMA, base, scale=5)
+    path = base / "Rental.csv"
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    col = rows[0].index("Returned")
+    for row in rows[1:]:
+        row[col] = row[col].capitalize()
+    assert "False" in {row[col] for row in rows[1:]}
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f, lineterminator="\r\n").writerows(rows)
+    engine.run(biblioteca.SCHEMA, delta, scale=5, previous=base, until=biblioteca.RENTALS_END + timedelta(days=60))
+    for periods in intervals(base, delta).values():
+        periods.sort()
+        assert all(b[0] > a[1] for a, b in zip(periods, periods[1:]))
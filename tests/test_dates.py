@@ -0,0 +1,77 @@
+import csv
+from datetime import date, datetime, timedelta
+import sqlite3
+
+import numpy as np
+import pytest
+
+import biblioteca
+from datagen import dates, engine
+from datagen.loader import load_folder
+from datagen.output import CALENDAR_DDL_FILE, read_manifest
+
+
+def all_days(start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def test_calendar_matches_datetime():
+    days = all_days(date(1999, 12, 1), date(2001, 3, 31)) + [dates.FIRST_DAY, dates.LAST_DAY, date(2024, 2, 29)]
+    idx = [dates.day(d) for d in days]
+    assert idx == [int(np.datetime64(d, "D").astype("int64")) for d in days]
+    assert dates.iso(idx) == [d.isoformat() for d in days]
+    assert dates.month_keys(idx) == [d.strftime("%Y-%m") for d in days]
+    assert dates.months(idx) == [d.month for d in days]
+    assert dates.weekdays(idx) == [d.isoweekday() for d in days]
+    assert dates.iso_day(idx[0]) == days[0].isoformat()
+
+
+def test_day_accepts_dates_datetimes_and_text():
+    assert dates.day("2026-10-18") == dates.day(date(2026, 10, 18)) == dates.day(datetime(2026, 10, 18, 23, 59))
+    assert dates.day("2026-10-18 08:30:00") == dates.day(date(2026, 10, 18))
+    assert list(dates.days_between("2026-10-17", date(2026, 10, 19))) == [dates.day("2026-10-17") + i
+                                                                          for i in range(3)]
+
+
+def test_iso_datetimes():
+    rng = np.random.default_rng(0)
+    seconds = rng.integers(0, 4_000_000_000, size=500)
+    expected = [(datetime(1970, 1, 1) + timedelta(seconds=int(s))).isoformat(sep=" ") for s in seconds]
+    assert dates.iso_datetimes(seconds) == expected
+
+
+def test_out_of_range_days():
+    with pytest.raises(ValueError):
+        dates.iso([dates.day(dates.LAST_DAY) + 1])
+    with pytest.raises(ValueError):
+        dates.month_keys([dates.day(dates.FIRST_DAY) - 1])
+
+
+def test_calendar_rows():
+    rows = list(dates.calendar_rows(date(2024, 12, 30), date(2025, 1, 5)))
+    assert [r[0] for r in rows] == [d.isoformat() for d in all_days(date(2024, 12, 30), date(2025, 1, 5))]
+    assert rows[0] == ("2024-12-30", 2024, 4, 12, "2024-12", 30, 1, 0)
+    assert rows[-1] == ("2025-01-05", 2025, 1, 1, "2025-01", 5, 7, 1)
+    assert all(len(r) == len(dates.CALENDAR_COLUMNS) for r in rows)
+
+
+def test_calendar_table_with_append(tmp_path):
+    base, delta = tmp_path / "base", tmp_path / "delta"
+    base.mkdir()
+    delta.mkdir()
+    engine.run(biblioteca.SCHEMA, base, calendar=True)
+    until = biblioteca.RENTALS_END + timedelta(days=10)
+    engine.run(biblioteca.SCHEMA, delta, previous=base, until=until, calendar=True)
+    first, last = read_manifest(base)["calendar"]
+    assert (first, last) == (biblioteca.RENTALS_START.isoformat(), biblioteca.RENTALS_END.isoformat())
+    with open(delta / "Calendar.csv", encoding="utf-8", newline="") as f:
+        added = [r["CalendarDate"] for r in csv.DictReader(f)]
+    assert added == [d.isoformat() for d in all_days(biblioteca.RENTALS_END + timedelta(days=1), until)]
+    assert read_manifest(delta)["calendar"] == [first, until.isoformat()]
+    assert (delta / CALENDAR_DDL_FILE).exists()
+    db = tmp_path / "db.sqlite"
+    for folder in (base, delta):
+        load_folder(folder, f"sqlite:///{db}", report=lambda _: None)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*), MIN(CalendarDate), MAX(CalendarDate) FROM Calendar").fetchone() == (
+            (until - biblioteca.RENTALS_START).days + 1, first, until.isoformat())
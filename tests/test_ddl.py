@@ -0,0 +1,113 @@
+import csv
+import json
+
+import pytest
+
+import biblioteca
+from datagen import ddl, generic
+
+ROOT = biblioteca.SCHEMA.sql.parent
+SQL_FILES = ["biblioteca.sql", "prof_privato.sql", "attivita_didattiche/attivita_didattiche.sql",
+             "GP_per_creazione_database.sql"]
+
+SAMPLE = """
+-- tabella dei clienti; con un commento
+CREATE TABLE IF NOT EXISTS `Customer` (
+    `CustomerID` INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    Email VARCHAR(100) UNIQUE,
+    Kind ENUM('a,b', 'c') DEFAULT 'a,b',
+    Credit DECIMAL(8, 2) NOT NULL DEFAULT 0.00,
+    Active TINYINT(1) NOT NULL,
+    Note TEXT /* libera */
+);
+create table Rental
+(
+    RentalID int not null,
+    CustomerID int,
+    StartDate date not null,
+    constraint pkRental primary key (RentalID),
+    constraint fkRentalCustomer foreign key (CustomerID) references customer (CustomerID),
+    unique (CustomerID, StartDate)
+);
+create index idxRentalStart on Rental(StartDate);
+CREATE VIEW v AS SELECT 1;
+"""
+
+
+def test_parse_columns_keys_and_indexes():
+    schema = ddl.parse(SAMPLE)
+    customer, rental = schema["Customer"], schema["rental"]
+    assert list(customer.columns) == ["CustomerID", "Email", "Kind", "Credit", "Active", "Note"]
+    assert customer.column_types() == [("CustomerID", "int"), ("Email", "str"), ("Kind", "str"),
+                                       ("Credit", "decimal(8,2)"), ("Active", "bool"), ("Note", "str")]
+    assert customer.pk == ["CustomerID"] and customer.columns["CustomerID"].auto_increment
+    assert customer.unique == [("Email",)]
+    assert customer.lengths()["Email"] == 100
+    assert customer.columns["Kind"].default == "a,b"
+    assert not customer.columns["Credit"].nullable and customer.columns["Note"].nullable
+    assert rental.pk == ["RentalID"]
+    assert rental.fks == {"CustomerID": ("Customer", "CustomerID")}
+    assert rental.unique == [("CustomerID", "StartDate")]
+    assert rental.indexes == {"idxRentalStart": ("StartDate",)}
+    assert [t.name for t in schema.order()] == ["Customer", "Rental"]
+    assert [t.name for t in schema.children("Customer")] == ["Rental"]
+
+
+@pytest.mark.parametrize("sql", SQL_FILES)
+def test_dict_round_trip(sql):
+    schema = ddl.parse((ROOT / sql).read_text(encoding="utf-8"))
+    data = json.loads(json.dumps(schema.to_dict()))
+    again = ddl.DDLSchema.from_dict(data)
+    assert again.to_dict() == schema.to_dict()
+    done = set()
+    for table in again.order():
+        assert all(p in done for p in table.parents())
+        done.add(table.name)
+
+
+def test_load_uses_the_json_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ddl, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(ddl, "_cache", {})
+    parsed = []
+    parse = ddl.parse
+    monkeypatch.setattr(ddl, "parse", lambda text: parsed.append(text) or parse(text))
+    sql = tmp_path / "s.sql"
+    sql.write_text(SAMPLE, encoding="utf-8")
+    first = ddl.load(sql)
+    assert ddl.load(sql) is first
+    (cached,) = (tmp_path / "cache").glob("*.json")
+    monkeypatch.setattr(ddl, "_cache", {})
+    assert ddl.load(sql).to_dict() == first.to_dict()
+    assert len(parsed) == 1
+    # un formato vecchio in cache viene ignorato, un file modificato rianalizzato
+    cached.write_text(json.dumps({**first.to_dict(), "version": 0}), encoding="utf-8")
+    monkeypatch.setattr(ddl, "_cache", {})
+    ddl.load(sql)
+    sql.write_text(SAMPLE.replace("Note TEXT", "Note VARCHAR(10)"), encoding="utf-8")
+    assert ddl.load(sql)["Customer"].lengths()["Note"] == 10
+    assert len(parsed) == 3
+
+
+def test_generic_rows_follow_the_ddl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sql = ROOT / "GP_per_creazione_database.sql"
+    ctx = generic.main([str(sql), "--rows", "120", "--rows-for", "Shop=5"])
+    schema = ddl.load(sql)
+    data = {}
+    for name in ctx.counts:
+        with open(ctx.outdir / ctx.files[name], encoding="utf-8", newline="") as f:
+            data[name] = list(csv.DictReader(f))
+    assert len(data["Shop"]) == 5
+    for table in schema:
+        rows = data[table.name]
+        assert list(rows[0]) == list(table.columns)
+        if len(table.pk) == 1:
+            assert [r[table.pk[0]] for r in rows] == [str(i) for i in range(1, len(rows) + 1)]
+        for col, (parent, ref) in table.fks.items():
+            ids = {r[ref] for r in data[parent]}
+            assert all(r[col] in ids or (r[col] == "" and table.columns[col].nullable) for r in rows)
+        for col, n in table.lengths().items():
+            assert all(len(r[col]) <= n for r in rows)
+        for unique in table.unique:
+            keys = [tuple(r[c] for c in unique) for r in rows]
+            assert len(set(keys)) == len(keys)
@@ -0,0 +1,77 @@
+import csv
+from datetime import date, timedelta
+
+import pytest
+
+import biblioteca
+from datagen import delta, engine
+from datagen.output import MANIFEST_FILE
+
+SCHEMA = biblioteca.SCHEMA
+BASE_DAYS = (biblioteca.RENTALS_END - biblioteca.RENTALS_START).days + 1
+
+
+def rows(folder, table):
+    with open(folder / f"{table}.csv", encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def base(tmp_path):
+    folder = tmp_path / "base"
+    folder.mkdir()
+    engine.run(SCHEMA, folder)
+    return folder
+
+
+def append(tmp_path, previous, name, until):
+    folder = tmp_path / name
+    folder.mkdir()
+    return engine.run(SCHEMA, folder, previous=previous, until=until), folder
+
+
+def test_high_water_from_manifest_and_scan_agree(base):
+    levels = delta.high_water(SCHEMA, base)
+    rentals = rows(base, "Rental")
+    assert levels["tables"]["Rental"]["max_id"] == len(rentals)
+    assert levels["tables"]["Rental"]["max_date"] == max(r["StartDate"] for r in rentals)
+    (base / MANIFEST_FILE).unlink()
+    scanned = delta.high_water(SCHEMA, base)
+    for name in ("Rental", "Payment", "Customer"):
+        for key in ("rows", "max_id", "max_date"):
+            assert scanned["tables"][name][key] == levels["tables"][name][key]
+
+
+def test_window_starts_after_the_latest_date(base):
+    levels = delta.high_water(SCHEMA, base)
+    latest = date.fromisoformat(max(levels["tables"][t]["max_date"] for t in ("Rental", "Payment")))
+    until = latest + timedelta(days=10)
+    assert delta.window(SCHEMA, levels, until) == (latest + timedelta(days=1), until)
+    with pytest.raises(ValueError):
+        delta.window(SCHEMA, levels, latest)
+
+
+def test_append_continues_ids_and_dates(tmp_path, base):
+    levels = delta.high_water(SCHEMA, base)
+    until = biblioteca.RENTALS_END + timedelta(days=30)
+    ctx, folder = append(tmp_path, base, "delta", until)
+    assert set(ctx.files) == {"Payment", "Rental"}
+    new = rows(folder, "Rental")
+    first = levels["tables"]["Rental"]["max_id"] + 1
+    assert [int(r["RentalID"]) for r in new] == list(range(first, first + len(new)))
+    start = ctx.span[0].isoformat()
+    assert all(start <= r["StartDate"] <= until.isoformat() for r in new)
+    assert all(int(r["CustomerID"]) <= levels["tables"]["Customer"]["max_id"] for r in new)
+
+    # il delta fa da base al successivo
+    _, later = append(tmp_path, folder, "delta2", until + timedelta(days=30))
+    assert int(rows(later, "Rental")[0]["RentalID"]) == ctx.last["Rental"] + 1
+    assert list(delta.chain(later))[1:] == [folder.resolve(), base.resolve()]
+
+
+@pytest.mark.parametrize("days", [1, 30])
+def test_append_rows_follow_the_window_length(tmp_path, base, days):
+    until = biblioteca.RENTALS_END + timedelta(days=days)
+    ctx, _ = append(tmp_path, base, "delta", until)
+    assert ctx.counts["Rental"] == max(1, round(biblioteca.N_RENTALS * days / BASE_DAYS))
+    assert ctx.counts["Payment"] == max(1, round(biblioteca.N_PAYMENTS * days / BASE_DAYS))
@@ -0,0 +1,65 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from datagen.distributions import AliasTable, Seasonal, Uniform, Weighted, Zipf, parse, parse_overrides
+
+SUNDAY = date(2026, 10, 18)
+
+
+def test_alias_table_follows_the_weights():
+    weights = np.array([5.0, 3.0, 1.0, 0.0, 1.0])
+    sample = AliasTable(weights).sample(np.random.default_rng(0), 200_000)
+    freq = np.bincount(sample, minlength=len(weights)) / len(sample)
+    assert freq[3] == 0
+    assert np.allclose(freq, weights / weights.sum(), atol=0.01)
+
+
+@pytest.mark.parametrize("weights", [[], [0, 0], [1, -1]])
+def test_alias_table_rejects_invalid_weights(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
+
+
+def test_positions_are_reproducible():
+    dist = Zipf(1.2)
+    a = dist.positions(np.random.default_rng(3), 1000, 50)
+    b = dist.positions(np.random.default_rng(3), 1000, 50)
+    assert (a == b).all() and a.min() >= 0 and a.max() < 50
+
+
+def test_zipf_concentrates_on_the_top_keys():
+    dist = Zipf(1.5)
+    sample = dist.positions(np.random.default_rng(1), 50_000, 1000)
+    top = dist.top(1000, 10)
+    assert np.isin(sample, top).mean() > 0.5
+
+
+def test_seasonal_days_skip_zero_weight_weekdays():
+    dist = Seasonal(weekday=(1, 1, 1, 1, 1, 0, 0))
+    offsets = dist.days(np.random.default_rng(0), SUNDAY, 27, 5000)
+    days = {(SUNDAY + timedelta(days=int(o))).isoweekday() for o in offsets}
+    assert days == {1, 2, 3, 4, 5}
+
+
+def test_days_with_all_zero_weights_fall_back_to_uniform():
+    # un --append di una sola domenica, con peso 0 alla domenica
+    dist = Seasonal(weekday=(1, 1, 1, 1, 1, 0.1, 0))
+    assert (dist.days(np.random.default_rng(0), SUNDAY, 0, 10) == 0).all()
+    weekend = Seasonal(weekday=(1, 1, 1, 1, 1, 0, 0))
+    offsets = weekend.days(np.random.default_rng(0), SUNDAY - timedelta(days=1), 1, 1000)
+    assert set(offsets.tolist()) == {0, 1}
+
+
+def test_parse_specs():
+    assert parse("zipf:1.3") == Zipf(1.3)
+    assert parse("uniform") == Uniform()
+    assert parse("weighted:5/3/1") == Weighted(5, 3, 1)
+    assert parse("seasonal:weekday=1/1/1/1/1/0.5/0.2") == Seasonal(weekday=(1, 1, 1, 1, 1, 0.5, 0.2))
+    assert parse(repr(Zipf(0.8))) == Zipf(0.8)
+    with pytest.raises(ValueError):
+        parse("pareto:2")
+    assert parse_overrides(["Rental.CustomerID=zipf:2"]) == {"Rental.CustomerID": Zipf(2)}
+    with pytest.raises(ValueError):
+        parse_overrides(["CustomerID=zipf:2"])
@@ -0,0 +1,53 @@
+import pytest
+
+import biblioteca
+from datagen import engine, sharding
+from datagen.engine import Table, bounded, checked
+
+
+def folder(tmp_path, name):
+    path = tmp_path / name
+    path.mkdir()
+    return path
+
+
+def checksums(ctx):
+    return {name: c["sha256"] for name, c in ctx.checksums.items()}
+
+
+def test_output_does_not_depend_on_workers(tmp_path, small_shards):
+    one = engine.run(biblioteca.SCHEMA, folder(tmp_path, "one"), workers=1)
+    two = engine.run(biblioteca.SCHEMA, folder(tmp_path, "two"), workers=2, concurrency=3)
+    assert one.counts == two.counts
+    assert checksums(one) == checksums(two)
+
+
+def test_ids_are_contiguous_across_shards(tmp_path, small_shards):
+    ctx = engine.run(biblioteca.SCHEMA, tmp_path, scale=0.5)
+    lines = (tmp_path / "Rental.csv").read_text(encoding="utf-8").splitlines()[1:]
+    ids = [int(line.split(",", 1)[0]) for line in lines]
+    assert ids == list(range(1, ctx.counts["Rental"] + 1))
+    assert ctx.last["Rental"] == len(ids)
+
+
+def test_shard_seeds_depend_on_table_and_shard():
+    seeds = {sharding.shard_seed(42, table, shard) for table in "AB" for shard in range(3)}
+    assert len(seeds) == 6
+    assert sharding.shard_seed(42, "A", 0) == sharding.shard_seed(42, "A", 0)
+
+
+def test_rows_must_be_tuples_of_the_table_width():
+    table = Table("T", None, 1, columns=[("ID", "int"), ("Name", "str")])
+    assert list(checked(iter([(1, "a"), (2, "b")]), table)) == [(1, "a"), (2, "b")]
+    for bad in ({"ID": 1, "Name": "a"}, [1, "a"], (1,)):
+        with pytest.raises(ValueError, match="tuple di 2 valori"):
+            list(checked([bad], table))
+
+
+def test_bounded_cuts_only_long_texts():
+    table = Table("T", None, 1, columns=[("ID", "int"), ("Name", "str"), ("Note", "str")],
+                  lengths={"Name": 3})
+    table.check()
+    rows = [(1, "abcdef", "abcdef"), (2, "ab", None)]
+    assert list(bounded(rows, table)) == [(1, "abc", "abcdef"), (2, "ab", None)]
+    assert table.getter("Note", "ID")(rows[0]) == ("abcdef", 1)
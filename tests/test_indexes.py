@@ -0,0 +1,84 @@
+import biblioteca
+from datagen import ddl, engine, indexes
+from datagen.indexes import Analyzer, candidates, propose, redundant, workload
+
+SQL = biblioteca.SCHEMA.sql
+ATTIVITA = SQL.parent / "attivita_didattiche" / "attivita_didattiche.sql"
+
+WORKLOAD = """
+CREATE TABLE T (ID INT PRIMARY KEY, Kind INT, Day DATE, IsDeleted TINYINT(1));
+CREATE VIEW Used AS SELECT ID, Kind FROM T WHERE IsDeleted = 0;
+CREATE VIEW Unused AS SELECT Day FROM T;
+SET @from = '2024-01-01';
+
+-- 1) Per tipo
+SELECT * FROM Used WHERE Kind = 3;
+
+-- 2) Da una data (commentata)
+-- SELECT ID FROM T
+-- WHERE Day >= @from ORDER BY Day;
+"""
+
+
+def existing(schema):
+    return {t.name.lower(): {**t.indexes, **({"PRIMARY": tuple(t.pk)} if t.pk else {})} for t in schema}
+
+
+def test_workload_reads_queries_views_and_variables():
+    views, queries = workload(WORKLOAD)
+    assert list(views) == ["Used", "Unused"]
+    assert [q.title for q in queries] == ["1) Per tipo", "2) Da una data (commentata)", "vista Unused"]
+    dated = queries[1]
+    assert dated.sql == "SELECT ID FROM T WHERE Day >= '2024-01-01' ORDER BY Day"
+    assert dated.template == "SELECT ID FROM T WHERE Day >= @from ORDER BY Day"
+    assert dated.variables == {"from": "'2024-01-01'"}
+
+
+def test_equalities_reach_the_table_through_views():
+    schema = ddl.parse(WORKLOAD)
+    views, queries = workload(WORKLOAD)
+    (access,) = Analyzer(schema, views).query(queries[0].sql)
+    assert access.table == "T"
+    assert access.eq == {"Kind": "value", "IsDeleted": "flag"}
+    assert candidates(access, []) == [("Kind", "IsDeleted")]
+    # già coperto da un indice esistente che lo ha come prefisso
+    assert candidates(access, [("Kind", "IsDeleted", "Day")]) == []
+
+
+def test_biblioteca_candidates():
+    schema = ddl.load(SQL)
+    views, queries = workload(SQL.read_text(encoding="utf-8"))
+    proposals = propose(schema, views, queries, existing(schema))
+    assert proposals[("Rental", ("Returned", "EndDate"))] == ["1) Elenco noleggi attivi", "2) Noleggi scaduti"]
+    # nessun candidato inizia con la PK o è prefisso di un altro candidato
+    for table, cols in proposals:
+        assert not indexes._prefix(schema[table].pk, cols)
+        assert not any(t == table and c != cols and indexes._prefix(cols, c) for t, c in proposals)
+
+
+def test_attivita_candidates_follow_the_view_joins():
+    schema = ddl.load(ATTIVITA)
+    views, queries = workload(ATTIVITA.read_text(encoding="utf-8"))
+    # studente_id = :id sulla vista arriva a valutazione, con il flag e l'intervallo di date
+    assert ("valutazione", ("studente_id", "is_deleted", "data_valutazione")) in propose(
+        schema, views, queries, existing(schema))
+
+
+def test_redundant_indexes():
+    schema = ddl.load(SQL)
+    assert redundant(schema, existing(schema)) == [
+        (t, f"idx{t}") for t in ("Supplier", "Employee", "Customer", "Book", "BookCopy", "Payment", "Rental")]
+    found = {"rental": {"PRIMARY": ("RentalID",), "a": ("CustomerID",), "b": ("customerid",),
+                        "c": ("CustomerID", "StartDate")}}
+    assert redundant(schema, found) == [("Rental", "b")]
+
+
+def test_check_on_a_generated_folder(tmp_path):
+    engine.run(biblioteca.SCHEMA, tmp_path)
+    advice = indexes.check(SQL, tmp_path, repeat=1, report=lambda _: None)
+    assert advice.redundant == redundant(ddl.load(SQL), existing(ddl.load(SQL)))
+    proposed = {(t, c) for t, c, _ in advice.rejected} | set(advice.useful)
+    assert ("Rental", ("Returned", "EndDate")) in proposed
+    assert len(advice.measures) == len(workload(SQL.read_text(encoding="utf-8"))[1])
+    assert all(m.after is not None for m in advice.measures)
+    assert "DROP INDEX idxRental ON Rental;" in indexes.script(advice)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from datagen.keys import KeySpace, KeySpaceExceeded, Permutation, codes, pool_values
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 17, 1000, 4097])
+def test_permutation_is_a_bijection(n):
+    out = Permutation(n, seed=7)(np.arange(n))
+    assert sorted(out.tolist()) == list(range(n))
+
+
+def test_permutation_depends_on_seed_only():
+    positions = np.arange(500)
+    assert (Permutation(500, 1)(positions) == Permutation(500, 1)(positions)).all()
+    assert (Permutation(500, 1)(positions) != Permutation(500, 2)(positions)).any()
+    # ogni shard calcola le sue posizioni senza conoscere le altre
+    whole = Permutation(500, 1)(positions)
+    assert (Permutation(500, 1)(positions[200:300]) == whole[200:300]).all()
+
+
+def test_permutation_rejects_positions_outside_the_space():
+    with pytest.raises(KeySpaceExceeded):
+        Permutation(10, 0)([10])
+    with pytest.raises(KeySpaceExceeded):
+        Permutation(0, 0)
+
+
+def test_key_space_gives_unique_composite_keys():
+    space = KeySpace(range(1, 5), ["a", "b", "c"])
+    corsi, lettere = space.take(list(range(len(space))), seed=3)
+    pairs = list(zip(corsi, lettere))
+    assert len(set(pairs)) == 12
+    assert set(corsi) == {1, 2, 3, 4} and set(lettere) == {"a", "b", "c"}
+    with pytest.raises(KeySpaceExceeded):
+        space.take([12], seed=3)
+
+
+def test_codes_are_unique_and_well_formed():
+    values = codes(range(5000), seed=11, length=16)
+    assert len(set(values)) == 5000
+    assert all(len(v) == 16 and v.isalpha() and v.isupper() for v in values)
+
+
+def test_pool_values_are_tagged_after_the_pool_runs_out():
+    pool = ["anna@example.com", "marco@example.com", "luca@example.com"]
+    values = pool_values(pool, range(7), seed=5)
+    assert len(set(values)) == 7
+    assert sorted(values[:3]) == sorted(pool)
+    assert all("+1@" in v for v in values[3:6]) and "+2@" in values[6]
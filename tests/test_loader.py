@@ -0,0 +1,126 @@
+import csv
+import sqlite3
+from datetime import timedelta
+
+import pytest
+
+import biblioteca
+from datagen import engine, generic
+from datagen.db import Database
+from datagen.loader import import_order, load_data_infile, load_folder
+
+DDL = biblioteca.SCHEMA.sql
+GP_DDL = DDL.parent / "GP_per_creazione_database.sql"
+
+
+@pytest.fixture
+def base(tmp_path):
+    folder = tmp_path / "base"
+    folder.mkdir()
+    ctx = engine.run(biblioteca.SCHEMA, folder)
+    return folder, ctx
+
+
+def load(folder, db, **kwargs):
+    return load_folder(folder, f"sqlite:///{db}", ddl=DDL, report=lambda _: None, **kwargs)
+
+
+def counts(db, tables):
+    with sqlite3.connect(db) as conn:
+        return {t: conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0] for t in tables}
+
+
+def test_import_order_follows_the_foreign_keys(base):
+    names = [table for table, _ in import_order(base[0])]
+    assert names.index("Supplier") < names.index("Book") < names.index("BookCopy") < names.index("Rental")
+
+
+def test_round_trip_to_sqlite(tmp_path, base):
+    folder, ctx = base
+    db = tmp_path / "db.sqlite"
+    stats = load(folder, db)
+    assert {t: rows for t, (rows, _) in stats.items()} == ctx.counts
+    assert counts(db, ctx.counts) == ctx.counts
+    with open(folder / "Rental.csv", encoding="utf-8", newline="") as f:
+        first = next(csv.DictReader(f))
+    with sqlite3.connect(db) as conn:
+        row = conn.execute("SELECT BookCopyID, StartDate, Returned FROM Rental WHERE RentalID = 1").fetchone()
+    assert row == (int(first["BookCopyID"]), first["StartDate"], int(first["Returned"] == "TRUE"))
+
+
+def test_truncate_on_a_fresh_database(tmp_path, base):
+    folder, ctx = base
+    db = tmp_path / "db.sqlite"
+    load(folder, db, truncate=True)
+    load(folder, db, truncate=True)
+    assert counts(db, ctx.counts) == ctx.counts
+
+
+def test_delta_is_appended(tmp_path, base):
+    folder, ctx = base
+    delta = tmp_path / "delta"
+    delta.mkdir()
+    new = engine.run(biblioteca.SCHEMA, delta, previous=folder, until=biblioteca.RENTALS_END + timedelta(days=60))
+    db = tmp_path / "db.sqlite"
+    load(folder, db)
+    load(delta, db)
+    assert counts(db, ["Rental", "Payment", "Customer"]) == {
+        "Rental": ctx.counts["Rental"] + new.counts["Rental"],
+        "Payment": ctx.counts["Payment"] + new.counts["Payment"],
+        "Customer": ctx.counts["Customer"],
+    }
+
+
+@pytest.mark.parametrize("ddl", [GP_DDL, None])   # None: DDL dal manifest
+def test_generic_nulls_survive(tmp_path, monkeypatch, ddl):
+    monkeypatch.chdir(tmp_path)
+    ctx = generic.main([str(GP_DDL), "--rows", "200"])
+    with open(ctx.outdir / "CustomerOrder.csv", encoding="utf-8", newline="") as f:
+        empty = sum(1 for row in csv.DictReader(f) if row["CouponID"] == "")
+    assert empty > 0
+    db = tmp_path / "gp.sqlite"
+    load_folder(ctx.outdir, f"sqlite:///{db}", ddl=ddl, report=lambda _: None)
+    with sqlite3.connect(db) as conn:
+        types = dict(conn.execute("SELECT typeof(CouponID), COUNT(*) FROM CustomerOrder GROUP BY 1").fetchall())
+    assert types["null"] == empty
+    assert types.keys() == {"null", "integer"}
+
+
+class Recorder:
+    def __init__(self):
+        self.sql = None
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=()):
+        self.sql = sql
+
+
+def test_load_data_maps_empty_fields_to_null(tmp_path):
+    conn = Recorder()
+    load_data_infile(Database("mysql://root@localhost/gp"), conn, "CustomerOrder", tmp_path / "x.csv",
+                     ["CustomerOrderID", "CouponID", "Paid"], {"Paid"}, {"CouponID", "Paid"})
+    assert "(`CustomerOrderID`, @CouponID, @Paid)" in conn.sql
+    assert "`CouponID` = NULLIF(@CouponID, '')" in conn.sql
+    assert "`Paid` = IF(@Paid = '', NULL, UPPER(@Paid) IN ('TRUE', '1'))" in conn.sql
+
+
+def test_bool_columns_come_from_the_ddl(tmp_path, base):
+    # prima riga in minuscolo e grafie legacy (True/False/0/1) nelle altre
+    folder, _ = base
+    path = folder / "Rental.csv"
+    with open(path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    col = rows[0].index("Returned")
+    spellings = ["false", "True", "False", "1", "0"]
+    for i, row in enumerate(rows[1:]):
+        row[col] = spellings[i % len(spellings)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f, lineterminator="\r\n").writerows(rows)
+    db = tmp_path / "db.sqlite"
+    load_folder(folder, f"sqlite:///{db}", report=lambda _: None)   # DDL dal manifest
+    with sqlite3.connect(db) as conn:
+        got = [r for (r,) in conn.execute("SELECT Returned FROM Rental ORDER BY RentalID")]
+    assert got == [int(spellings[i % len(spellings)].upper() in ("TRUE", "1")) for i in range(len(rows) - 1)]
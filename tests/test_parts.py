@@ -0,0 +1,84 @@
+import hashlib
+import importlib.util
+import io
+import sqlite3
+
+import pytest
+
+import biblioteca
+from datagen import delta, engine, generic
+from datagen.compression import open_compressed
+from datagen.loader import load_folder
+from datagen.output import MANIFEST_FILE, read_manifest, read_parts_index
+from datagen.validate import validate
+from datagen.writers import write_csv, write_csv_parts
+
+COLUMNS = [("ID", "int"), ("Name", "str"), ("Day", "date")]
+ROWS = [(i, f"name, {i}" if i % 7 == 0 else f"name {i}", f"2026-01-{i % 28 + 1:02d}") for i in range(1, 20_001)]
+ZSTD = pytest.param("zstd", marks=pytest.mark.skipif(importlib.util.find_spec("zstandard") is None,
+                                                     reason="zstandard non installato"))
+
+
+def plain_csv(tmp_path):
+    path = tmp_path / "plain.csv"
+    write_csv(path, COLUMNS, ROWS)
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("compress", ["none", "gzip", ZSTD])
+def test_parts_rebuild_the_plain_csv(tmp_path, compress):
+    plain = plain_csv(tmp_path)
+    header = plain.split(b"\n", 1)[0] + b"\n"
+    out = tmp_path / compress
+    out.mkdir()
+    total, index = write_csv_parts(out, "T", COLUMNS, ROWS, compress=compress, part_bytes=8 << 10, threads=3)
+    assert total == index["rows"] == len(ROWS) and len(index["parts"]) > 1
+    data = b""
+    for part in index["parts"]:
+        raw = (out / part["file"]).read_bytes()
+        assert part["bytes"] == len(raw) and part["sha256"] == hashlib.sha256(raw).hexdigest()
+        with open_compressed(out / part["file"]) as f:
+            text = f.read()
+        assert text.startswith(header)
+        data += text[len(header):]
+    assert header + data == plain
+    assert [p["first_row"] for p in index["parts"]][0] == 1 and index["parts"][-1]["last_row"] == len(ROWS)
+
+
+def test_parts_do_not_depend_on_threads(tmp_path):
+    indexes = []
+    for threads in (1, 4):
+        out = tmp_path / str(threads)
+        out.mkdir()
+        indexes.append(write_csv_parts(out, "T", COLUMNS, ROWS, compress="gzip", part_bytes=8 << 10,
+                                       threads=threads)[1])
+    assert len(indexes[0]["parts"]) > 1 and indexes[0] == indexes[1]
+
+
+def test_compressed_folder_validates_loads_and_resumes(tmp_path):
+    folder = tmp_path / "base"
+    folder.mkdir()
+    ctx = engine.run(biblioteca.SCHEMA, folder, scale=15, compress="gzip", part_size=0.01)
+    assert len(read_parts_index(folder / ctx.files["Rental"])["parts"]) > 1
+    assert validate(folder, biblioteca.SCHEMA.sql, out=io.StringIO()).report.total() == 0
+
+    db = tmp_path / "db.sqlite"
+    load_folder(folder, f"sqlite:///{db}", ddl=biblioteca.SCHEMA.sql, report=lambda _: None)
+    with sqlite3.connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM Rental").fetchone()[0] == ctx.counts["Rental"]
+
+    levels = read_manifest(folder)["tables"]
+    (folder / MANIFEST_FILE).unlink()
+    scanned = delta.high_water(biblioteca.SCHEMA, folder)["tables"]
+    assert scanned["Rental"]["max_id"] == levels["Rental"]["max_id"]
+    assert scanned["Rental"]["max_date"] == levels["Rental"]["max_date"]
+
+
+def test_generic_passes_compression_options(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ctx = generic.main([str(biblioteca.SCHEMA.sql), "--rows", "50", "--compress", "gzip", "--part-size", "1"])
+    manifest = read_manifest(ctx.outdir)
+    assert manifest["compression"] == "gzip" and manifest["part_bytes"] == 1 << 20
+    assert all(name.endswith(".parts.json") for name in ctx.files.values())
+    with pytest.raises(SystemExit):
+        generic.main([str(biblioteca.SCHEMA.sql), "--format", "parquet", "--compress", "gzip"])
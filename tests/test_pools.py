@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from datagen import pools
+from datagen.pools import ValuePool
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(pools, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(pools, "_pools", {})
+    return tmp_path
+
+
+def test_pool_file_round_trip(tmp_path):
+    path = tmp_path / "p.pool"
+    values = ["Anna", "Niccolò", "", "Zoë Bianchi"]
+    pools._write_pool(path, values)
+    pool = ValuePool(path)
+    assert len(pool) == 4
+    assert [pool[i] for i in range(len(pool))] == values
+    assert list(pool.bounded(4)) == ["Anna", ""]
+    (tmp_path / "bad.pool").write_bytes(b"not a pool")
+    with pytest.raises(ValueError):
+        ValuePool(tmp_path / "bad.pool")
+
+
+def test_values_are_distinct_and_seeded():
+    a = pools.build_values("last_name", 7, size=50)
+    assert len(a) == len(set(a)) == 50
+    assert pools.build_values("last_name", 7, size=50) == a
+    assert pools.build_values("last_name", 8, size=50) != a
+
+
+def test_cached_pool_does_not_call_faker(cache, monkeypatch):
+    first = pools.get("city", 1, size=30)
+    assert list(cache.glob("*.pool")) == [cache / "it_IT-1-city-30.pool"]
+    monkeypatch.setattr(pools, "_pools", {})
+    monkeypatch.setattr(pools, "build_values", lambda *a: pytest.fail("pool rigenerato"))
+    again = pools.get("city", 1, size=30)
+    assert again is not first
+    assert list(again.values) == list(first.values)
+
+
+def test_sample_is_reproducible_and_bounded(cache):
+    pool = pools.get("email", 3, size=40)
+    a = pool.sample(np.random.default_rng(5), 100, max_len=20)
+    assert a == pool.sample(np.random.default_rng(5), 100, max_len=20)
+    assert all(len(v) <= 20 for v in a)
+    with pytest.raises(ValueError):
+        pool.sample(np.random.default_rng(5), 1, max_len=2)
@@ -0,0 +1,57 @@
+import pstats
+import time
+
+import biblioteca
+from datagen import engine
+from datagen.output import read_manifest
+from datagen.profiling import PROFILE_DIR, Recorder, sha256
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_stages_are_numbered_and_timed(tmp_path):
+    recorder = Recorder(tmp_path)
+    with recorder.stage("generate", "Rental") as stage:
+        assert recorder.current is stage
+        busy(0.02)
+        stage.update(rows=10, bytes=100)
+    with recorder.stage("checksum"):
+        pass
+    assert recorder.current is None
+    first, second = recorder.stages
+    assert (first["name"], second["name"]) == ("01-generate-Rental", "02-checksum")
+    assert (first["rows"], first["bytes"], second["rows"]) == (10, 100, None)
+    assert first["wall_seconds"] >= 0.02 and first["cpu_seconds"] > 0
+    assert recorder.slowest(1) == [first]
+    assert recorder.totals()["wall_seconds"] >= first["wall_seconds"]
+    assert not (tmp_path / PROFILE_DIR).exists()
+
+
+def test_profile_per_stage(tmp_path):
+    recorder = Recorder(tmp_path, profile=True)
+    with recorder.stage("generate", "Book"):
+        busy(0.01)
+    prof = tmp_path / PROFILE_DIR / "01-generate-Book.prof"
+    assert any("busy" in func for _, _, func in pstats.Stats(str(prof)).stats)
+    assert "busy" in prof.with_suffix(".txt").read_text(encoding="utf-8")
+
+
+def test_manifest_records_stages_and_checksums(tmp_path, small_shards):
+    engine.run(biblioteca.SCHEMA, tmp_path, workers=2, profile=True)
+    manifest = read_manifest(tmp_path)
+    for name, info in manifest["files"].items():
+        assert info["sha256"] == sha256(tmp_path / name)
+    generated = {s["table"] for s in manifest["stages"] if s["stage"] == "generate"}
+    assert {"Customer", "Rental", "Payment"} <= generated
+    customer = next(s for s in manifest["stages"] if s["stage"] == "generate" and s["table"] == "Customer")
+    assert customer["rows"] == manifest["tables"]["Customer"]["rows"]
+    assert customer["worker_cpu_seconds"] > 0
+    assert {"python", "numpy", "platform"} <= set(manifest["environment"])
+    # i profili degli shard nei worker sono uniti in quello della fase
+    profiles = tmp_path / PROFILE_DIR
+    assert (profiles / f"{customer['name']}.prof").exists()
+    assert not list(profiles.glob("*.shard-*"))
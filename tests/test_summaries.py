@@ -0,0 +1,80 @@
+from datetime import timedelta
+import sqlite3
+
+import pytest
+
+import biblioteca
+import prof_privato
+from attivita_didattiche import attivita_didattiche
+from datagen import engine, summaries
+from datagen.db import Database
+from datagen.loader import load_folder
+
+# database di datagen.summaries -> (schema, ultima data generata)
+DATABASES = {
+    "biblioteca": (biblioteca.SCHEMA, biblioteca.RENTALS_END),
+    "prof_privato": (prof_privato.SCHEMA, prof_privato.LESSONS_END),
+    "attivita_didattiche": (attivita_didattiche.SCHEMA, attivita_didattiche.VALUTAZIONI_END),
+}
+
+
+@pytest.mark.parametrize("database", DATABASES)
+def test_check_base_and_delta(tmp_path, database):
+    schema, end = DATABASES[database]
+    base, delta = tmp_path / "base", tmp_path / "delta"
+    base.mkdir()
+    delta.mkdir()
+    engine.run(schema, base)
+    engine.run(schema, delta, previous=base, until=end + timedelta(days=30))
+    lines = []
+    assert summaries.check(database, [base, delta], report=lines.append), "\n".join(lines)
+    assert sum("OK" in line for line in lines) == 2 * len(summaries.DATABASES[database][1])
+
+
+def test_refresh_processes_only_new_rows(tmp_path):
+    base, delta = tmp_path / "base", tmp_path / "delta"
+    base.mkdir()
+    delta.mkdir()
+    ctx = engine.run(biblioteca.SCHEMA, base)
+    new = engine.run(biblioteca.SCHEMA, delta, previous=base, until=biblioteca.RENTALS_END + timedelta(days=30))
+    url = f"sqlite:///{tmp_path / 'db.sqlite'}"
+    db = Database(url)
+    conn = db.connect()
+    try:
+        summaries.install(db, conn, summaries.BIBLIOTECA)
+        rental = summaries.BIBLIOTECA[0]
+        load_folder(base, url, ddl=biblioteca.SCHEMA.sql, report=lambda _: None)
+        assert summaries.refresh(db, conn, rental) == {"Customer": ctx.counts["Customer"],
+                                                        "Rental": ctx.counts["Rental"]}
+        assert summaries.refresh(db, conn, rental) == {"Customer": 0, "Rental": 0}
+        load_folder(delta, url, ddl=biblioteca.SCHEMA.sql, report=lambda _: None)
+        assert summaries.refresh(db, conn, rental) == {"Customer": 0, "Rental": new.counts["Rental"]}
+        assert summaries.verify(conn, rental) == []
+        # una riga già elaborata cambia: serve il rebuild
+        conn.execute("UPDATE Rental SET Returned = 1 - Returned WHERE RentalID = 1")
+        assert summaries.verify(conn, rental) != []
+        summaries.refresh(db, conn, rental, rebuild=True)
+        assert summaries.verify(conn, rental) == []
+    finally:
+        conn.close()
+
+
+def test_upsert_merges_by_key():
+    columns = [("K", "INT", "key"), ("Name", "TEXT", "set"), ("N", "INT", "sum"), ("First", "DATE", "min")]
+    conn = sqlite3.connect(":memory:")
+    conn.execute(summaries._create_table("MV", columns))
+    for select in ("SELECT 1 AS K, 'a' AS Name, 2 AS N, '2026-02-01' AS First",
+                   "SELECT 1 AS K, 'b' AS Name, 3 AS N, '2026-01-01' AS First UNION ALL "
+                   "SELECT 2, 'c', 1, NULL"):
+        conn.execute(summaries.upsert("sqlite", "MV", columns, select))
+    assert conn.execute("SELECT * FROM MV ORDER BY K").fetchall() == [(1, "b", 5, "2026-01-01"), (2, "c", 1, None)]
+    mysql = summaries.upsert("mysql", "MV", columns, "SELECT 1")
+    assert "ON DUPLICATE KEY UPDATE" in mysql and "N = MV.N + VALUES(N)" in mysql
+
+
+@pytest.mark.parametrize("database", DATABASES)
+def test_mysql_script_has_refresh_procedures(database):
+    script = summaries.mysql_script(database)
+    for s in summaries.DATABASES[database][1]:
+        assert f"CREATE PROCEDURE Refresh_{s.name}()" in script
+        assert f"CREATE OR REPLACE VIEW {s.name} AS" in script
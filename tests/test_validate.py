@@ -0,0 +1,52 @@
+import io
+from collections import Counter
+
+import pytest
+
+import biblioteca
+from datagen import engine
+from datagen.validate import validate
+
+
+@pytest.fixture
+def folder(tmp_path):
+    engine.run(biblioteca.SCHEMA, tmp_path)
+    return tmp_path
+
+
+def violations(folder):
+    report = validate(folder, biblioteca.SCHEMA.sql, out=io.StringIO()).report
+    by_rule = Counter()
+    for (_, rule), n in report.counts.items():
+        by_rule[rule] += n
+    return by_rule
+
+
+def set_field(path, line, column, value):
+    """Cambia un campo di una riga del CSV (file senza virgolette)."""
+    lines = path.read_text(encoding="utf-8").splitlines()
+    fields = lines[line].split(",")
+    fields[lines[0].split(",").index(column)] = value
+    lines[line] = ",".join(fields)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_generated_folder_is_clean(folder):
+    assert violations(folder) == Counter()
+
+
+def test_violations_are_reported_by_rule(folder):
+    rental, customer = folder / "Rental.csv", folder / "Customer.csv"
+    set_field(rental, 2, "RentalID", "1")
+    set_field(rental, 3, "CustomerID", "999999")
+    set_field(rental, 4, "StartDate", "2026-13-01")
+    set_field(rental, 5, "Returned", "maybe")
+    set_field(customer, 1, "FirstName", "x" * 51)
+    assert violations(folder) == Counter(pk=1, fk=1, date=1, type=1, length=1)
+
+
+def test_header_must_follow_the_ddl(folder):
+    path = folder / "Customer.csv"
+    text = path.read_text(encoding="utf-8")
+    path.write_text(text.replace("FirstName,LastName", "LastName,FirstName", 1), encoding="utf-8")
+    assert violations(folder)["header"] == 1
@@ -0,0 +1,101 @@
+import csv
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import pytest
+
+import prof_privato
+from datagen import engine, writers
+from datagen.writers import BackgroundFile, write_columnar, write_csv
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+COLUMNS = [("ID", "int"), ("Name", "str"), ("Paid", "bool"), ("Day", "date"), ("At", "datetime"),
+           ("Hour", "time"), ("Amount", "decimal(10,2)"), ("Rate", "float")]
+ROWS = [
+    (1, "Anna", True, date(2026, 1, 2), datetime(2026, 1, 2, 9, 30), time(9, 30), 12.5, 0.25),
+    (2, None, "FALSE", "2026-01-03", "2026-01-03T10:00:00", "10:00:00", 7, None),
+    (3, "Bruno", False, date(2026, 1, 4), None, None, None, 1.0),
+]
+
+
+def read_columnar(path, fmt):
+    if fmt == "parquet":
+        return pa.parquet.read_table(path)
+    with pa.ipc.open_file(path) as f:
+        return f.read_all()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow-ipc"])
+def test_columnar_types_and_values(tmp_path, fmt):
+    path = tmp_path / f"T{writers.EXTENSIONS[fmt]}"
+    assert write_columnar(path, COLUMNS, iter(ROWS), fmt, row_group_size=2) == 3
+    table = read_columnar(path, fmt)
+    # Parquet non ha timestamp e orari in secondi: li rilegge in millisecondi
+    unit = "ms" if fmt == "parquet" else "s"
+    assert [str(t) for t in table.schema.types] == [
+        "int32", "string", "bool", "date32[day]", f"timestamp[{unit}]", f"time32[{unit}]", "decimal128(10, 2)",
+        "double"]
+    got = table.to_pylist()
+    assert [r["Paid"] for r in got] == [True, False, False]
+    assert [r["Day"] for r in got] == [date(2026, 1, 2), date(2026, 1, 3), date(2026, 1, 4)]
+    assert [r["Amount"] for r in got] == [Decimal("12.50"), Decimal("7.00"), None]
+    assert got[1]["Name"] is None and got[2]["At"] is None
+
+
+def test_parquet_row_groups(tmp_path):
+    path = tmp_path / "T.parquet"
+    rows = [(i, f"n{i}") for i in range(10)]
+    write_columnar(path, [("ID", "int"), ("Name", "str")], rows, "parquet", row_group_size=4)
+    assert pa.parquet.ParquetFile(path).metadata.num_row_groups == 3
+    empty = tmp_path / "E.parquet"
+    assert write_columnar(empty, [("ID", "int")], [], "parquet") == 0
+    assert pa.parquet.read_table(empty).schema.names == ["ID"]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow-ipc"])
+def test_engine_writes_columnar_tables(tmp_path, fmt):
+    ctx = engine.run(prof_privato.SCHEMA, tmp_path, fmt=fmt)
+    for name, rows in ctx.counts.items():
+        path = tmp_path / ctx.files[name]
+        assert path.suffix == writers.EXTENSIONS[fmt]
+        assert read_columnar(path, fmt).num_rows == rows
+
+
+def test_background_file_writes_blocks_in_order(tmp_path):
+    path = tmp_path / "out.bin"
+    blocks = [bytes([i]) * (i + 1) for i in range(50)]
+    with BackgroundFile(path, depth=2, digest=True) as f:
+        for block in blocks:
+            f.write(block)
+    assert path.read_bytes() == b"".join(blocks)
+    assert f.bytes == sum(map(len, blocks))
+    assert f.sha256 == writers.hashlib.sha256(b"".join(blocks)).hexdigest()
+
+
+def test_background_file_reraises_write_errors(tmp_path):
+    f = BackgroundFile(tmp_path / "out.bin", depth=1)
+    f._file.close()     # il thread di scrittura fallisce al primo blocco
+    with pytest.raises(ValueError):
+        for _ in range(10):
+            f.write(b"x")
+        f.close()
+
+
+def test_csv_spans_several_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(writers, "BLOCK_ROWS", 7)
+    path = tmp_path / "T.csv"
+    rows = [(i, f"n{i}") for i in range(30)]
+    assert write_csv(path, [("ID", "int"), ("Name", "str")], iter(rows)) == 30
+    with open(path, encoding="utf-8", newline="") as f:
+        assert [tuple(r) for r in csv.reader(f)] == [("ID", "Name"), *((str(i), n) for i, n in rows)]
+
+
+def test_csv_normalizes_only_typed_columns(tmp_path):
+    path = tmp_path / "T.csv"
+    columns = [("Paid", "bool"), ("Day", "date"), ("Note", "str")]
+    write_csv(path, columns, [(True, date(2026, 1, 2), "True"), (False, "2026-01-03", None)])
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "Paid,Day,Note", "TRUE,2026-01-02,True", "FALSE,2026-01-03,"]